@@ -12,11 +12,27 @@ import os
 import time
 import pytz
 from streamlit_autorefresh import st_autorefresh
-import resend
 import requests
 import threading
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from email_templates import (
+    render_payment_collection_email, render_not_paid_email, render_payment_confirmation_email
+)
+import report_engine
+from email_dispatch import EmailDispatcher, make_idempotency_key
+from change_log_store import get_change_log_store
+from sheet_mirror import get_orders_mirror, sync_orders_mirror, invalidate_orders_mirror, raw_content_version
+from sheet_watch import get_sheet_watcher
+from cache_regions import REGION_SNAPSHOT, REGION_FX, REGION_SEARCH, register_cache, invalidate
+from snapshot_patch import get_snapshot_patches
+from fake_sheets import fake_sheets_enabled, get_fake_client
+from perf_metrics import (
+    start_rerun, finish_rerun, recent_runs, stage, timed, lap, count, cache_lookup, cache_miss
+)
+from sheets_gateway import govern_client, set_api_user, get_sheets_gateway
+from frame_schema import compact_order_frame, enable_copy_on_write
+from utils import render_perf_panel, perf_panel_enabled, current_user_label
 
 ACCOUNTING_EMAIL = "operations@tiktik.co.il"
 OPERATIONS_EMAIL = "operations@tiktik.co.il"
@@ -65,47 +81,80 @@ def get_resend_credentials():
     except Exception as e:
         pass  # Fall through to other methods
     
-    # Method 2: Try environment variables (fallback)
-    try:
-        api_key = os.environ.get('RESEND_API_KEY')
-        from_email = os.environ.get('RESEND_FROM_EMAIL')
-        if api_key and from_email:
-            return api_key, from_email
-    except Exception as e:
-        pass  # Fall through to Replit connector method
-    
-    # Method 3: Fallback to Replit connector (for Replit deployments)
+    # Method 2/3: environment variables, then the Replit connector (shared with the scripts)
     try:
-        hostname = os.environ.get('REPLIT_CONNECTORS_HOSTNAME')
-        x_replit_token = None
-        
-        if os.environ.get('REPL_IDENTITY'):
-            x_replit_token = 'repl ' + os.environ.get('REPL_IDENTITY')
-        elif os.environ.get('WEB_REPL_RENEWAL'):
-            x_replit_token = 'depl ' + os.environ.get('WEB_REPL_RENEWAL')
-        
-        if not x_replit_token or not hostname:
-            return None, None
-        
-        response = requests.get(
-            f'https://{hostname}/api/v2/connection?include_secrets=true&connector_names=resend',
-            headers={
-                'Accept': 'application/json',
-                'X_REPLIT_TOKEN': x_replit_token
-            }
-        )
-        data = response.json()
-        connection = data.get('items', [{}])[0] if data.get('items') else {}
-        settings = connection.get('settings', {})
-        
-        return settings.get('api_key'), settings.get('from_email')
-    except Exception as e:
+        return report_engine.get_resend_credentials()
+    except Exception:
         # Don't show error if it's just missing Replit credentials (expected on Streamlit Cloud)
         return None, None
 
+@st.cache_resource
+def get_email_dispatcher():
+    """Shared background email sender - credentials resolved once, retries on 429/5xx"""
+    return EmailDispatcher(get_resend_credentials)
+
+def dispatch_email(to_email, subject, html, attachments=None, idempotency_key=None):
+    """Queue an email without blocking the page. Returns (status, message), status as EmailJob.status:
+    'pending' (queued - the outcome shows in the sidebar panel), 'sent' (the same email already went out) or 'failed'.
+
+    The job handle is kept in session_state so the sidebar can show its progress.
+    """
+    job = get_email_dispatcher().submit(to_email, subject, html, attachments, idempotency_key)
+    jobs = st.session_state.setdefault('email_jobs', [])
+    if job not in jobs:
+        jobs.append(job)
+        del jobs[:-20]
+
+    status = job.status
+    if status == 'sent':
+        return status, f"מייל זהה כבר נשלח היום ל-{to_email}"
+    if status == 'failed':
+        return status, f"שגיאה בשליחת מייל: {job.result()[1]}"
+    return status, f"המייל ממתין בתור השליחה ל-{to_email} - הסטטוס יופיע ב'מיילים ברקע'"
+
+def show_email_status(status, message, detail=""):
+    """Show a dispatch_email result - a queued email is shown as pending, not as sent"""
+    if status == 'failed':
+        st.error(f"❌ {message}")
+    elif status == 'sent':
+        st.success(f"✅ {message}{detail}")
+    else:
+        st.info(f"📤 {message}{detail}")
+
+def order_email_key(kind, to_email, orders_data, *extra):
+    """Idempotency key for a per-order notice: same kind, orders and day -> sent once"""
+    order_numbers = sorted(str(o.get('Order number', '')) for o in orders_data)
+    return make_idempotency_key(kind, to_email, datetime.now().strftime('%Y-%m-%d'), *order_numbers, *extra)
+
+def render_email_jobs_status():
+    """Sidebar panel with the state of emails queued in this session"""
+    jobs = st.session_state.get('email_jobs', [])
+    if not jobs:
+        return
+    pending = sum(1 for job in jobs if job.status == 'pending')
+    label = f"📬 מיילים ברקע ({pending} בתור)" if pending else "📬 מיילים ברקע"
+    with st.expander(label, expanded=pending > 0):
+        icons = {'pending': '⏳', 'sent': '✅', 'failed': '❌'}
+        for job in reversed(jobs[-10:]):
+            status = job.status
+            st.caption(f"{icons[status]} {job.subject[:50]} → {job.to_email}")
+            if status == 'failed':
+                st.caption(f"   {job.result()[1][:120]}")
+        if st.button("🔄 רענן סטטוס", key="refresh_email_jobs", use_container_width=True):
+            st.rerun()
+
+@timed('email_send')
+def send_unpaid_reminder_email(unpaid_orders, to_email=OPERATIONS_EMAIL):
+    """Queue the unpaid-orders reminder (same email as daily_reminder.py) without blocking the page"""
+    from daily_reminder import build_mark_paid_url
+    subject, email_body = report_engine.build_daily_reminder(unpaid_orders, build_mark_paid_url)
+    return dispatch_email(to_email, subject, email_body,
+                          idempotency_key=report_engine.report_idempotency_key('daily_reminder', to_email, subject))
+
+@timed('email_send')
 def send_payment_collection_email(orders_data):
     """Send payment collection email to accounting"""
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         error_msg = (
@@ -114,68 +163,21 @@ def send_payment_collection_email(orders_data):
             "RESEND_API_KEY = \"re_xxxxxxxxxxxxxxxxxxxxxxxxxx\"\n"
             "RESEND_FROM_EMAIL = \"info@tiktik.co.il\""
         )
-        return False, error_msg
-    
-    resend.api_key = api_key
-    
-    email_body = "<h2>הודעת גבייה - הזמנות נשלחו ולא שולמו</h2>"
-    email_body += f"<p>תאריך: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>"
-    email_body += "<hr>"
-    
-    for idx, order in enumerate(orders_data):
-        order_num = order.get('Order number', '-')
-        event_name = order.get('event name', '-')
-        docket = order.get('docket number', order.get('docket', order.get('Docket', '-')))
-        source = order.get('source', '-')
-        supp_order = order.get('SUPP order number', '-')
-        event_date = order.get('Date of the event', '-')
-        qty = order.get('Qty', order.get('QTY', '-'))
-        price_sold = order.get('Price sold', '-')
-        total_sold = order.get('total sold', order.get('TOTAL', order.get('TOTAL_clean', '-')))
-        supp_price = order.get('SUPP PRICE', '-')
-        
-        if total_sold and total_sold != '-':
-            try:
-                total_display = f"€{float(str(total_sold).replace('€','').replace(',','').strip()):,.2f}"
-            except:
-                total_display = str(total_sold)
-        else:
-            total_display = '-'
-        
-        email_body += f"""
-        <div style="background: #fff3cd; padding: 15px; margin: 10px 0; border-radius: 8px; border-right: 4px solid #ffc107;">
-            <h3>הזמנה #{idx+1}</h3>
-            <table style="width: 100%;">
-                <tr><td><strong>מספר הזמנה:</strong></td><td>{order_num}</td></tr>
-                <tr><td><strong>שם אירוע:</strong></td><td>{event_name}</td></tr>
-                <tr><td><strong>מספר דוקט:</strong></td><td>{docket}</td></tr>
-                <tr><td><strong>מקור:</strong></td><td>{source}</td></tr>
-                <tr><td><strong>מספר הזמנה ספק:</strong></td><td>{supp_order}</td></tr>
-                <tr><td><strong>תאריך אירוע:</strong></td><td>{event_date}</td></tr>
-                <tr><td><strong>כמות:</strong></td><td>{qty}</td></tr>
-                <tr><td><strong>מחיר מקורי לכרטיס:</strong></td><td>{price_sold}</td></tr>
-                <tr style="background: #ffc107;"><td><strong>סכום לגבייה:</strong></td><td><strong>{total_display}</strong></td></tr>
-                <tr><td><strong>מחיר ספק:</strong></td><td>{supp_price}</td></tr>
-            </table>
-        </div>
-        """
+        return 'failed', error_msg
     
-    email_body += "<hr><p style='color: #666;'>הודעה זו נשלחה אוטומטית ממערכת ניהול הזמנות כרטיסים</p>"
+    email_body, _ = render_payment_collection_email(orders_data, datetime.now())
     
-    try:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [ACCOUNTING_EMAIL],
-            "subject": f"🔔 גבייה נדרשת - {len(orders_data)} הזמנות נשלחו ולא שולמו",
-            "html": email_body
-        })
-        return True, f"המייל נשלח בהצלחה! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    return dispatch_email(
+        ACCOUNTING_EMAIL,
+        f"🔔 גבייה נדרשת - {len(orders_data)} הזמנות נשלחו ולא שולמו",
+        email_body,
+        idempotency_key=order_email_key('collection', ACCOUNTING_EMAIL, orders_data)
+    )
 
+@timed('email_send')
 def send_not_paid_email(orders_data):
     """Send NOT PAID alert email to operations - RED THEME"""
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         error_msg = (
@@ -184,77 +186,23 @@ def send_not_paid_email(orders_data):
             "RESEND_API_KEY = \"re_xxxxxxxxxxxxxxxxxxxxxxxxxx\"\n"
             "RESEND_FROM_EMAIL = \"info@tiktik.co.il\""
         )
-        return False, error_msg
-    
-    resend.api_key = api_key
-    
-    email_body = "<h2 style='color: #dc2626;'>🔴 התראת תשלום - הזמנות נשלחו ולא שולמו!</h2>"
-    email_body += f"<p>תאריך: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>"
-    email_body += "<p style='background: #dc2626; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>⚠️ נדרשת פעולה - גביית תשלום</strong></p>"
-    email_body += "<hr>"
-    
-    total_amount = 0
-    for idx, order in enumerate(orders_data):
-        order_num = order.get('Order number', '-')
-        event_name = order.get('event name', '-')
-        docket = order.get('docket number', order.get('docket', order.get('Docket', '-')))
-        source = order.get('source', '-')
-        supp_order = order.get('SUPP order number', '-')
-        event_date = order.get('Date of the event', '-')
-        qty = order.get('Qty', order.get('QTY', '-'))
-        price_sold = order.get('Price sold', '-')
-        total_sold = order.get('total sold', order.get('TOTAL', order.get('TOTAL_clean', '-')))
-        supp_price = order.get('SUPP PRICE', '-')
-        
-        if total_sold and total_sold != '-':
-            try:
-                amount = float(str(total_sold).replace('€','').replace('£','').replace('$','').replace(',','').strip())
-                total_amount += amount
-                total_display = f"€{amount:,.2f}"
-            except:
-                total_display = str(total_sold)
-        else:
-            total_display = '-'
-        
-        email_body += f"""
-        <div style="background: #fee2e2; padding: 15px; margin: 10px 0; border-radius: 8px; border-right: 4px solid #dc2626;">
-            <h3 style="color: #dc2626;">🔴 הזמנה #{idx+1} - לא שולם!</h3>
-            <table style="width: 100%;">
-                <tr><td><strong>מספר הזמנה:</strong></td><td>{order_num}</td></tr>
-                <tr><td><strong>שם אירוע:</strong></td><td>{event_name}</td></tr>
-                <tr><td><strong>מספר דוקט:</strong></td><td>{docket}</td></tr>
-                <tr><td><strong>מקור:</strong></td><td>{source}</td></tr>
-                <tr><td><strong>מספר הזמנה ספק:</strong></td><td>{supp_order}</td></tr>
-                <tr><td><strong>תאריך אירוע:</strong></td><td>{event_date}</td></tr>
-                <tr><td><strong>כמות:</strong></td><td>{qty}</td></tr>
-                <tr><td><strong>מחיר מקורי לכרטיס:</strong></td><td>{price_sold}</td></tr>
-                <tr style="background: #dc2626; color: white;"><td><strong>סכום לגבייה:</strong></td><td><strong>{total_display}</strong></td></tr>
-                <tr><td><strong>מחיר ספק:</strong></td><td>{supp_price}</td></tr>
-            </table>
-        </div>
-        """
+        return 'failed', error_msg
     
-    if total_amount > 0:
-        email_body += f"<div style='background: #dc2626; color: white; padding: 15px; border-radius: 8px; text-align: center; margin-top: 20px;'><h2>סה\"כ לגבייה: €{total_amount:,.2f}</h2></div>"
+    email_body, _ = render_not_paid_email(orders_data, datetime.now())
     
-    email_body += "<hr><p style='color: #666;'>הודעה זו נשלחה אוטומטית ממערכת ניהול הזמנות כרטיסים</p>"
-    
-    try:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [OPERATIONS_EMAIL],
-            "subject": f"🔴 התראת תשלום - {len(orders_data)} הזמנות לא שולמו!",
-            "html": email_body
-        })
-        return True, f"המייל נשלח בהצלחה! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    return dispatch_email(
+        OPERATIONS_EMAIL,
+        f"🔴 התראת תשלום - {len(orders_data)} הזמנות לא שולמו!",
+        email_body,
+        idempotency_key=order_email_key('not_paid', OPERATIONS_EMAIL, orders_data)
+    )
 
+@timed('email_send')
 def send_payment_confirmation_email(orders_data, payment_method, attachment_data=None, attachment_name=None):
     """Send payment confirmation email to operations with optional attachment"""
     import base64
     
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         error_msg = (
@@ -263,87 +211,39 @@ def send_payment_confirmation_email(orders_data, payment_method, attachment_data
             "RESEND_API_KEY = \"re_xxxxxxxxxxxxxxxxxxxxxxxxxx\"\n"
             "RESEND_FROM_EMAIL = \"info@tiktik.co.il\""
         )
-        return False, error_msg
-    
-    resend.api_key = api_key
-    
-    email_body = "<h2>✅ אישור תשלום - הזמנות נשלחו ושולמו</h2>"
-    email_body += f"<p>תאריך: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>"
-    email_body += f"<p style='background: #28a745; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>אמצעי תשלום: {payment_method}</strong></p>"
-    email_body += "<hr>"
-    
-    for idx, order in enumerate(orders_data):
-        order_num = order.get('Order number', '-')
-        event_name = order.get('event name', '-')
-        docket = order.get('docket number', order.get('docket', order.get('Docket', '-')))
-        source = order.get('source', '-')
-        supp_order = order.get('SUPP order number', '-')
-        event_date = order.get('Date of the event', '-')
-        qty = order.get('Qty', order.get('QTY', '-'))
-        price_sold = order.get('Price sold', '-')
-        total_sold = order.get('total sold', order.get('TOTAL', order.get('TOTAL_clean', '-')))
-        supp_price = order.get('SUPP PRICE', '-')
-        
-        if total_sold and total_sold != '-':
-            try:
-                total_display = f"€{float(str(total_sold).replace('€','').replace(',','').strip()):,.2f}"
-            except:
-                total_display = str(total_sold)
-        else:
-            total_display = '-'
-        
-        email_body += f"""
-        <div style="background: #d4edda; padding: 15px; margin: 10px 0; border-radius: 8px; border-right: 4px solid #28a745;">
-            <h3>הזמנה #{idx+1} - שולם ✅</h3>
-            <table style="width: 100%;">
-                <tr><td><strong>מספר הזמנה:</strong></td><td>{order_num}</td></tr>
-                <tr><td><strong>שם אירוע:</strong></td><td>{event_name}</td></tr>
-                <tr><td><strong>מספר דוקט:</strong></td><td>{docket}</td></tr>
-                <tr><td><strong>מקור:</strong></td><td>{source}</td></tr>
-                <tr><td><strong>מספר הזמנה ספק:</strong></td><td>{supp_order}</td></tr>
-                <tr><td><strong>תאריך אירוע:</strong></td><td>{event_date}</td></tr>
-                <tr><td><strong>כמות:</strong></td><td>{qty}</td></tr>
-                <tr><td><strong>מחיר מקורי לכרטיס:</strong></td><td>{price_sold}</td></tr>
-                <tr style="background: #28a745; color: white;"><td><strong>סכום ששולם:</strong></td><td><strong>{total_display}</strong></td></tr>
-                <tr><td><strong>מחיר ספק:</strong></td><td>{supp_price}</td></tr>
-                <tr style="background: #17a2b8; color: white;"><td><strong>אמצעי תשלום:</strong></td><td><strong>{payment_method}</strong></td></tr>
-            </table>
-        </div>
-        """
+        return 'failed', error_msg
     
-    if attachment_data and attachment_name:
-        email_body += f"<p style='background: #17a2b8; color: white; padding: 8px; border-radius: 5px;'>📎 קובץ אישור תשלום מצורף: {attachment_name}</p>"
-    
-    email_body += "<hr><p style='color: #666;'>הודעה זו נשלחה אוטומטית ממערכת ניהול הזמנות כרטיסים</p>"
+    email_body, _ = render_payment_confirmation_email(
+        orders_data, payment_method, datetime.now(),
+        attachment_name=attachment_name if attachment_data else None
+    )
     
-    try:
-        email_params = {
-            "from": from_email,
-            "to": [ACCOUNTING_EMAIL],
-            "subject": f"✅ אישור תשלום - {len(orders_data)} הזמנות שולמו ({payment_method})",
-            "html": email_body
-        }
-        
-        if attachment_data and attachment_name:
-            encoded_content = base64.b64encode(attachment_data).decode('utf-8')
-            email_params["attachments"] = [{
-                "filename": attachment_name,
-                "content": encoded_content
-            }]
-        
-        result = resend.Emails.send(email_params)
-        attachment_msg = " + קובץ מצורף" if attachment_data else ""
-        return True, f"המייל נשלח בהצלחה{attachment_msg}! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    attachments = None
+    if attachment_data and attachment_name:
+        attachments = [{
+            "filename": attachment_name,
+            "content": base64.b64encode(attachment_data).decode('utf-8')
+        }]
+    
+    status, message = dispatch_email(
+        ACCOUNTING_EMAIL,
+        f"✅ אישור תשלום - {len(orders_data)} הזמנות שולמו ({payment_method})",
+        email_body,
+        attachments=attachments,
+        idempotency_key=order_email_key('paid', ACCOUNTING_EMAIL, orders_data, payment_method, attachment_name or '')
+    )
+    if status != 'failed' and attachment_data:
+        message += " + קובץ מצורף"
+    return status, message
 
 AUTO_REFRESH_INTERVAL_MS = 300000
 
 DEFAULT_NEW_ORDERS_EMAIL = "info@tiktik.co.il"
 
+@timed('email_send')
 def send_new_orders_report_email(orders_df, to_email):
     """Send email report with all orders in 'new' status (not yet purchased) - Professional CRM style"""
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         # Try to get diagnostic info
@@ -383,269 +283,18 @@ def send_new_orders_report_email(orders_df, to_email):
             "7. הפעל מחדש את האפליקציה (או לחץ על \"🔄 רענן נתונים\")"
             f"{diagnostic_info}"
         )
-        return False, error_msg
+        return 'failed', error_msg
     
     if orders_df.empty:
-        return False, "אין הזמנות חדשות לשלוח"
-    
-    resend.api_key = api_key
-    
-    israel_tz = pytz.timezone('Israel')
-    now = datetime.now(israel_tz)
-    
-    if 'TOTAL_clean' not in orders_df.columns:
-        if 'TOTAL' in orders_df.columns:
-            orders_df = orders_df.copy()
-            orders_df['TOTAL_clean'] = pd.to_numeric(
-                orders_df['TOTAL'].astype(str).str.replace('€', '').str.replace('£', '').str.replace('$', '').str.replace(',', '').str.strip(),
-                errors='coerce'
-            ).fillna(0)
-        else:
-            orders_df = orders_df.copy()
-            orders_df['TOTAL_clean'] = 0.0
-    
-    if 'parsed_date' not in orders_df.columns and 'Date of the event' in orders_df.columns:
-        orders_df = orders_df.copy() if 'TOTAL_clean' in orders_df.columns else orders_df
-        orders_df['parsed_date'] = pd.to_datetime(orders_df['Date of the event'], errors='coerce', dayfirst=True)
-    
-    total_tickets = int(pd.to_numeric(orders_df.get('Qty', 0), errors='coerce').sum())
-    total_amount = orders_df['TOTAL_clean'].sum() if 'TOTAL_clean' in orders_df.columns else 0
-    num_orders = len(orders_df)
-    
-    unique_events = orders_df['event name'].nunique() if 'event name' in orders_df.columns else 0
-    unique_sources = orders_df['source'].nunique() if 'source' in orders_df.columns else 0
-    
-    urgent_orders = 0
-    upcoming_7_days = 0
-    if 'parsed_date' in orders_df.columns:
-        today = datetime.now()
-        week_ahead = today + timedelta(days=7)
-        upcoming_mask = (orders_df['parsed_date'].notna()) & (orders_df['parsed_date'] <= week_ahead) & (orders_df['parsed_date'] >= today)
-        upcoming_7_days = upcoming_mask.sum()
-        urgent_orders = upcoming_7_days
-    
-    source_breakdown = ""
-    if 'source' in orders_df.columns:
-        source_counts = orders_df.groupby('source').agg({
-            'Order number': 'count',
-            'Qty': lambda x: pd.to_numeric(x, errors='coerce').sum()
-        }).reset_index()
-        source_counts.columns = ['source', 'orders', 'tickets']
-        source_counts = source_counts.sort_values('tickets', ascending=False)
-        
-        source_breakdown = "<table style='width: 100%; margin: 10px 0;'>"
-        for _, row in source_counts.head(5).iterrows():
-            source_breakdown += f"<tr><td style='padding: 5px;'>{row['source']}</td><td style='padding: 5px; text-align: left;'>{int(row['orders'])} הזמנות | {int(row['tickets'])} כרטיסים</td></tr>"
-        source_breakdown += "</table>"
-    
-    top_events = ""
-    if 'event name' in orders_df.columns:
-        event_counts = orders_df.groupby('event name').agg({
-            'Order number': 'count',
-            'Qty': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-            'TOTAL_clean': 'sum'
-        }).reset_index()
-        event_counts.columns = ['event', 'orders', 'tickets', 'value']
-        event_counts = event_counts.sort_values('value', ascending=False)
-        
-        top_events = ""
-        for i, row in event_counts.head(3).iterrows():
-            top_events += f"<div style='background: #f8f9fa; padding: 10px; margin: 5px 0; border-radius: 5px; border-right: 3px solid #667eea;'>"
-            top_events += f"<strong>{row['event'][:50]}...</strong><br>"
-            top_events += f"<span style='color: #666;'>{int(row['orders'])} הזמנות | {int(row['tickets'])} כרטיסים | €{row['value']:,.0f}</span>"
-            top_events += "</div>"
-    
-    avg_ticket_value = total_amount / total_tickets if total_tickets > 0 else 0
-    
-    email_body = f"""
-    <!DOCTYPE html>
-    <html dir="rtl" lang="he">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            @media only screen and (max-width: 600px) {{
-                .main-container {{ padding: 10px !important; }}
-                .metric-box {{ width: 48% !important; margin-bottom: 10px !important; }}
-                .metric-value {{ font-size: 28px !important; }}
-                .insight-card {{ width: 100% !important; margin-bottom: 15px !important; }}
-                .stats-row td {{ display: block !important; width: 100% !important; margin-bottom: 10px !important; }}
-                .order-table {{ font-size: 11px !important; }}
-                .order-table th, .order-table td {{ padding: 5px 3px !important; }}
-            }}
-        </style>
-    </head>
-    <body style="margin: 0; padding: 0; background: #f0f2f5;">
-    <div dir="rtl" class="main-container" style="font-family: 'Segoe UI', Arial, sans-serif; max-width: 800px; margin: 0 auto; background: white;">
-        
-        <!-- Header -->
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px 20px; text-align: center;">
-            <h1 style="margin: 0; font-size: 24px;">📊 דוח יומי - כרטיסים לרכישה</h1>
-            <p style="margin: 10px 0 0 0; opacity: 0.9; font-size: 14px;">קוד יהודה | {now.strftime('%d/%m/%Y %H:%M')}</p>
-        </div>
-        
-        <!-- Executive Summary - Mobile Friendly -->
-        <div style="background: #1a1a2e; color: white; padding: 20px;">
-            <h2 style="margin: 0 0 15px 0; color: #ffd700; font-size: 18px;">⚡ סיכום מנהלים</h2>
-            
-            <table style="width: 100%; border-spacing: 8px;">
-                <tr>
-                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
-                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #667eea;">{num_orders}</div>
-                        <div style="color: #aaa; font-size: 12px;">הזמנות פתוחות</div>
-                    </td>
-                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
-                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #28a745;">{total_tickets}</div>
-                        <div style="color: #aaa; font-size: 12px;">כרטיסים לרכישה</div>
-                    </td>
-                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
-                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #17a2b8;">€{total_amount:,.0f}</div>
-                        <div style="color: #aaa; font-size: 12px;">שווי כולל</div>
-                    </td>
-                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
-                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #ffc107;">{unique_events}</div>
-                        <div style="color: #aaa; font-size: 12px;">אירועים שונים</div>
-                    </td>
-                </tr>
-            </table>
-        </div>
-        
-        <!-- Alerts Section -->
-        {"" if urgent_orders == 0 else f'''
-        <div style="background: linear-gradient(90deg, #dc3545, #c82333); color: white; padding: 15px 20px;">
-            <strong>🚨 התראה דחופה:</strong> {urgent_orders} הזמנות עם אירועים ב-7 ימים הקרובים!
-        </div>
-        '''}
-        
-        <!-- Insights Section -->
-        <div style="background: #f8f9fa; padding: 25px;">
-            <h2 style="margin: 0 0 20px 0; color: #333;">📈 תובנות מפתח</h2>
-            
-            <table style="width: 100%;">
-                <tr>
-                    <td style="width: 50%; vertical-align: top; padding: 10px;">
-                        <div style="background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-                            <h3 style="margin: 0 0 10px 0; color: #667eea;">🏆 אירועים מובילים (לפי שווי)</h3>
-                            {top_events if top_events else "<p>אין נתונים</p>"}
-                        </div>
-                    </td>
-                    <td style="width: 50%; vertical-align: top; padding: 10px;">
-                        <div style="background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-                            <h3 style="margin: 0 0 10px 0; color: #667eea;">📊 פילוח לפי מקור</h3>
-                            {source_breakdown if source_breakdown else "<p>אין נתונים</p>"}
-                        </div>
-                    </td>
-                </tr>
-            </table>
-            
-            <div style="background: white; padding: 20px; border-radius: 10px; margin-top: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-                <h3 style="margin: 0 0 15px 0; color: #667eea;">📊 מדדים נוספים</h3>
-                <table style="width: 100%;">
-                    <tr>
-                        <td style="padding: 10px; background: #e8f5e9; border-radius: 5px; text-align: center;">
-                            <div style="font-size: 24px; font-weight: bold; color: #28a745;">€{avg_ticket_value:,.0f}</div>
-                            <div style="color: #666; font-size: 12px;">ממוצע לכרטיס</div>
-                        </td>
-                        <td style="padding: 10px; background: #e3f2fd; border-radius: 5px; text-align: center;">
-                            <div style="font-size: 24px; font-weight: bold; color: #1976d2;">{unique_sources}</div>
-                            <div style="color: #666; font-size: 12px;">מקורות מכירה</div>
-                        </td>
-                        <td style="padding: 10px; background: #fff3e0; border-radius: 5px; text-align: center;">
-                            <div style="font-size: 24px; font-weight: bold; color: #f57c00;">{total_tickets / num_orders:.1f}</div>
-                            <div style="color: #666; font-size: 12px;">כרטיסים/הזמנה</div>
-                        </td>
-                        <td style="padding: 10px; background: #fce4ec; border-radius: 5px; text-align: center;">
-                            <div style="font-size: 24px; font-weight: bold; color: #c2185b;">€{total_amount / num_orders:,.0f}</div>
-                            <div style="color: #666; font-size: 12px;">ממוצע להזמנה</div>
-                        </td>
-                    </tr>
-                </table>
-            </div>
-        </div>
-        
-        <!-- Order Details -->
-        <div style="padding: 25px;">
-            <h2 style="margin: 0 0 20px 0; color: #333;">📋 פירוט הזמנות ({num_orders})</h2>
-            
-            <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
-                <thead>
-                    <tr style="background: #667eea; color: white;">
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">#</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">אירוע</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">תאריך</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">קטגוריה</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">כמות</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">מס' הזמנה</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">מקור</th>
-                        <th style="padding: 12px 8px; border: 1px solid #ddd;">סכום</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    for idx, (_, order) in enumerate(orders_df.iterrows()):
-        event_name = str(order.get('event name', '-'))[:40]
-        event_date = order.get('Date of the event', '-')
-        category = order.get('Category / Section', '-')
-        qty = order.get('Qty', '-')
-        order_num = order.get('Order number', '-')
-        source = order.get('source', '-')
-        total = order.get('TOTAL_clean', 0)
-        
-        row_bg = '#ffffff' if idx % 2 == 0 else '#f8f9fa'
-        
-        email_body += f"""
-                <tr style="background: {row_bg};">
-                    <td style="padding: 8px; border: 1px solid #eee; text-align: center;">{idx + 1}</td>
-                    <td style="padding: 8px; border: 1px solid #eee;">{event_name}</td>
-                    <td style="padding: 8px; border: 1px solid #eee;">{event_date}</td>
-                    <td style="padding: 8px; border: 1px solid #eee;">{category}</td>
-                    <td style="padding: 8px; border: 1px solid #eee; text-align: center; font-weight: bold;">{qty}</td>
-                    <td style="padding: 8px; border: 1px solid #eee;">{order_num}</td>
-                    <td style="padding: 8px; border: 1px solid #eee;">{source}</td>
-                    <td style="padding: 8px; border: 1px solid #eee; text-align: left; font-weight: bold;">€{total:,.0f}</td>
-                </tr>
-        """
-    
-    email_body += f"""
-                </tbody>
-                <tfoot>
-                    <tr style="background: #333; color: white; font-weight: bold;">
-                        <td colspan="4" style="padding: 12px; border: 1px solid #333;">סה"כ</td>
-                        <td style="padding: 12px; border: 1px solid #333; text-align: center;">{total_tickets}</td>
-                        <td colspan="2" style="padding: 12px; border: 1px solid #333;"></td>
-                        <td style="padding: 12px; border: 1px solid #333; text-align: left;">€{total_amount:,.0f}</td>
-                    </tr>
-                </tfoot>
-            </table>
-        </div>
-        
-        <!-- Footer -->
-        <div style="background: #1a1a2e; color: #aaa; padding: 20px; text-align: center;">
-            <p style="margin: 0; font-size: 14px;">מערכת ניהול הזמנות כרטיסים - קוד יהודה</p>
-            <p style="margin: 8px 0 0 0; font-size: 11px;">דוח זה נוצר אוטומטית ב-{now.strftime('%d/%m/%Y %H:%M')}</p>
-            <p style="margin: 8px 0 0 0; font-size: 11px; color: #667eea;">📱 מותאם לצפייה במובייל</p>
-        </div>
-        
-    </div>
-    </body>
-    </html>
-    """
+        return 'failed', "אין הזמנות חדשות לשלוח"
     
-    try:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [to_email],
-            "subject": f"📊 דוח מנהלים | {num_orders} הזמנות | {total_tickets} כרטיסים | €{total_amount:,.0f}",
-            "html": email_body
-        })
-        return True, f"המייל נשלח בהצלחה! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    subject, email_body = report_engine.build_new_orders_report(orders_df)
+    return dispatch_email(to_email, subject, email_body, idempotency_key=report_engine.report_idempotency_key('new_orders_report', to_email, subject))
 
+@timed('email_send')
 def send_daily_sales_report_email(orders_df, to_email, report_date=None):
     """Send daily sales report - professional dark design"""
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         error_msg = (
@@ -654,185 +303,16 @@ def send_daily_sales_report_email(orders_df, to_email, report_date=None):
             "RESEND_API_KEY = \"re_xxxxxxxxxxxxxxxxxxxxxxxxxx\"\n"
             "RESEND_FROM_EMAIL = \"info@tiktik.co.il\""
         )
-        return False, error_msg
-    
-    resend.api_key = api_key
-    
-    israel_tz = pytz.timezone('Israel')
-    now = datetime.now(israel_tz)
-    
-    if report_date:
-        date_str = report_date.strftime('%d.%m.%Y')
-    else:
-        date_str = now.strftime('%d.%m.%Y')
-    
-    num_orders = len(orders_df)
-    total_tickets = int(pd.to_numeric(orders_df.get('Qty', 0), errors='coerce').sum())
-    avg_tickets = total_tickets / num_orders if num_orders > 0 else 0
-    total_revenue = orders_df['TOTAL_clean'].sum() if 'TOTAL_clean' in orders_df.columns else 0
-    total_cost = orders_df['SUPP_PRICE_clean'].sum() if 'SUPP_PRICE_clean' in orders_df.columns else 0
-    
-    orders_with_cost = orders_df[orders_df['SUPP_PRICE_clean'] > 0] if 'SUPP_PRICE_clean' in orders_df.columns else pd.DataFrame()
-    orders_without_cost = orders_df[~(orders_df['SUPP_PRICE_clean'] > 0)] if 'SUPP_PRICE_clean' in orders_df.columns else orders_df
-    
-    actual_profit = 0
-    if not orders_with_cost.empty:
-        if 'profit' in orders_with_cost.columns:
-            actual_profit = orders_with_cost['profit'].sum()
-        else:
-            actual_profit = orders_with_cost['TOTAL_clean'].sum() - orders_with_cost['SUPP_PRICE_clean'].sum()
-    
-    revenue_without_cost = orders_without_cost['TOTAL_clean'].sum() if not orders_without_cost.empty and 'TOTAL_clean' in orders_without_cost.columns else 0
-    potential_profit = revenue_without_cost * 0.30
-    
-    total_profit = actual_profit + potential_profit
-    profit_note = "*" if potential_profit > 0 else ""
-    profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-    
-    source_rows = ""
-    if 'source' in orders_df.columns:
-        source_stats = orders_df.groupby('source').agg({
-            'Order number': 'count',
-            'Qty': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-            'TOTAL_clean': 'sum',
-            'SUPP_PRICE_clean': 'sum'
-        }).reset_index()
-        source_stats.columns = ['source', 'orders', 'tickets', 'revenue', 'cost']
-        source_stats['avg_tickets'] = source_stats['tickets'] / source_stats['orders']
-        source_stats['profit'] = source_stats['revenue'] - source_stats['cost']
-        source_stats['margin'] = (source_stats['profit'] / source_stats['revenue'] * 100).fillna(0)
-        source_stats = source_stats.sort_values('revenue', ascending=False)
-        max_revenue = source_stats['revenue'].max() if not source_stats.empty else 1
-        
-        for _, row in source_stats.iterrows():
-            pct_width = int((row['revenue'] / max_revenue) * 100) if max_revenue > 0 else 0
-            margin_display = f"{row['margin']:.0f}%" if row['cost'] > 0 else "~30%"
-            source_rows += f"""<tr>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#f1f5f9;font-size:14px;">{row['source']}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{int(row['orders'])}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{int(row['tickets'])}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{row['avg_tickets']:.1f}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;text-align:left;">
-<span style="color:#38bdf8;font-family:Consolas,monospace;">EUR {row['revenue']:,.0f}</span>
-<div style="background:#2d3b55;height:4px;width:60px;border-radius:2px;margin-top:4px;"><div style="background:#38bdf8;height:4px;width:{pct_width}%;border-radius:2px;"></div></div>
-</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:left;font-family:Consolas,monospace;">EUR {row['cost']:,.0f}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#34d399;text-align:left;font-family:Consolas,monospace;">EUR {row['profit']:,.0f}</td>
-<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#a855f7;text-align:center;font-family:Consolas,monospace;">{margin_display}</td>
-</tr>"""
-    
-    potential_note_html = ""
-    if potential_profit > 0:
-        potential_note_html = f'<div style="color:#64748b;font-size:11px;margin-top:15px;text-align:center;">* כולל רווח פוטנציאלי משוער (30%) עבור הזמנות ללא עלות ספק</div>'
-    
-    email_body = f"""<!DOCTYPE html>
-<html lang="he" dir="rtl">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<style>
-body, table, td {{ -webkit-text-size-adjust: 100%; -ms-text-size-adjust: 100%; }}
-table {{ border-collapse: collapse !important; }}
-body {{ margin: 0 !important; padding: 0 !important; background-color: #162032; color: #e2e8f0; font-family: 'Segoe UI', Roboto, Arial, sans-serif; }}
-@media only screen and (max-width: 600px) {{
-.stats-cell {{ display: block !important; width: 100% !important; border-left: none !important; border-bottom: 1px solid #2d3b55 !important; }}
-.stats-cell:last-child {{ border-bottom: none !important; }}
-.inner-table {{ font-size: 12px !important; }}
-.inner-table td, .inner-table th {{ padding: 10px 8px !important; }}
-}}
-</style>
-</head>
-<body dir="rtl" style="background-color:#162032;">
-<table role="presentation" width="100%" cellspacing="0" cellpadding="0" border="0" style="background-color:#162032;">
-<tr><td align="center">
-<div class="email-container" style="width:100%;max-width:100%;background-color:#162032;overflow:hidden;">
-
-<div style="background:linear-gradient(180deg, #1e293b 0%, #162032 100%);padding:30px;border-bottom:1px solid #2d3b55;">
-<div style="display:inline-block;background-color:rgba(56,189,248,0.1);color:#38bdf8;padding:4px 10px;border-radius:4px;font-size:11px;font-weight:700;letter-spacing:1px;border:1px solid rgba(56,189,248,0.2);margin-bottom:10px;">DAILY REPORT</div>
-<h1 style="color:#ffffff;font-size:22px;margin:0;font-weight:300;">סיכום יומי: <span style="font-weight:700;">{date_str}</span></h1>
-<div style="color:#94a3b8;font-size:13px;margin-top:8px;">
-<span style="display:inline-block;height:8px;width:8px;background-color:#10b981;border-radius:50%;margin-left:6px;box-shadow:0 0 8px rgba(16,185,129,0.6);"></span>
-קוד יהודה | נוצר ב-{now.strftime('%H:%M')}
-</div>
-</div>
-
-<table width="100%" cellspacing="0" cellpadding="0" border="0">
-<tr>
-<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
-<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">הזמנות</div>
-<div style="font-size:26px;font-weight:700;color:#f8fafc;font-family:Consolas,monospace;">{num_orders}</div>
-</td>
-<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
-<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">כרטיסים</div>
-<div style="font-size:26px;font-weight:700;color:#f8fafc;font-family:Consolas,monospace;">{total_tickets}</div>
-</td>
-<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
-<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">הכנסה</div>
-<div style="font-size:26px;font-weight:700;color:#38bdf8;font-family:Consolas,monospace;">EUR {total_revenue:,.0f}</div>
-</td>
-<td class="stats-cell" style="padding:20px;text-align:center;width:25%;background:#1e293b;">
-<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">ממוצע/הזמנה</div>
-<div style="font-size:26px;font-weight:700;color:#a855f7;font-family:Consolas,monospace;">{avg_tickets:.1f}</div>
-</td>
-</tr>
-</table>
-
-<div style="margin:20px;background-color:#1e293b;border-radius:8px;border:1px solid #334155;overflow:hidden;">
-<div style="padding:16px 20px;border-bottom:1px solid #334155;background:linear-gradient(90deg, #1e293b 0%, #243045 100%);position:relative;">
-<div style="position:absolute;right:0;top:0;bottom:0;width:4px;background-color:#3b82f6;box-shadow:-4px 0 15px rgba(59,130,246,0.5);"></div>
-<span style="font-size:15px;font-weight:600;color:#f1f5f9;">פירוט לפי מקור</span>
-</div>
-<table class="inner-table" width="100%" cellspacing="0" cellpadding="0" style="background-color:#1a253a;">
-<tr style="background-color:#172133;">
-<th style="text-align:right;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">מקור</th>
-<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">הזמנות</th>
-<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">כרטיסים</th>
-<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">ממוצע</th>
-<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">הכנסה</th>
-<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">עלות</th>
-<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">רווח</th>
-<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">מרווח</th>
-</tr>
-{source_rows}
-</table>
-</div>
-
-<div style="background:#111827;padding:25px;margin:20px;border-radius:8px;border:1px solid #374151;text-align:center;position:relative;overflow:hidden;">
-<div style="position:absolute;top:50%;left:50%;transform:translate(-50%,-50%);width:200px;height:200px;background:radial-gradient(circle, rgba(52,211,153,0.1) 0%, rgba(0,0,0,0) 70%);"></div>
-<div style="position:relative;z-index:1;">
-<div style="color:#9ca3af;font-size:12px;letter-spacing:2px;text-transform:uppercase;margin-bottom:5px;">רווח כולל{profit_note}</div>
-<div style="font-size:42px;font-weight:700;color:#34d399;letter-spacing:-1px;text-shadow:0 0 25px rgba(52,211,153,0.2);font-family:Consolas,monospace;">EUR {total_profit:,.0f}</div>
-<div style="color:#64748b;font-size:13px;margin-top:8px;">מרווח רווח: {profit_margin:.1f}%</div>
-</div>
-{potential_note_html}
-</div>
-
-<div style="text-align:center;padding:25px;border-top:1px solid #1e293b;background-color:#0f172a;">
-<div style="color:#475569;font-size:12px;line-height:1.5;">מערכת ניהול הזמנות - קוד יהודה</div>
-<div style="color:#38bdf8;font-size:11px;margin-top:8px;">{now.strftime('%d.%m.%Y %H:%M')}</div>
-</div>
-
-</div>
-</td></tr>
-</table>
-</body>
-</html>"""
+        return 'failed', error_msg
     
-    try:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [to_email],
-            "subject": f"Daily Report {date_str} | {num_orders} Orders | EUR {total_revenue:,.0f} | Profit EUR {total_profit:,.0f}",
-            "html": email_body
-        })
-        return True, f"המייל נשלח בהצלחה! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    subject, email_body = report_engine.build_daily_sales_report(orders_df, report_date)
+    return dispatch_email(to_email, subject, email_body, idempotency_key=report_engine.report_idempotency_key('daily_sales_report', to_email, subject))
 
 
+@timed('email_send')
 def send_weekly_sales_report_email(orders_df, to_email, week_start_date=None, week_end_date=None):
     """Send weekly sales report - summary of the week's sales"""
-    api_key, from_email = get_resend_credentials()
+    api_key, from_email = get_email_dispatcher().get_credentials()
     
     if not api_key or not from_email:
         error_msg = (
@@ -841,187 +321,10 @@ def send_weekly_sales_report_email(orders_df, to_email, week_start_date=None, we
             "RESEND_API_KEY = \"re_xxxxxxxxxxxxxxxxxxxxxxxxxx\"\n"
             "RESEND_FROM_EMAIL = \"info@tiktik.co.il\""
         )
-        return False, error_msg
-    
-    resend.api_key = api_key
-    
-    israel_tz = pytz.timezone('Israel')
-    now = datetime.now(israel_tz)
-    
-    if week_start_date and week_end_date:
-        week_start = week_start_date.strftime('%d/%m/%Y')
-        week_end = week_end_date.strftime('%d/%m/%Y')
-        days_in_week = (week_end_date - week_start_date).days + 1
-    else:
-        week_start = (now - timedelta(days=7)).strftime('%d/%m/%Y')
-        week_end = now.strftime('%d/%m/%Y')
-        days_in_week = 7
-    
-    num_orders = len(orders_df)
-    total_tickets = int(pd.to_numeric(orders_df.get('Qty', 0), errors='coerce').sum())
-    total_revenue = orders_df['TOTAL_clean'].sum() if 'TOTAL_clean' in orders_df.columns else 0
-    
-    orders_with_cost = orders_df[orders_df['SUPP_PRICE_clean'] > 0] if 'SUPP_PRICE_clean' in orders_df.columns else pd.DataFrame()
-    orders_without_cost = orders_df[~(orders_df['SUPP_PRICE_clean'] > 0)] if 'SUPP_PRICE_clean' in orders_df.columns else orders_df
-    
-    actual_profit = 0
-    if not orders_with_cost.empty:
-        if 'profit' in orders_with_cost.columns:
-            actual_profit = orders_with_cost['profit'].sum()
-        else:
-            actual_profit = orders_with_cost['TOTAL_clean'].sum() - orders_with_cost['SUPP_PRICE_clean'].sum()
-    
-    revenue_without_cost = orders_without_cost['TOTAL_clean'].sum() if not orders_without_cost.empty and 'TOTAL_clean' in orders_without_cost.columns else 0
-    potential_profit = revenue_without_cost * 0.30
-    
-    total_profit = actual_profit + potential_profit
-    profit_label = "רווח פוטנציאלי (30%)" if potential_profit > actual_profit else "רווח"
-    
-    unique_events = orders_df['event name'].nunique() if 'event name' in orders_df.columns else 0
-    unique_sources = orders_df['source'].nunique() if 'source' in orders_df.columns else 0
-    
-    avg_daily_orders = num_orders / days_in_week if days_in_week > 0 else 0
-    avg_daily_revenue = total_revenue / days_in_week if days_in_week > 0 else 0
-    avg_daily_profit = total_profit / days_in_week if days_in_week > 0 else 0
-    profit_margin = 30.0 if potential_profit > actual_profit else ((actual_profit / orders_with_cost['TOTAL_clean'].sum() * 100) if not orders_with_cost.empty and orders_with_cost['TOTAL_clean'].sum() > 0 else 0)
-    avg_ticket_price = total_revenue / total_tickets if total_tickets > 0 else 0
-    tickets_per_order = total_tickets / num_orders if num_orders > 0 else 0
-    
-    source_breakdown = ""
-    if 'source' in orders_df.columns:
-        source_stats = orders_df.groupby('source').agg({
-            'Order number': 'count',
-            'Qty': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-            'TOTAL_clean': 'sum'
-        }).reset_index()
-        source_stats.columns = ['source', 'orders', 'tickets', 'revenue']
-        source_stats = source_stats.sort_values('revenue', ascending=False)
-        
-        for _, row in source_stats.head(4).iterrows():
-            pct = (row['revenue'] / total_revenue * 100) if total_revenue > 0 else 0
-            source_breakdown += f"<div style='padding:8px;margin:4px 0;background:#fff;border-radius:5px;'><b>{row['source']}</b><br><span style='color:#666;font-size:12px;'>{int(row['orders'])} הזמנות | €{row['revenue']:,.0f} ({pct:.0f}%)</span></div>"
-    
-    top_events = ""
-    if 'event name' in orders_df.columns:
-        event_stats = orders_df.groupby('event name').agg({
-            'Order number': 'count',
-            'Qty': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-            'TOTAL_clean': 'sum'
-        }).reset_index()
-        event_stats.columns = ['event', 'orders', 'tickets', 'revenue']
-        event_stats = event_stats.sort_values('revenue', ascending=False)
-        
-        for _, row in event_stats.head(4).iterrows():
-            event_display = str(row['event'])[:28]
-            top_events += f"<div style='padding:8px;margin:4px 0;background:#fff;border-radius:5px;border-right:3px solid #6f42c1;'><b>{event_display}...</b><br><span style='color:#666;font-size:12px;'>{int(row['orders'])} הזמנות | €{row['revenue']:,.0f}</span></div>"
-    
-    email_body = f"""<!DOCTYPE html>
-<html dir="rtl" lang="he">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-</head>
-<body style="margin:0;padding:0;background:#f0f2f5;font-family:Arial,sans-serif;">
-<div dir="rtl" style="max-width:600px;margin:0 auto;background:#fff;">
-
-<div style="background:linear-gradient(135deg,#6f42c1,#9b59b6);color:#fff;padding:20px;text-align:center;">
-<div style="font-size:22px;font-weight:bold;">📊 דוח מכירות שבועי</div>
-<div style="font-size:13px;opacity:0.9;margin-top:5px;">קוד יהודה | {week_start} - {week_end}</div>
-</div>
-
-<div style="background:#1a1a2e;color:#fff;padding:15px;">
-<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
-<div style="flex:1;min-width:70px;padding:10px;">
-<div style="font-size:26px;font-weight:bold;color:#6f42c1;">{num_orders}</div>
-<div style="font-size:11px;color:#aaa;">הזמנות</div>
-</div>
-<div style="flex:1;min-width:70px;padding:10px;">
-<div style="font-size:26px;font-weight:bold;color:#17a2b8;">{total_tickets}</div>
-<div style="font-size:11px;color:#aaa;">כרטיסים</div>
-</div>
-<div style="flex:1;min-width:70px;padding:10px;">
-<div style="font-size:26px;font-weight:bold;color:#28a745;">€{total_revenue:,.0f}</div>
-<div style="font-size:11px;color:#aaa;">הכנסות</div>
-</div>
-<div style="flex:1;min-width:70px;padding:10px;">
-<div style="font-size:26px;font-weight:bold;color:#ffc107;">€{total_profit:,.0f}</div>
-<div style="font-size:11px;color:#aaa;">{profit_label}</div>
-</div>
-</div>
-</div>
-
-<div style="padding:15px;background:#f8f9fa;">
-<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">📈 ממוצעים יומיים</div>
-<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
-<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#f3e5f5;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#6f42c1;">{avg_daily_orders:.1f}</div>
-<div style="font-size:10px;color:#666;">הזמנות/יום</div>
-</div>
-<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#e8f5e9;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#28a745;">€{avg_daily_revenue:,.0f}</div>
-<div style="font-size:10px;color:#666;">הכנסות/יום</div>
-</div>
-<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#fff3e0;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#f57c00;">€{avg_daily_profit:,.0f}</div>
-<div style="font-size:10px;color:#666;">רווח/יום</div>
-</div>
-<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#e3f2fd;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#1976d2;">{profit_margin:.0f}%</div>
-<div style="font-size:10px;color:#666;">מרווח</div>
-</div>
-</div>
-</div>
-
-<div style="padding:15px;background:#fff;">
-<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">🏆 אירועים מובילים</div>
-{top_events if top_events else "<div style='color:#666;'>אין נתונים</div>"}
-</div>
-
-<div style="padding:15px;background:#f8f9fa;">
-<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">📊 מקורות</div>
-{source_breakdown if source_breakdown else "<div style='color:#666;'>אין נתונים</div>"}
-</div>
-
-<div style="padding:15px;background:#fff;">
-<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
-<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#f3e5f5;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#6f42c1;">{unique_events}</div>
-<div style="font-size:10px;color:#666;">אירועים</div>
-</div>
-<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#e8f5e9;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#28a745;">{unique_sources}</div>
-<div style="font-size:10px;color:#666;">מקורות</div>
-</div>
-<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#e3f2fd;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#1976d2;">€{avg_ticket_price:,.0f}</div>
-<div style="font-size:10px;color:#666;">ממוצע/כרטיס</div>
-</div>
-<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#fff3e0;border-radius:8px;">
-<div style="font-size:18px;font-weight:bold;color:#f57c00;">{tickets_per_order:.1f}</div>
-<div style="font-size:10px;color:#666;">כרטיסים/הזמנה</div>
-</div>
-</div>
-</div>
-
-<div style="background:#1a1a2e;color:#aaa;padding:15px;text-align:center;font-size:11px;">
-<div>מערכת ניהול הזמנות - קוד יהודה</div>
-<div style="margin-top:5px;">{now.strftime('%d/%m/%Y %H:%M')}</div>
-</div>
-
-</div>
-</body>
-</html>"""
+        return 'failed', error_msg
     
-    try:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [to_email],
-            "subject": f"📊 שבועי {week_start}-{week_end} | {num_orders} הזמנות | €{total_revenue:,.0f} | רווח €{total_profit:,.0f}",
-            "html": email_body
-        })
-        return True, f"המייל נשלח בהצלחה! ID: {result.get('id', 'N/A')}"
-    except Exception as e:
-        return False, f"שגיאה בשליחת מייל: {str(e)}"
+    subject, email_body = report_engine.build_weekly_sales_report(orders_df, week_start_date, week_end_date)
+    return dispatch_email(to_email, subject, email_body, idempotency_key=report_engine.report_idempotency_key('weekly_sales_report', to_email, subject))
 
 
 SOURCE_DISPLAY_NAMES = {
@@ -1035,20 +338,9 @@ SOURCE_DISPLAY_NAMES = {
     'viagogo': 'Viagogo',
 }
 
-COMMISSION_RATES = {
-    'tixstock': 0.03,
-}
-
-def get_commission_rate(source_val):
-    """Get commission rate for a source (0 if no commission)"""
-    normalized = normalize_source(source_val)
-    return COMMISSION_RATES.get(normalized, 0.0)
-
-def normalize_source(source_val):
-    """Normalize source name to lowercase for consistent grouping"""
-    if pd.isna(source_val) or source_val is None:
-        return ''
-    return str(source_val).strip().lower()
+COMMISSION_RATES = report_engine.COMMISSION_RATES
+get_commission_rate = report_engine.get_commission_rate
+normalize_source = report_engine.normalize_source
 
 def get_source_display_name(source_val):
     """Get display name for source with proper formatting"""
@@ -1070,7 +362,7 @@ def get_sorted_event_options(dataframe, last_selected=None):
     result_list = []
     
     if 'parsed_date' in dataframe.columns:
-        event_dates = dataframe.groupby('event name')['parsed_date'].min().reset_index()
+        event_dates = dataframe.groupby('event name', observed=True)['parsed_date'].min().reset_index()
         events_with_dates = event_dates[event_dates['parsed_date'].notna()].copy()
         events_without_dates = event_dates[event_dates['parsed_date'].isna()]['event name'].tolist()
         
@@ -1097,6 +389,10 @@ st.set_page_config(
     layout="wide"
 )
 
+enable_copy_on_write()
+start_rerun('app')
+set_api_user(current_user_label())
+
 import hashlib
 
 def verify_mark_paid_token(order_num, row_index, token):
@@ -1474,6 +770,9 @@ def normalize_order_number(order_num):
 
 def get_gspread_client():
     """Create and return a gspread client using credentials from environment."""
+    if fake_sheets_enabled():
+        return govern_client(get_fake_client())
+    
     scope = [
         "https://spreadsheets.google.com/feeds",
         "https://www.googleapis.com/auth/spreadsheets",
@@ -1672,7 +971,7 @@ def get_gspread_client():
         
         credentials = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict_copy, scope)
         client = gspread.authorize(credentials)
-        return client
+        return govern_client(client)
     except Exception as e:
         error_msg = str(e)
         error_type = type(e).__name__
@@ -1953,7 +1252,6 @@ def add_missing_orders_simple():
                             
                             progress.progress(min((i + batch_size) / total, 1.0))
                             status.text(f"➕ נוספו {min(i + batch_size, total)} מתוך {total}")
-                            time.sleep(2)
                         
                         st.success(f"✅ הצלחה! נוספו **{total}** הזמנות לגיליון!")
                         st.balloons()
@@ -1994,55 +1292,7 @@ def add_missing_orders_simple():
         import traceback
         st.code(traceback.format_exc())
 
-# Cache for parsed dates to avoid re-parsing same strings
-_date_parse_cache = {}
-
-def parse_date_smart(date_str, event_name=None, date_hints=None):
-    """Smart date parser that handles multiple formats - OPTIMIZED with caching."""
-    if pd.isna(date_str) or date_str == '' or date_str is None:
-        return None
-    
-    date_str = str(date_str).strip()
-    
-    # Check cache first (significant speedup for repeated dates)
-    if date_str in _date_parse_cache:
-        return _date_parse_cache[date_str]
-    
-    # Check hints first (fastest path)
-    if date_hints and event_name and event_name in date_hints:
-        result = date_hints[event_name]
-        _date_parse_cache[date_str] = result
-        return result
-    
-    # Try most common formats first (optimization: order by frequency)
-    formats = [
-        "%d/%m/%Y",      # Most common: DD/MM/YYYY
-        "%Y-%m-%d",      # ISO format
-        "%d/%m/%Y %H:%M", # With time
-        "%m/%d/%Y",      # US format
-        "%d-%m-%Y",      # Dash format
-        "%Y-%m-%d %H:%M:%S",
-        "%m/%d/%Y %H:%M",
-        "%m/%d/%Y %H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%d/%m/%Y %H:%M:%S",
-        "%d.%m.%Y",
-        "%d/%m/%y",
-        "%d-%m-%y",
-        "%Y/%m/%d",
-    ]
-    
-    for fmt in formats:
-        try:
-            result = datetime.strptime(date_str, fmt)
-            _date_parse_cache[date_str] = result  # Cache successful parse
-            return result
-        except ValueError:
-            continue
-    
-    # Cache None to avoid re-trying failed parses
-    _date_parse_cache[date_str] = None
-    return None
+parse_date_smart = report_engine.parse_date_smart
 
 def clean_numeric(value):
     """Clean numeric values by removing currency symbols and converting to float."""
@@ -2060,191 +1310,100 @@ def clean_numeric(value):
 @st.cache_data(ttl=3600)
 def get_exchange_rates():
     """Fetch real-time exchange rates to EUR from free API"""
-    import urllib.request
-    import json
-    
-    try:
-        url = "https://api.exchangerate-api.com/v4/latest/EUR"
-        with urllib.request.urlopen(url, timeout=5) as response:
-            data = json.loads(response.read().decode())
-            rates = data.get('rates', {})
-            gbp_to_eur = 1 / rates.get('GBP', 0.87) if rates.get('GBP') else 1.15
-            usd_to_eur = 1 / rates.get('USD', 1.08) if rates.get('USD') else 0.93
-            return {'GBP': gbp_to_eur, 'USD': usd_to_eur}
-    except Exception as e:
-        return {'GBP': 1.18, 'USD': 0.93}
-
-# Cache for exchange rates to avoid repeated API calls
-_exchange_rates_cache = None
-_exchange_rates_cache_time = None
+    return report_engine.fetch_exchange_rates()
 
 def convert_to_euro(value, rates=None):
-    """המר כל מטבע לאירו עם שערים אמיתיים - OPTIMIZED with caching"""
-    if pd.isna(value) or value == '' or value is None:
-        return 0.0
-    
-    # Get rates with caching (avoid repeated API calls)
-    if rates is None:
-        global _exchange_rates_cache, _exchange_rates_cache_time
-        now = time.time()
-        # Cache rates for 1 hour
-        if _exchange_rates_cache is None or _exchange_rates_cache_time is None or (now - _exchange_rates_cache_time) > 3600:
-            _exchange_rates_cache = get_exchange_rates()
-            _exchange_rates_cache_time = now
-        rates = _exchange_rates_cache
-    
-    value_str = str(value).strip()
-    
-    # Fast path: EUR (most common)
-    if '€' in value_str:
-        cleaned = re.sub(r'[^\d.\-]', '', value_str)
-        return float(cleaned) if cleaned else 0.0
-    elif '£' in value_str:
-        cleaned = re.sub(r'[^\d.\-]', '', value_str)
-        return (float(cleaned) if cleaned else 0.0) * rates.get('GBP', 1.18)
-    elif '$' in value_str:
-        cleaned = re.sub(r'[^\d.\-]', '', value_str)
-        return (float(cleaned) if cleaned else 0.0) * rates.get('USD', 0.93)
-    else:
-        cleaned = re.sub(r'[^\d.\-]', '', value_str)
-        return float(cleaned) if cleaned else 0.0
+    """המר כל מטבע לאירו עם שערים אמיתיים"""
+    return report_engine.convert_to_euro(value, rates if rates is not None else get_exchange_rates())
 
-@st.cache_data(ttl=600)  # הגדלנו ל-10 דקות לשפר ביצועים
-def load_data_from_sheet():
-    """Load data from Google Sheet with caching - OPTIMIZED for performance."""
-    try:
+@st.cache_resource(ttl=3600)  # רענון לפי שינוי בגיליון (refresh_if_sheet_changed); ה-TTL הוא רק רשת ביטחון
+def fetch_sheet_snapshot():
+    """Load data from Google Sheet - one shared, read-only frame per process (callers go through load_data_from_sheet).
+    Errors propagate so a failed load is never cached - load_data_from_sheet() handles them."""
+    cache_miss('snapshot')
+    # A real refetch already contains every confirmed write - drop the local patches
+    get_snapshot_patches('app').clear()
+    watcher = get_sheet_watcher(get_gspread_client, SHEET_NAME)
+    token = watcher.load_token()
+    with stage('sheets_fetch'):
         client = get_gspread_client()
         sheet = client.open(SHEET_NAME)
         worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
         
         data = worksheet.get_all_values()
-        
-        if len(data) < 2:
-            # Return empty DataFrame - don't access session_state in cached function
-            return pd.DataFrame()
-        
-        headers = [str(h).strip() for h in data[0]]
-        rows = data[1:]
-        
-        df = pd.DataFrame(rows, columns=headers)
-        
-        df['row_index'] = range(2, len(df) + 2)
-        
-        df.columns = [col.strip() for col in df.columns]
-        
-        # OPTIMIZED: Build date_hints using vectorized operations - NO iterrows!
-        date_hints = {}
-        if 'Date of the event' in df.columns and 'event name' in df.columns:
-            # Use vectorized operations - extract unique pairs without iterrows
-            event_date_df = df[['event name', 'Date of the event']].drop_duplicates(subset=['event name'])
-            # Convert to dict for fast lookup - much faster than iterrows
-            event_date_dict = dict(zip(
-                event_date_df['event name'].astype(str).str.strip(),
-                event_date_df['Date of the event'].astype(str).str.strip()
-            ))
-            # Build hints dict using dict comprehension - faster than loop
-            date_hints = {
-                event: parse_date_smart(date_val)
-                for event, date_val in event_date_dict.items()
-                if event and date_val and parse_date_smart(date_val)
-            }
-        
-        # OPTIMIZED: Use pd.to_datetime first (fastest), fallback to parse_date_smart only when needed
-        if 'Date of the event' in df.columns:
-            dates_series = df['Date of the event'].astype(str).str.strip()
-            events_series = df.get('event name', pd.Series([''] * len(df))).astype(str).str.strip()
-            
-            # Try pd.to_datetime first (very fast for standard formats)
-            try:
-                parsed_dates = pd.to_datetime(dates_series, errors='coerce', infer_datetime_format=True)
-                # Fill missing dates using hints
-                missing_mask = parsed_dates.isna()
-                if missing_mask.any() and date_hints:
-                    for idx in dates_series[missing_mask].index:
-                        event = events_series.iloc[idx] if idx < len(events_series) else ''
-                        if event in date_hints:
-                            parsed_dates.iloc[idx] = date_hints[event]
-                df['parsed_date'] = parsed_dates
-            except:
-                # Fallback to parse_date_smart only for failed dates
-                # Use vectorized approach with minimal function calls
-                df['parsed_date'] = pd.Series([
-                    date_hints.get(events_series.iloc[i], None) if events_series.iloc[i] in date_hints
-                    else parse_date_smart(dates_series.iloc[i], events_series.iloc[i], date_hints)
-                    for i in range(len(df))
-                ], index=df.index)
-        
-        # OPTIMIZED: Vectorized operations for numeric conversions
-        if 'TOTAL' in df.columns:
-            df['TOTAL_clean'] = df['TOTAL'].map(convert_to_euro)  # map is faster than apply for simple functions
-        else:
-            df['TOTAL_clean'] = 0.0
-            
-        if 'SUPP PRICE' in df.columns:
-            df['SUPP_PRICE_clean'] = df['SUPP PRICE'].map(convert_to_euro)
-        else:
-            df['SUPP_PRICE_clean'] = 0.0
-        
-        # OPTIMIZED: Vectorized commission calculation
-        if 'source' in df.columns:
-            df['commission_rate'] = df['source'].map(get_commission_rate)
-            df['commission_amount'] = df['TOTAL_clean'] * df['commission_rate']
-            df['revenue_net'] = df['TOTAL_clean'] - df['commission_amount']
-        else:
-            df['commission_rate'] = 0.0
-            df['commission_amount'] = 0.0
-            df['revenue_net'] = df['TOTAL_clean']
-        
-        # OPTIMIZED: Vectorized profit and margin calculations
-        df['profit'] = df['revenue_net'] - df['SUPP_PRICE_clean']
-        df['profit_before_commission'] = df['TOTAL_clean'] - df['SUPP_PRICE_clean']
-        # Vectorized margin calculation - much faster than apply
-        df['margin_pct'] = (df['profit'] / df['revenue_net'] * 100).fillna(0)
-        df.loc[df['revenue_net'] <= 0, 'margin_pct'] = 0
-        
-        status_col = 'orderd' if 'orderd' in df.columns else ('Status' if 'Status' in df.columns else None)
-        if status_col:
-            hebrew_to_english_status = {
-                '🔴 חדש': 'new',
-                'חדש': 'new',
-                '📦 הוזמן': 'orderd',
-                'הוזמן': 'orderd',
-                '✅ הושלם': 'done',
-                'הושלם': 'done',
-                '🟠 נשלח ולא שולם': 'sent - not paid',
-                'נשלח ולא שולם': 'sent - not paid',
-                '💚 נשלח ושולם': 'sent - paid',
-                'נשלח ושולם': 'sent - paid',
-            }
-            # OPTIMIZED: Use map instead of apply for simple dictionary lookup
-            df[status_col] = df[status_col].astype(str).str.strip().map(
-                lambda x: hebrew_to_english_status.get(x, x) if x else x
-            ).fillna(df[status_col])
-        
-        # OPTIMIZED: Calculate has_supplier_data once during load instead of multiple times
-        # This avoids repeated apply() calls throughout the app
-        df['has_supplier_data'] = df.apply(has_supplier_data, axis=1)
-        
-        # Don't access session_state in cached function - return df only
-        return df
-        
-    except ValueError as e:
-        # Don't access session_state in cached function - just return empty DataFrame
-        # Error handling will be done outside the cached function
-        load_data_from_sheet.clear()
-        return pd.DataFrame()
-    except gspread.exceptions.SpreadsheetNotFound:
-        # Don't access session_state in cached function
-        load_data_from_sheet.clear()
-        return pd.DataFrame()
-    except gspread.exceptions.APIError as e:
-        # Don't access session_state in cached function
-        load_data_from_sheet.clear()
-        return pd.DataFrame()
-    except Exception as e:
-        # Don't access session_state in cached function - error handling done outside
-        load_data_from_sheet.clear()
+    watcher.mark_loaded('app', token)
+    count('rows_fetched', max(len(data) - 1, 0))
+    
+    if len(data) < 2:
+        # Return empty DataFrame - don't access session_state in cached function
         return pd.DataFrame()
+    
+    # Shared enrichment pipeline (dates, EUR conversion, commission/profit, status) - same numbers as the email reports
+    df = report_engine.values_to_dataframe(data)
+    # Hashed before enrichment rewrites the status column - the agents page hashes the same raw frame
+    mirror_version = raw_content_version(df) if get_orders_mirror() is not None else None
+    df = report_engine.enrich_orders(df, rates=get_exchange_rates())
+    
+    # OPTIMIZED: Calculate has_supplier_data once during load instead of multiple times
+    # This avoids repeated apply() calls throughout the app
+    with stage('has_supplier_data', rows=len(df)):
+        df['has_supplier_data'] = df.apply(has_supplier_data, axis=1)
+    
+    # Optional local SQLite read-replica (ORDERS_MIRROR_DB) - rebuilt only when the sheet content changed
+    sync_orders_mirror(df, mirror_version)
+    
+    # Compact dtypes (categoricals / float32 / Arrow strings) - smaller shared snapshot
+    with stage('compact_schema', rows=len(df)):
+        df = compact_order_frame(df)
+    
+    # Don't access session_state in cached function - return df only
+    return df
+
+register_cache(REGION_FX, 'app.get_exchange_rates', get_exchange_rates.clear)
+def enrich_patched_rows(rows):
+    """Recompute derived columns for locally patched rows (same pipeline as the full load)"""
+    rows = report_engine.enrich_orders(rows, rates=get_exchange_rates())
+    rows['has_supplier_data'] = rows.apply(has_supplier_data, axis=1)
+    return rows
+
+def load_data_from_sheet():
+    """Cached sheet snapshot with confirmed local writes (update_sheet_status / update_supplier_data) patched in.
+    Returns a copy-on-write view of the shared frame - no per-call pickling or deep copy.
+    A failed load returns an empty frame and leaves the error in st.session_state.sheet_error (nothing is cached)."""
+    cache_lookup('snapshot')
+    with stage('load_data'):
+        try:
+            snapshot = fetch_sheet_snapshot()
+        except gspread.exceptions.SpreadsheetNotFound:
+            st.session_state.sheet_error = f"❌ **הגיליון לא נמצא:** `{SHEET_NAME}` - ודא שהשם נכון ושחשבון השירות שותף לגיליון."
+            return pd.DataFrame()
+        except gspread.exceptions.APIError as e:
+            st.session_state.sheet_error = f"❌ **שגיאת Google Sheets API:** {str(e)}"
+            return pd.DataFrame()
+        except Exception as e:
+            st.session_state.sheet_error = f"❌ **שגיאה בטעינת נתונים:** {str(e)}"
+            return pd.DataFrame()
+        st.session_state.pop('sheet_error', None)
+        return get_snapshot_patches('app').apply(snapshot, enrich_patched_rows)
+
+register_cache(REGION_SNAPSHOT, 'app.load_data_from_sheet', fetch_sheet_snapshot.clear)
+register_cache(REGION_SNAPSHOT, 'app.snapshot_patches', get_snapshot_patches('app').clear)
+register_cache(REGION_SEARCH, 'orders_mirror', invalidate_orders_mirror)
+
+def refresh_if_sheet_changed():
+    """Drop the cached snapshot only when the sheet's Drive modifiedTime/version moved (one tiny, throttled call)"""
+    if get_sheet_watcher(get_gspread_client, SHEET_NAME).needs_reload('app'):
+        fetch_sheet_snapshot.clear()
+
+# Every rerun (including the 5-minute autorefresh) asks "did the sheet change?" before reusing the snapshot
+refresh_if_sheet_changed()
+
+def get_unpaid_orders_snapshot(df=None):
+    """Unpaid ('sent - not paid') orders sliced from the cached sheet snapshot - no extra sheet download.
+    Same records as daily_reminder.get_unpaid_orders(), including '_row_index'."""
+    if df is None:
+        df = load_data_from_sheet()
+    return report_engine.select_unpaid_orders(df)
 
 def col_number_to_letter(col_num):
     """Convert column number (1-based) to Excel-style letter (A, B, ..., Z, AA, AB, ...)"""
@@ -2386,27 +1545,59 @@ def get_category_color(category):
     else:
         return '🟪'
 
-def display_category_summary(orders_df, key_prefix=""):
-    """הצג סיכום קטגוריות עם פרוגרס בארים"""
-    if orders_df.empty:
-        return
+def clean_numeric_series(series):
+    """גרסה וקטורית של clean_numeric לעמודה שלמה"""
+    cleaned = series.astype(str).str.replace(r'[^\d.\-]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0.0)
+
+def _get_category_column(df):
+    cat_col = 'Category / Section' if 'Category / Section' in df.columns else 'Category'
+    return cat_col if cat_col in df.columns else None
+
+def _summarize_categories(orders_df, group_keys):
+    """groupby יחיד על (קבוצה, קטגוריה) - מחזיר מילון {group_key: DataFrame(category, qty, revenue)}"""
+    cat_col = _get_category_column(orders_df)
+    if orders_df.empty or cat_col is None:
+        return {}
     
-    cat_col = 'Category / Section' if 'Category / Section' in orders_df.columns else 'Category'
-    if cat_col not in orders_df.columns:
-        return
+    qty_num = pd.to_numeric(orders_df['Qty'], errors='coerce').fillna(0) if 'Qty' in orders_df.columns else pd.Series(0.0, index=orders_df.index)
+    total_num = clean_numeric_series(orders_df['TOTAL']) if 'TOTAL' in orders_df.columns else pd.Series(0.0, index=orders_df.index)
     
-    orders_df = orders_df.copy()
-    orders_df['Qty_num'] = pd.to_numeric(orders_df.get('Qty', 0), errors='coerce').fillna(0)
-    orders_df['TOTAL_num'] = orders_df.apply(lambda r: clean_numeric(r.get('TOTAL', 0)), axis=1)
+    frame = pd.DataFrame({
+        'group': group_keys,
+        'category': orders_df[cat_col].astype(object).fillna('לא צוין').replace('', 'לא צוין').values,
+        'qty': qty_num.values,
+        'revenue': total_num.values,
+    })
     
-    orders_df[cat_col] = orders_df[cat_col].fillna('לא צוין').replace('', 'לא צוין')
+    summary = frame.groupby(['group', 'category'], sort=False, observed=True)[['qty', 'revenue']].sum().reset_index()
+    summary = summary.sort_values(['group', 'qty'], ascending=[True, False], kind='stable')
     
-    cat_summary = orders_df.groupby(cat_col).agg({
-        'Qty_num': 'sum',
-        'TOTAL_num': 'sum'
-    }).reset_index()
-    cat_summary.columns = ['category', 'qty', 'revenue']
-    cat_summary = cat_summary.sort_values('qty', ascending=False)
+    return {
+        group: part[['category', 'qty', 'revenue']].reset_index(drop=True)
+        for group, part in summary.groupby('group', sort=False)
+    }
+
+def compute_category_summaries(orders_df, grouped_events, status='new'):
+    """חשב סיכומי קטגוריות לכל קבוצות האירועים בבת אחת (במקום חישוב נפרד לכל קבוצה)"""
+    if orders_df.empty or not grouped_events:
+        return {}
+    
+    group_of = {}
+    for key, event_data in grouped_events.items():
+        for row in event_data['orders']:
+            group_of[row.name] = key
+    
+    scoped = orders_df[orders_df.index.isin(list(group_of.keys()))]
+    if status and 'orderd' in scoped.columns:
+        scoped = report_engine.status_slice(scoped, status)
+    
+    return _summarize_categories(scoped, scoped.index.map(group_of).values)
+
+def render_category_summary(cat_summary):
+    """הצג סיכום קטגוריות מחושב מראש עם פרוגרס בארים"""
+    if cat_summary is None or cat_summary.empty:
+        return
     
     total_qty = cat_summary['qty'].sum()
     total_revenue = cat_summary['revenue'].sum()
@@ -2415,13 +1606,12 @@ def display_category_summary(orders_df, key_prefix=""):
     if total_qty == 0:
         return
     
+    rows = list(zip(cat_summary['category'], cat_summary['qty'], cat_summary['revenue']))
+    
     with st.expander(f"📊 סיכום קטגוריות ({int(total_qty)} כרטיסים)", expanded=False):
-        for _, row in cat_summary.iterrows():
-            cat_name = row['category']
-            qty = int(row['qty'])
-            revenue = row['revenue']
+        for cat_name, qty, revenue in rows:
+            qty = int(qty)
             pct = (qty / total_qty * 100) if total_qty > 0 else 0
-            rev_pct = (revenue / total_revenue * 100) if total_revenue > 0 else 0
             
             color_emoji = get_category_color(cat_name)
             
@@ -2439,17 +1629,26 @@ def display_category_summary(orders_df, key_prefix=""):
         
         st.markdown("**💰 סיכום כספי לפי קטגוריה:**")
         revenue_parts = []
-        for _, row in cat_summary.iterrows():
-            rev_pct = (row['revenue'] / total_revenue * 100) if total_revenue > 0 else 0
-            revenue_parts.append(f"• {row['category']}: €{row['revenue']:,.0f} ({rev_pct:.0f}%)")
+        for cat_name, _, revenue in rows:
+            rev_pct = (revenue / total_revenue * 100) if total_revenue > 0 else 0
+            revenue_parts.append(f"• {cat_name}: €{revenue:,.0f} ({rev_pct:.0f}%)")
         st.markdown("\n".join(revenue_parts))
 
+def display_category_summary(orders_df, key_prefix=""):
+    """הצג סיכום קטגוריות עם פרוגרס בארים"""
+    if orders_df.empty:
+        return
+    
+    summaries = _summarize_categories(orders_df, [key_prefix] * len(orders_df))
+    render_category_summary(summaries.get(key_prefix))
+
+@timed('grouping')
 def group_orders_by_event(df):
     """קבץ הזמנות לפי אירוע עם איחוד חכם (fuzzy matching)"""
     if df.empty:
         return {}
     
-    df = df.copy()
+    df = df.copy(deep=False)
     df['has_supplier'] = df.apply(has_supplier_data, axis=1)
     
     event_groups = []
@@ -2484,7 +1683,7 @@ def group_orders_by_event(df):
     for group_idx, indices in enumerate(event_groups):
         group_rows = df.loc[indices]
         
-        event_names = group_rows['event name'].value_counts()
+        event_names = group_rows['event name'].astype(object).value_counts()
         best_event_name = event_names.index[0] if len(event_names) > 0 else 'Unknown'
         
         if 'parsed_date' in group_rows.columns:
@@ -2599,38 +1798,119 @@ def update_sheet_status(row_indices, new_status, progress_bar=None):
             
             if progress_bar:
                 progress_bar.progress(min((i + batch_size) / total, 1.0))
-            
-            import time
-            time.sleep(2)
         
+        # Write confirmed - show it immediately from the cached snapshot instead of refetching
+        get_snapshot_patches('app').patch(row_indices, {'orderd': new_status})
         return True
         
     except Exception as e:
         st.error(f"Error updating sheet: {str(e)}")
         return False
 
+SUPPLIER_COLUMN_LETTERS = {'SUPP PRICE': 'O', 'Supplier NAME': 'P', 'SUPP order number': 'Q'}
+
+def update_supplier_cells(changes):
+    """Write supplier cells (columns O, P, Q) for many rows in one batch_update.
+    changes: {row_index: {column: value}}. Returns [(row_index, column, value, ok)] - one entry per cell."""
+    cells = [
+        (row_index, column, str(value))
+        for row_index, values in changes.items()
+        for column, value in values.items()
+        if column in SUPPLIER_COLUMN_LETTERS and value is not None
+    ]
+    if not cells:
+        return []
+    try:
+        client = get_gspread_client()
+        sheet = client.open(SHEET_NAME)
+        worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
+        
+        response = worksheet.batch_update([
+            {'range': f'{SUPPLIER_COLUMN_LETTERS[column]}{row_index}', 'values': [[value]]}
+            for row_index, column, value in cells
+        ])
+        # One response per range, in request order
+        responses = (response or {}).get('responses') or [{'updatedCells': 1}] * len(cells)
+        results = [
+            (row_index, column, value, bool(cell_response.get('updatedCells')))
+            for (row_index, column, value), cell_response in zip(cells, responses)
+        ]
+        
+        # Write confirmed - patch the cached snapshot (has_supplier_data / profit are recomputed)
+        confirmed = {}
+        for row_index, column, value, ok in results:
+            if ok:
+                confirmed.setdefault(row_index, {})[column] = value
+        patches = get_snapshot_patches('app')
+        for row_index, values in confirmed.items():
+            patches.patch([row_index], values)
+        return results
+    except Exception as e:
+        st.error(f"שגיאה בעדכון נתוני ספק: {str(e)}")
+        return [(row_index, column, value, False) for row_index, column, value in cells]
+
 def update_supplier_data(row_index, supp_price=None, supp_name=None, supp_order=None):
     """Update supplier columns (O, P, Q) for a specific row in Google Sheet."""
+    results = update_supplier_cells({row_index: {
+        'SUPP PRICE': supp_price,
+        'Supplier NAME': supp_name,
+        'SUPP order number': supp_order,
+    }})
+    return all(ok for *_, ok in results)
+
+def supplier_grid_changes(editor_state, original_df):
+    """{row_index: {column: new_value}} from a data_editor's edited_rows delta - supplier cells that really changed"""
+    changes = {}
+    for position, edits in (editor_state or {}).get('edited_rows', {}).items():
+        row = original_df.iloc[int(position)]
+        for column, value in edits.items():
+            if column not in SUPPLIER_COLUMN_LETTERS:
+                continue
+            new_value = '' if value is None else str(value).strip()
+            old_value = '' if pd.isna(row.get(column)) else str(row.get(column)).strip()
+            if new_value != old_value:
+                changes.setdefault(int(row['row_index']), {})[column] = new_value
+    return changes
+
+NEW_ORDER_EDIT_COLUMNS = {
+    'SUPP order number': ('supp order number', 'supp order'),
+    'orderd': ('orderd',),
+    'SUPP PRICE': ('supp price',),
+}
+
+def update_new_order_fields(changes):
+    """Write new-order edits (supplier order number / status / supplier price) for many rows in one batch_update.
+    changes: {row_index: {column: new_value}}. Returns (success, cells_written)."""
     try:
         client = get_gspread_client()
         sheet = client.open(SHEET_NAME)
         worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
+        headers = [h.strip().lower() for h in worksheet.row_values(1)]
         
-        cells = []
-        if supp_price is not None:
-            cells.append({'range': f'O{row_index}', 'values': [[str(supp_price)]]})
-        if supp_name is not None:
-            cells.append({'range': f'P{row_index}', 'values': [[str(supp_name)]]})
-        if supp_order is not None:
-            cells.append({'range': f'Q{row_index}', 'values': [[str(supp_order)]]})
-        
-        if cells:
-            worksheet.batch_update(cells)
+        col_letters = {}
+        for column, names in NEW_ORDER_EDIT_COLUMNS.items():
+            for i, header in enumerate(headers):
+                if header in names:
+                    col_letters[column] = col_number_to_letter(i + 1)
+                    break
         
-        return True
+        updates = []
+        written = {}
+        for row_index, values in changes.items():
+            for column, value in values.items():
+                if column in col_letters:
+                    updates.append({'range': f'{col_letters[column]}{row_index}', 'values': [[str(value)]]})
+                    written.setdefault(row_index, {})[column] = str(value)
+        
+        if updates:
+            worksheet.batch_update(updates)
+            patches = get_snapshot_patches('app')
+            for row_index, values in written.items():
+                patches.patch([row_index], values)
+        return True, len(updates)
     except Exception as e:
-        st.error(f"שגיאה בעדכון נתוני ספק: {str(e)}")
-        return False
+        st.error(f"שגיאה: {str(e)}")
+        return False, 0
 
 def delete_order_row(row_index):
     """Delete a row from Google Sheet."""
@@ -2669,6 +1949,7 @@ def find_column_flexible(df, keywords):
             return col
     return None
 
+@timed('auto_update_scan')
 def get_rows_for_orderd(df):
     import pytz
     israel_tz = pytz.timezone('Asia/Jerusalem')
@@ -2731,6 +2012,7 @@ def get_rows_for_orderd(df):
     
     return rows_to_update, updated_orders_info
 
+@timed('auto_update_scan')
 def get_rows_for_done(df):
     import pytz
     israel_tz = pytz.timezone('Asia/Jerusalem')
@@ -2793,6 +2075,7 @@ def get_rows_for_done(df):
     
     return rows_to_update, updated_orders_info
 
+@timed('auto_update_scan')
 def get_rows_for_old_no_data(df):
     """מוצא הזמנות ישנות (עבר) ללא נתוני ספק"""
     import pytz
@@ -2919,7 +2202,8 @@ def get_status_color(status):
 
 def display_history(language='he'):
     """Display update history in a clean format."""
-    if 'update_history' not in st.session_state or not st.session_state.update_history:
+    history = get_update_history(limit=20)
+    if not history:
         if language == 'he':
             st.info("📜 אין היסטוריה עדיין")
         else:
@@ -2928,7 +2212,7 @@ def display_history(language='he'):
     
     st.subheader("📜 היסטוריית עדכונים" if language == 'he' else "📜 Update History")
     
-    for idx, entry in enumerate(st.session_state.update_history[:20]):
+    for idx, entry in enumerate(history):
         if entry['status'] == 'orderd':
             status_emoji = "🎯"
             status_text = "הוזמן"
@@ -2957,26 +2241,37 @@ def display_history(language='he'):
     
     st.markdown("---")
     if st.button("🗑️ נקה היסטוריה", key="clear_history"):
-        st.session_state.update_history = []
+        # The shared log is kept - only hide older entries for this session
+        st.session_state.update_history_cleared_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         st.rerun()
 
 def save_update_history(rows_updated, status, user_email=None):
-    """Save update history to session state."""
-    if 'update_history' not in st.session_state:
-        st.session_state.update_history = []
-    
-    history_entry = {
+    """Save update history to the shared change-log store."""
+    get_change_log_store().append({
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'status': status,
-        'count': len(rows_updated),
-        'rows': rows_updated,
-        'user': user_email or 'unknown'
-    }
-    
-    st.session_state.update_history.insert(0, history_entry)
-    
-    if len(st.session_state.update_history) > 50:
-        st.session_state.update_history = st.session_state.update_history[:50]
+        'action': 'status_update',
+        'order_id': ', '.join(map(str, rows_updated[:20])),
+        'old_value': '',
+        'new_value': status,
+        'user': user_email or 'unknown',
+        'details': {'rows': list(rows_updated)}
+    })
+
+def get_update_history(limit=20):
+    """Recent status updates, newest first, in the display_history entry format."""
+    entries = get_change_log_store().query(
+        action='status_update', since=st.session_state.get('update_history_cleared_at'), limit=limit
+    )
+    return [
+        {
+            'timestamp': entry['timestamp'],
+            'status': entry['new_value'],
+            'count': len((entry['details'] or {}).get('rows', [])),
+            'rows': (entry['details'] or {}).get('rows', []),
+            'user': entry['user']
+        }
+        for entry in entries
+    ]
 
 def scan_old_sheet_for_migration():
     """סריקת הגיליון הישן ושמירת הנתונים ב-session_state"""
@@ -3077,12 +2372,12 @@ def execute_migration(updates):
                 cells.append({'range': f'Q{row_num}', 'values': [[update['order']]]})
             
             new_sheet.batch_update(cells)
-            time.sleep(1)
         
         return True, None
     except Exception as e:
         return False, str(e)
 
+lap('render:sidebar')
 with st.sidebar:
     lang_options = {"עברית": "he", "English": "en"}
     selected_lang = st.selectbox(
@@ -3097,9 +2392,12 @@ with st.sidebar:
     st.header(t("sidebar_header"))
     st.markdown("---")
     
+    if st.session_state.get('sidebar_update_success'):
+        st.success(st.session_state.sidebar_update_success)
+        st.session_state.sidebar_update_success = None
+    
     if st.button(t("refresh_data"), use_container_width=True):
-        load_data_from_sheet.clear()
-        st.cache_data.clear()
+        invalidate(REGION_SNAPSHOT)
         if 'sheet_error' in st.session_state:
             del st.session_state.sheet_error
         st.rerun()
@@ -3124,9 +2422,8 @@ with st.sidebar:
                     if len(updated_orders) > 15:
                         st.write(f"... {t('and_more')} {len(updated_orders) - 15}")
                     
-                    st.cache_data.clear()
-                    import time
-                    time.sleep(3)
+                    # The cached snapshot is already patched - rerun right away, keep the message
+                    st.session_state.sidebar_update_success = f"✅ {t('auto_updated')} {len(rows_to_update)} {t('orders')} → orderd"
                     st.rerun()
             else:
                 st.info(t("no_orders_to_update"))
@@ -3151,9 +2448,8 @@ with st.sidebar:
                     if len(updated_orders) > 15:
                         st.write(f"... {t('and_more')} {len(updated_orders) - 15}")
                     
-                    st.cache_data.clear()
-                    import time
-                    time.sleep(3)
+                    # The cached snapshot is already patched - rerun right away, keep the message
+                    st.session_state.sidebar_update_success = f"✅ {t('auto_updated')} {len(rows_to_update)} {t('orders')} → done!"
                     st.rerun()
             else:
                 st.info(t("no_done_to_update"))
@@ -3182,6 +2478,9 @@ with st.sidebar:
     st.markdown("### 📧 שליחת דוחות למייל")
     
     temp_df_for_email = load_data_from_sheet()
+    # One cached snapshot + its unpaid slice, reused by the sidebar, tab7 and tab8 (no extra sheet reads)
+    orders_snapshot = temp_df_for_email
+    unpaid_orders_snapshot = get_unpaid_orders_snapshot(orders_snapshot)
     
     report_type = st.selectbox(
         "בחר סוג דוח:",
@@ -3196,11 +2495,7 @@ with st.sidebar:
     )
     
     if report_type == "📋 כרטיסים לרכישה":
-        new_orders_for_email = pd.DataFrame()
-        if not temp_df_for_email.empty and 'orderd' in temp_df_for_email.columns:
-            new_orders_for_email = temp_df_for_email[
-                temp_df_for_email['orderd'].fillna('').str.strip().str.lower() == 'new'
-            ].copy()
+        new_orders_for_email = report_engine.select_new_orders(orders_snapshot)
         
         new_count = len(new_orders_for_email)
         new_tickets = int(pd.to_numeric(new_orders_for_email.get('Qty', 0), errors='coerce').sum()) if not new_orders_for_email.empty else 0
@@ -3209,12 +2504,8 @@ with st.sidebar:
             st.info(f"📋 {new_count} הזמנות ({new_tickets} כרטיסים)")
             if st.button("📤 שלח דוח", use_container_width=True, type="primary", key="send_new_orders_btn"):
                 if email_recipient and '@' in email_recipient:
-                    with st.spinner("שולח מייל..."):
-                        success, message = send_new_orders_report_email(new_orders_for_email, email_recipient)
-                        if success:
-                            st.success(f"✅ {message}")
-                        else:
-                            st.error(f"❌ {message}")
+                    status, message = send_new_orders_report_email(new_orders_for_email, email_recipient)
+                    show_email_status(status, message)
                 else:
                     st.error("❌ כתובת מייל לא תקינה")
         else:
@@ -3231,24 +2522,7 @@ with st.sidebar:
         )
         selected_date_str = selected_date.strftime('%d/%m/%Y')
         
-        daily_orders = pd.DataFrame()
-        if not temp_df_for_email.empty:
-            temp_df_for_email = temp_df_for_email.copy()
-            if 'order date' in temp_df_for_email.columns:
-                temp_df_for_email['order_date_parsed'] = pd.to_datetime(
-                    temp_df_for_email['order date'], 
-                    format='%m/%d/%Y %H:%M:%S',
-                    errors='coerce'
-                )
-                temp_df_for_email.loc[temp_df_for_email['order_date_parsed'].isna(), 'order_date_parsed'] = pd.to_datetime(
-                    temp_df_for_email.loc[temp_df_for_email['order_date_parsed'].isna(), 'order date'],
-                    dayfirst=True,
-                    errors='coerce'
-                )
-                
-                daily_orders = temp_df_for_email[
-                    (temp_df_for_email['order_date_parsed'].dt.date == selected_date)
-                ].copy()
+        daily_orders = report_engine.select_orders_between(orders_snapshot, selected_date, selected_date)
         
         daily_count = len(daily_orders)
         daily_tickets = int(pd.to_numeric(daily_orders.get('Qty', 0), errors='coerce').sum()) if not daily_orders.empty else 0
@@ -3257,12 +2531,8 @@ with st.sidebar:
         if daily_count > 0:
             if st.button("📤 שלח דוח יומי", use_container_width=True, type="primary", key="send_daily_sales_btn"):
                 if email_recipient and '@' in email_recipient:
-                    with st.spinner("שולח מייל..."):
-                        success, message = send_daily_sales_report_email(daily_orders, email_recipient, selected_date)
-                        if success:
-                            st.success(f"✅ {message}")
-                        else:
-                            st.error(f"❌ {message}")
+                    status, message = send_daily_sales_report_email(daily_orders, email_recipient, selected_date)
+                    show_email_status(status, message)
                 else:
                     st.error("❌ כתובת מייל לא תקינה")
         else:
@@ -3290,25 +2560,7 @@ with st.sidebar:
                 key="weekly_report_end_date"
             )
         
-        weekly_orders = pd.DataFrame()
-        if not temp_df_for_email.empty:
-            temp_df_for_email = temp_df_for_email.copy()
-            if 'order date' in temp_df_for_email.columns:
-                temp_df_for_email['order_date_parsed'] = pd.to_datetime(
-                    temp_df_for_email['order date'], 
-                    format='%m/%d/%Y %H:%M:%S',
-                    errors='coerce'
-                )
-                temp_df_for_email.loc[temp_df_for_email['order_date_parsed'].isna(), 'order_date_parsed'] = pd.to_datetime(
-                    temp_df_for_email.loc[temp_df_for_email['order_date_parsed'].isna(), 'order date'],
-                    dayfirst=True,
-                    errors='coerce'
-                )
-                
-                weekly_orders = temp_df_for_email[
-                    (temp_df_for_email['order_date_parsed'].dt.date >= start_of_week) &
-                    (temp_df_for_email['order_date_parsed'].dt.date <= end_of_week)
-                ].copy()
+        weekly_orders = report_engine.select_orders_between(orders_snapshot, start_of_week, end_of_week)
         
         weekly_count = len(weekly_orders)
         weekly_tickets = int(pd.to_numeric(weekly_orders.get('Qty', 0), errors='coerce').sum()) if not weekly_orders.empty else 0
@@ -3317,12 +2569,8 @@ with st.sidebar:
         if weekly_count > 0:
             if st.button("📤 שלח דוח שבועי", use_container_width=True, type="primary", key="send_weekly_sales_btn"):
                 if email_recipient and '@' in email_recipient:
-                    with st.spinner("שולח מייל..."):
-                        success, message = send_weekly_sales_report_email(weekly_orders, email_recipient, start_of_week, end_of_week)
-                        if success:
-                            st.success(f"✅ {message}")
-                        else:
-                            st.error(f"❌ {message}")
+                    status, message = send_weekly_sales_report_email(weekly_orders, email_recipient, start_of_week, end_of_week)
+                    show_email_status(status, message)
                 else:
                     st.error("❌ כתובת מייל לא תקינה")
         else:
@@ -3330,9 +2578,7 @@ with st.sidebar:
     
     elif report_type == "🔴 הזמנות לא שולמו":
         try:
-            from daily_reminder import get_unpaid_orders, send_daily_reminder_email
-            
-            unpaid_orders = get_unpaid_orders()
+            unpaid_orders = unpaid_orders_snapshot
             unpaid_count = len(unpaid_orders)
             
             if unpaid_count > 0:
@@ -3351,101 +2597,8 @@ with st.sidebar:
                 
                 if st.button("📤 שלח תזכורת", use_container_width=True, type="primary", key="send_unpaid_reminder_btn"):
                     if email_recipient and '@' in email_recipient:
-                        with st.spinner("שולח מייל תזכורת..."):
-                            # Send email using daily_reminder function but override recipient
-                            try:
-                                from daily_reminder import get_resend_credentials
-                                import resend
-                                
-                                api_key, from_email = get_resend_credentials()
-                                if not api_key or not from_email:
-                                    st.error("❌ לא נמצאו פרטי Resend API")
-                                else:
-                                    resend.api_key = api_key
-                                    
-                                    # Build email body (same as daily_reminder.py)
-                                    import pytz
-                                    from datetime import datetime
-                                    from daily_reminder import generate_mark_paid_token, get_app_base_url
-                                    
-                                    israel_tz = pytz.timezone('Israel')
-                                    now = datetime.now(israel_tz)
-                                    app_url = get_app_base_url()
-                                    
-                                    email_body = f"<h2 style='color: #dc2626;'>תזכורת יומית - הזמנות לא שולמו</h2>"
-                                    email_body += f"<p>תאריך: {now.strftime('%Y-%m-%d %H:%M')} (שעון ישראל)</p>"
-                                    email_body += f"<p style='background: #dc2626; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>{unpaid_count} הזמנות ממתינות לתשלום</strong></p>"
-                                    email_body += "<hr>"
-                                    
-                                    total_amount = 0
-                                    for idx, order in enumerate(unpaid_orders):
-                                        order_num = order.get('Order number', '-')
-                                        event_name = order.get('event name', '-')
-                                        docket = order.get('docket number', order.get('docket', order.get('Docket', '-')))
-                                        source = order.get('source', '-')
-                                        supp_order = order.get('SUPP order number', '-')
-                                        event_date = order.get('Date of the event', '-')
-                                        qty = order.get('Qty', order.get('QTY', '-'))
-                                        price_sold = order.get('Price sold', '-')
-                                        total_sold = order.get('TOTAL', '-')
-                                        row_index = order.get('_row_index', '')
-                                        
-                                        if total_sold and total_sold != '-':
-                                            try:
-                                                amount = float(str(total_sold).replace('€','').replace('£','').replace('$','').replace(',','').strip())
-                                                total_amount += amount
-                                                total_display = f"€{amount:,.2f}"
-                                            except:
-                                                total_display = str(total_sold)
-                                        else:
-                                            total_display = '-'
-                                        
-                                        token = generate_mark_paid_token(order_num, row_index)
-                                        
-                                        mark_paid_button = ""
-                                        if token:
-                                            mark_paid_url = f"{app_url}?mark_paid={order_num}&row={row_index}&token={token}"
-                                            mark_paid_button = f"""
-                                            <div style="margin-top: 15px; text-align: center;">
-                                                <a href="{mark_paid_url}" style="display: inline-block; background: #16a34a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; font-size: 14px;">
-                                                    סמן כשולם (Done!)
-                                                </a>
-                                            </div>
-                                            """
-                                        
-                                        email_body += f"""
-                                        <div style="background: #fee2e2; padding: 15px; margin: 10px 0; border-radius: 8px; border-right: 4px solid #dc2626;">
-                                            <h3 style="color: #dc2626;">הזמנה #{idx+1} - לא שולם</h3>
-                                            <table style="width: 100%;">
-                                                <tr><td><strong>מספר הזמנה:</strong></td><td>{order_num}</td></tr>
-                                                <tr><td><strong>שם אירוע:</strong></td><td>{event_name}</td></tr>
-                                                <tr><td><strong>מספר דוקט:</strong></td><td>{docket}</td></tr>
-                                                <tr><td><strong>מקור:</strong></td><td>{source}</td></tr>
-                                                <tr><td><strong>מספר הזמנה ספק:</strong></td><td>{supp_order}</td></tr>
-                                                <tr><td><strong>תאריך אירוע:</strong></td><td>{event_date}</td></tr>
-                                                <tr><td><strong>כמות:</strong></td><td>{qty}</td></tr>
-                                                <tr><td><strong>מחיר מקורי לכרטיס:</strong></td><td>{price_sold}</td></tr>
-                                                <tr style="background: #dc2626; color: white;"><td><strong>סכום לגבייה:</strong></td><td><strong>{total_display}</strong></td></tr>
-                                            </table>
-                                            {mark_paid_button}
-                                        </div>
-                                        """
-                                    
-                                    if total_amount > 0:
-                                        email_body += f"<div style='background: #dc2626; color: white; padding: 15px; border-radius: 8px; text-align: center; margin-top: 20px;'><h2>סה\"כ לגבייה: €{total_amount:,.2f}</h2></div>"
-                                    
-                                    email_body += "<hr><p style='color: #666;'>תזכורת יומית ממערכת ניהול הזמנות כרטיסים</p>"
-                                    
-                                    result = resend.Emails.send({
-                                        "from": from_email,
-                                        "to": [email_recipient],
-                                        "subject": f"🔴 תזכורת יומית - {unpaid_count} הזמנות לא שולמו! (€{total_amount:,.2f})",
-                                        "html": email_body
-                                    })
-                                    
-                                    st.success(f"✅ מייל תזכורת נשלח בהצלחה ל-{email_recipient} ({unpaid_count} הזמנות)!")
-                            except Exception as e:
-                                st.error(f"❌ שגיאה בשליחת המייל: {e}")
+                        status, message = send_unpaid_reminder_email(unpaid_orders, to_email=email_recipient)
+                        show_email_status(status, message, f" ({unpaid_count} הזמנות)")
                     else:
                         st.error("❌ כתובת מייל לא תקינה")
             else:
@@ -3453,6 +2606,8 @@ with st.sidebar:
         except Exception as e:
             st.error(f"❌ שגיאה בטעינת ההזמנות: {e}")
     
+    render_email_jobs_status()
+    
     st.markdown("---")
     st.markdown("**🔍 חיפוש מהיר**")
     sidebar_search_input = st.text_input(
@@ -3587,7 +2742,7 @@ with st.sidebar:
             all_events = df['event name'].dropna().unique().tolist()
             
             if 'parsed_date' in df.columns:
-                event_dates = df.groupby('event name')['parsed_date'].min().reset_index()
+                event_dates = df.groupby('event name', observed=True)['parsed_date'].min().reset_index()
                 events_with_dates = event_dates[event_dates['parsed_date'].notna()].copy()
                 events_without_dates = event_dates[event_dates['parsed_date'].isna()]['event name'].tolist()
                 
@@ -3784,6 +2939,7 @@ with st.sidebar:
         
         if 'orderd' in temp_df.columns:
             statuses = temp_df['orderd'].value_counts()
+            statuses = statuses[statuses > 0]
             st.write("**Status counts:**", statuses.to_dict())
         
         if 'SUPP PRICE' in temp_df.columns:
@@ -3792,10 +2948,10 @@ with st.sidebar:
         
         now = datetime.now()
         if 'orderd' in temp_df.columns and 'SUPP PRICE' in temp_df.columns and 'parsed_date' in temp_df.columns:
-            new_rows = temp_df[temp_df['orderd'].str.lower().str.strip() == 'new']
+            new_rows = report_engine.status_slice(temp_df, 'new')
             st.write(f"**New rows total:** {len(new_rows)}")
             
-            orderd_rows = temp_df[temp_df['orderd'].str.lower().str.strip() == 'orderd']
+            orderd_rows = report_engine.status_slice(temp_df, 'orderd')
             st.write(f"**orderd rows total:** {len(orderd_rows)}")
         
         if 'parsed_date' in temp_df.columns:
@@ -3806,9 +2962,11 @@ with st.sidebar:
             st.write(f"**Future events:** {len(future)}")
             st.write(f"**Past events:** {len(past)}")
 
+@timed('filtering')
 def apply_filters(df):
     """Apply sidebar filters to the dataframe."""
-    filtered_df = df.copy()
+    # Copy-on-write view - nothing below mutates the shared snapshot, and nothing is copied up front
+    filtered_df = df.copy(deep=False)
     
     if selected_events:
         filtered_df = filtered_df[filtered_df['event name'].isin(selected_events)]
@@ -3838,6 +2996,7 @@ def apply_filters(df):
     
     return filtered_df
 
+lap('render:dashboard')
 st.title(t("title"))
 
 if df.empty:
@@ -4126,13 +3285,13 @@ if df.empty:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🔄 נסה שוב", key="retry_load", use_container_width=True):
-            load_data_from_sheet.clear()
+            invalidate(REGION_SNAPSHOT)
             if 'sheet_error' in st.session_state:
                 del st.session_state.sheet_error
             st.rerun()
     with col2:
         if st.button("🗑️ נקה cache ונסה שוב", key="clear_cache_retry", use_container_width=True):
-            load_data_from_sheet.clear()
+            invalidate(REGION_SNAPSHOT)
             if 'sheet_error' in st.session_state:
                 del st.session_state.sheet_error
             st.cache_data.clear()
@@ -4283,7 +3442,7 @@ if waiting_count > 0:
 count_7days = len(next_7_days_df) if not next_7_days_df.empty else 0
 
 if not next_7_days_df.empty and 'event name' in next_7_days_df.columns:
-    week_events_grouped = next_7_days_df.groupby('event name').agg({
+    week_events_grouped = next_7_days_df.groupby('event name', observed=True).agg({
         'Date of the event': 'first',
         'parsed_date': 'first',
         'row_index': 'first'
@@ -4520,9 +3679,9 @@ if st.session_state.get('show_manual_order_form', False):
                             email_sent_msg = ""
                             
                             if add_status_selected == "🟠 נשלח ולא שולם":
-                                email_success, email_message = send_not_paid_email([order_data])
-                                if email_success:
-                                    email_sent_msg = " + 🔴 מייל התראה נשלח לאופרציה!"
+                                email_status, email_message = send_not_paid_email([order_data])
+                                if email_status != 'failed':
+                                    email_sent_msg = " + 🔴 מייל התראה לאופרציה בתור השליחה"
                                 else:
                                     email_sent_msg = f" (מייל לא נשלח: {email_message})"
                             
@@ -4533,19 +3692,19 @@ if st.session_state.get('show_manual_order_form', False):
                                     attachment_data = add_payment_file.read()
                                     attachment_name = add_payment_file.name
                                 
-                                email_success, email_message = send_payment_confirmation_email(
+                                email_status, email_message = send_payment_confirmation_email(
                                     [order_data],
                                     add_payment_method,
                                     attachment_data,
                                     attachment_name
                                 )
-                                if email_success:
+                                if email_status != 'failed':
                                     file_msg = " + קובץ" if attachment_data else ""
-                                    email_sent_msg = f" + 💚 מייל אישור נשלח{file_msg}!"
+                                    email_sent_msg = f" + 💚 מייל אישור{file_msg} בתור השליחה"
                                 else:
                                     email_sent_msg = f" (מייל לא נשלח: {email_message})"
                             
-                            st.cache_data.clear()
+                            invalidate(REGION_SNAPSHOT)
                             st.session_state.show_manual_order_form = False
                             st.session_state.order_added_success = f"✅ הזמנה {add_order_number} נוספה בהצלחה{email_sent_msg}!"
                             if add_event_name:
@@ -4589,12 +3748,19 @@ if st.session_state.get('show_global_search', False) and st.session_state.get('s
             if not search_df.empty:
                 query_lower = global_search_query.lower().strip()
                 
-                results = search_df[
-                    (search_df['Order number'].astype(str).str.lower().str.contains(query_lower, na=False)) |
-                    (search_df['docket number'].astype(str).str.lower().str.contains(query_lower, na=False) if 'docket number' in search_df.columns else False) |
-                    (search_df['event name'].astype(str).str.lower().str.contains(query_lower, na=False) if 'event name' in search_df.columns else False) |
-                    (search_df['SUPP order number'].astype(str).str.lower().str.contains(query_lower, na=False) if 'SUPP order number' in search_df.columns else False)
-                ]
+                orders_mirror = get_orders_mirror()
+                if orders_mirror is not None and 'row_index' in search_df.columns:
+                    # Indexed lookup in the local mirror, rows taken from the snapshot
+                    by_row = search_df.set_index('row_index', drop=False)
+                    hits = orders_mirror.search(query_lower, fields=('order_number', 'docket_number', 'supp_order_number', 'event_name'))
+                    results = by_row.loc[[row for row, _ in hits if row in by_row.index]]
+                else:
+                    results = search_df[
+                        (search_df['Order number'].astype(str).str.lower().str.contains(query_lower, na=False)) |
+                        (search_df['docket number'].astype(str).str.lower().str.contains(query_lower, na=False) if 'docket number' in search_df.columns else False) |
+                        (search_df['event name'].astype(str).str.lower().str.contains(query_lower, na=False) if 'event name' in search_df.columns else False) |
+                        (search_df['SUPP order number'].astype(str).str.lower().str.contains(query_lower, na=False) if 'SUPP order number' in search_df.columns else False)
+                    ]
                 
                 if not results.empty:
                     st.success(f"נמצאו {len(results)} תוצאות")
@@ -4703,6 +3869,7 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
     "🔴 תזכורת - הזמנות לא שולמו"
 ])
 
+lap('render:tab1')
 with tab1:
     st.header(t("purchasing_header"))
     st.markdown(t("purchasing_subtitle"))
@@ -4775,13 +3942,14 @@ with tab1:
             base_orders_df = base_filtered_df.copy()
         elif dashboard_filter:
             if dashboard_filter == 'new':
-                base_orders_df = base_filtered_df[base_filtered_df[status_col].fillna('').str.lower().str.strip() == 'new'].copy()
+                base_orders_df = report_engine.status_slice(base_filtered_df, 'new', status_col=status_col).copy()
             elif dashboard_filter == 'orderd':
-                base_orders_df = base_filtered_df[base_filtered_df[status_col].fillna('').str.lower().str.strip() == 'orderd'].copy()
+                base_orders_df = report_engine.status_slice(base_filtered_df, 'orderd', status_col=status_col).copy()
             elif dashboard_filter == 'done!':
-                base_orders_df = base_filtered_df[base_filtered_df[status_col].fillna('').str.lower().str.strip().isin(['done!', 'done'])].copy()
+                base_orders_df = report_engine.status_slice(base_filtered_df, 'done!', 'done', status_col=status_col).copy()
             elif dashboard_filter == 'needs_attention':
-                base_orders_df = base_filtered_df[(base_filtered_df['has_supplier_data'] == False) & (base_filtered_df[status_col].fillna('').str.lower().str.strip() == 'new')].copy()
+                new_slice = report_engine.status_slice(base_filtered_df, 'new', status_col=status_col)
+                base_orders_df = new_slice[new_slice['has_supplier_data'] == False].copy()
             else:
                 base_orders_df = base_filtered_df[
                     (base_filtered_df['parsed_date'].notna()) & 
@@ -5373,7 +4541,7 @@ with tab1:
         # סינון לפי סטטוס (orderd) - case insensitive
         if pf.get('status') and 'orderd' in new_orders_df.columns:
             status_lower = [s.lower() for s in pf.get('status', [])]
-            new_orders_df = new_orders_df[new_orders_df['orderd'].fillna('').str.strip().str.lower().isin(status_lower)]
+            new_orders_df = report_engine.status_slice(new_orders_df, *status_lower)
         
         # =============================================================
         # חיפוש משופר - מחפש גם בקבוצות!
@@ -5450,6 +4618,8 @@ with tab1:
                 else:
                     return {'color': '#f57c00', 'bg': '#ffe0b2', 'icon': '🟡', 'text': str(status_val)}
             
+            category_summaries = compute_category_summaries(new_orders_df, grouped_events)
+            
             for key, event_data in sorted_events:
                 order_count = len(event_data['orders'])
                 without_supp = event_data['without_supplier']
@@ -5493,8 +4663,7 @@ with tab1:
                     
                     orders_df = pd.DataFrame(event_data['orders'])
                     
-                    new_only_df = orders_df[orders_df['orderd'].fillna('').str.lower().str.strip() == 'new'] if 'orderd' in orders_df.columns else orders_df
-                    display_category_summary(new_only_df, key_prefix=f"cat_{key}")
+                    render_category_summary(category_summaries.get(key))
                     
                     with st.expander(f"📋 פירוט {order_count} הזמנות", expanded=True):
                         
@@ -5540,12 +4709,7 @@ with tab1:
                                         return '💚 נשלח ושולם'
                                     else:
                                         return f'🟡 {status_val}'
-                                display_df['orderd'] = display_df['orderd'].apply(format_status)
-                            
-                            original_supp_price = display_df['SUPP PRICE'].copy() if 'SUPP PRICE' in display_df.columns else None
-                            original_supp_name = display_df['Supplier NAME'].copy() if 'Supplier NAME' in display_df.columns else None
-                            original_supp_order = display_df['SUPP order number'].copy() if 'SUPP order number' in display_df.columns else None
-                            original_rows = display_df['row_index'].copy()
+                                display_df['orderd'] = display_df['orderd'].astype(object).map(format_status)
                             
                             editable_cols = ['SUPP PRICE', 'Supplier NAME', 'SUPP order number']
                             non_editable_cols = [col for col in ['Select'] + available_cols if col not in editable_cols and col != 'Select']
@@ -5580,41 +4744,25 @@ with tab1:
                                 key=f"editor_{key}"
                             )
                             
+                            save_result = st.session_state.pop(f"supplier_save_result_{key}", None)
+                            if save_result:
+                                saved_cells, saved_rows, failed_cells = save_result
+                                if saved_cells:
+                                    st.success(f"✅ עודכנו {saved_cells} תאים ב-{saved_rows} שורות!")
+                                if failed_cells:
+                                    st.error(f"❌ {len(failed_cells)} תאים לא עודכנו: " + ", ".join(failed_cells))
+                            
                             btn_cols = st.columns([2, 2, 2, 1])
                             with btn_cols[0]:
                                 if st.button(f"💾 שמור שינויים", key=f"save_{key}", type="secondary"):
-                                    changes_made = 0
-                                    for i in range(len(edited_df)):
-                                        row_idx = int(original_rows.iloc[i]) if i < len(original_rows) else None
-                                        if not row_idx:
-                                            continue
-                                        
-                                        new_price = str(edited_df.iloc[i].get('SUPP PRICE', '')).strip() if 'SUPP PRICE' in edited_df.columns else None
-                                        old_price = str(original_supp_price.iloc[i]).strip() if original_supp_price is not None and i < len(original_supp_price) else ''
-                                        
-                                        new_name = str(edited_df.iloc[i].get('Supplier NAME', '')).strip() if 'Supplier NAME' in edited_df.columns else None
-                                        old_name = str(original_supp_name.iloc[i]).strip() if original_supp_name is not None and i < len(original_supp_name) else ''
-                                        
-                                        new_order = str(edited_df.iloc[i].get('SUPP order number', '')).strip() if 'SUPP order number' in edited_df.columns else None
-                                        old_order = str(original_supp_order.iloc[i]).strip() if original_supp_order is not None and i < len(original_supp_order) else ''
-                                        
-                                        price_changed = (new_price is not None) and (new_price != old_price)
-                                        name_changed = (new_name is not None) and (new_name != old_name)
-                                        order_changed = (new_order is not None) and (new_order != old_order)
-                                        
-                                        if price_changed or name_changed or order_changed:
-                                            success = update_supplier_data(
-                                                row_idx,
-                                                supp_price=new_price if price_changed else None,
-                                                supp_name=new_name if name_changed else None,
-                                                supp_order=new_order if order_changed else None
-                                            )
-                                            if success:
-                                                changes_made += 1
-                                    
-                                    if changes_made > 0:
-                                        st.cache_data.clear()
-                                        st.success(f"✅ עודכנו {changes_made} שורות!")
+                                    changes = supplier_grid_changes(st.session_state.get(f"editor_{key}"), display_df)
+                                    if changes:
+                                        with st.spinner("שומר..."):
+                                            results = update_supplier_cells(changes)
+                                        failed = [f"#{row} {column} = '{value}'" for row, column, value, ok in results if not ok]
+                                        st.session_state[f"supplier_save_result_{key}"] = (
+                                            len(results) - len(failed), len({row for row, _, _, ok in results if ok}), failed
+                                        )
                                         st.rerun()
                                     else:
                                         st.info("לא זוהו שינויים")
@@ -5628,7 +4776,6 @@ with tab1:
                                             success = update_sheet_status(row_indices, "orderd")
                                         if success:
                                             st.success(f"✅ עודכנו {len(row_indices)} הזמנות לסטטוס הוזמן!")
-                                            st.cache_data.clear()
                                             st.rerun()
                             
                             with btn_cols[2]:
@@ -5640,7 +4787,6 @@ with tab1:
                                             success = update_sheet_status(row_indices, "done!")
                                         if success:
                                             st.success(f"✅ עודכנו {len(row_indices)} הזמנות לסטטוס נשלח!")
-                                            st.cache_data.clear()
                                             st.rerun()
                                     
                                     if st.button(f"⚠️ נשלח ולא שולם ({len(selected)})", key=f"mark_sent_not_paid_{key}"):
@@ -5651,15 +4797,14 @@ with tab1:
                                             status_success = update_sheet_status(row_indices, "sent_not_paid")
                                             
                                             if status_success:
-                                                email_success, email_message = send_not_paid_email(orders_data)
+                                                email_status, email_message = send_not_paid_email(orders_data)
                                                 
-                                                if email_success:
-                                                    st.success(f"🔴 עודכנו {len(row_indices)} הזמנות + נשלח מייל התראה לאופרציה!")
+                                                if email_status != 'failed':
+                                                    st.success(f"🔴 עודכנו {len(row_indices)} הזמנות")
                                                     st.info(f"📧 {email_message}")
                                                 else:
                                                     st.warning(f"✅ סטטוס עודכן, אבל המייל לא נשלח: {email_message}")
                                                 
-                                                st.cache_data.clear()
                                                 st.rerun()
                                     
                                     st.markdown("---")
@@ -5700,21 +4845,19 @@ with tab1:
                                                 status_success = update_sheet_status(row_indices, status_text)
                                                 
                                                 if status_success:
-                                                    email_success, email_message = send_payment_confirmation_email(
+                                                    email_status, email_message = send_payment_confirmation_email(
                                                         orders_data, 
                                                         payment_method.strip(),
                                                         attachment_data,
                                                         attachment_name
                                                     )
                                                     
-                                                    if email_success:
-                                                        file_msg = " + קובץ מצורף" if attachment_data else ""
-                                                        st.success(f"✅ עודכנו {len(row_indices)} הזמנות לסטטוס 'שולם' + נשלח מייל אישור לאופרציה{file_msg}!")
+                                                    if email_status != 'failed':
+                                                        st.success(f"✅ עודכנו {len(row_indices)} הזמנות לסטטוס 'שולם'")
                                                         st.info(f"📧 {email_message}")
                                                     else:
                                                         st.warning(f"✅ סטטוס עודכן, אבל המייל לא נשלח: {email_message}")
                                                     
-                                                    st.cache_data.clear()
                                                     st.rerun()
                                         else:
                                             st.warning("יש להזין אמצעי תשלום")
@@ -5773,6 +4916,7 @@ with tab1:
     else:
         st.warning(t("no_orderd_col"))
 
+lap('render:tab2')
 with tab2:
     st.header(t("profit_header"))
     
@@ -5936,7 +5080,7 @@ with tab2:
             
             with_supplier_df['Qty_numeric'] = pd.to_numeric(with_supplier_df.get('Qty', 0), errors='coerce').fillna(0)
             
-            event_profit = with_supplier_df.groupby('normalized_event').agg({
+            event_profit = with_supplier_df.groupby('normalized_event', observed=True).agg({
                 'TOTAL_clean': 'sum',
                 'SUPP_PRICE_clean': 'sum',
                 'profit': 'sum',
@@ -5944,7 +5088,7 @@ with tab2:
                 'Qty_numeric': 'sum'
             }).reset_index()
             
-            original_names = with_supplier_df.groupby('normalized_event')['event name'].first()
+            original_names = with_supplier_df.groupby('normalized_event', observed=True)['event name'].first()
             event_profit['event_display'] = event_profit['normalized_event'].map(original_names)
             
             event_profit['profit_per_ticket'] = event_profit.apply(
@@ -6013,6 +5157,7 @@ with tab2:
     else:
         st.success("כל ההזמנות כוללות נתוני ספק!")
 
+lap('render:tab3')
 with tab3:
     st.header(t("operational_header"))
     
@@ -6114,7 +5259,7 @@ with tab3:
                                         return '💚 נשלח ושולם'
                                     else:
                                         return f'🟡 {status_val}'
-                                display_df['orderd'] = display_df['orderd'].apply(format_status_op)
+                                display_df['orderd'] = display_df['orderd'].astype(object).map(format_status_op)
                             
                             op_column_config = {
                                 "Select": st.column_config.CheckboxColumn("בחר", default=False),
@@ -6155,7 +5300,6 @@ with tab3:
                                             success = update_sheet_status(row_indices, "done!")
                                         if success:
                                             st.success(f"✅ עודכנו {len(row_indices)} הזמנות!")
-                                            st.cache_data.clear()
                                             st.rerun()
                     
                     st.markdown("---")
@@ -6164,6 +5308,7 @@ with tab3:
     else:
         st.warning(t("date_not_found"))
 
+lap('render:tab4')
 with tab4:
     st.header("🆕 הזמנות חדשות לטיפול")
     st.markdown("*כל ההזמנות עם סטטוס 'New' או ללא סטטוס - עדכן מספר הזמנה ספק וסטטוס*")
@@ -6174,8 +5319,7 @@ with tab4:
     
     if tab4_status_col:
         # Filter for new or empty status
-        status_values = fresh_df[tab4_status_col].fillna('').astype(str).str.strip()
-        all_new_orders = fresh_df[(status_values.str.lower() == 'new') | (status_values == '')].copy()
+        all_new_orders = report_engine.status_slice(fresh_df, 'new', '', status_col=tab4_status_col).copy()
         
         # Sort by row index (descending) to get newest entries first
         if 'row_index' in all_new_orders.columns:
@@ -6187,137 +5331,188 @@ with tab4:
         if not all_new_orders.empty:
             st.success(f"📋 **{len(all_new_orders)} הזמנות חדשות** לטיפול")
             
+            if st.session_state.get('tab4_save_success'):
+                st.success(st.session_state.tab4_save_success)
+                st.session_state.tab4_save_success = None
+            
             # Refresh button
             if st.button("🔄 רענן נתונים", key="refresh_new_orders"):
-                st.cache_data.clear()
+                invalidate(REGION_SNAPSHOT)
                 st.rerun()
             
+            # Only the visible page is rendered - widget count stays flat as the backlog grows
+            view_cols = st.columns([2, 1, 1.5, 1])
+            with view_cols[0]:
+                tab4_view = st.radio("תצוגה", ["🗂️ כרטיסים", "📋 טבלה"], horizontal=True, key="tab4_view_mode")
+            compact_view = tab4_view == "📋 טבלה"
+            with view_cols[1]:
+                page_size_options = [50, 100, 200] if compact_view else [10, 20, 50]
+                tab4_page_size = st.selectbox("שורות בעמוד", page_size_options, key=f"tab4_page_size_{'table' if compact_view else 'cards'}")
+            total_pages = max(1, -(-len(all_new_orders) // tab4_page_size))
+            with view_cols[2]:
+                jump_to = st.text_input("קפוץ להזמנה #", key="tab4_jump_to", placeholder="מספר הזמנה").strip().lstrip('#')
+            if jump_to and jump_to != st.session_state.get('tab4_jump_done'):
+                st.session_state.tab4_jump_done = jump_to
+                order_numbers = all_new_orders['Order number'].astype(str).str.strip() if 'Order number' in all_new_orders.columns else pd.Series(dtype=str)
+                positions = (order_numbers == jump_to).to_numpy().nonzero()[0]
+                if len(positions):
+                    st.session_state.tab4_page = int(positions[0]) // tab4_page_size + 1
+                else:
+                    st.warning(f"הזמנה #{jump_to} לא נמצאה בהזמנות החדשות")
+            if st.session_state.get('tab4_page', 1) > total_pages:
+                st.session_state.tab4_page = total_pages
+            with view_cols[3]:
+                tab4_page = st.number_input(f"עמוד (מתוך {total_pages})", min_value=1, max_value=total_pages, step=1, key="tab4_page")
+            
+            page_start = (tab4_page - 1) * tab4_page_size
+            page_orders = all_new_orders.iloc[page_start:page_start + tab4_page_size]
+            st.caption(f"מציג {page_start + 1:,}-{page_start + len(page_orders):,} מתוך {len(all_new_orders):,}")
+            
             st.markdown("---")
             
-            for idx, (_, order) in enumerate(all_new_orders.iterrows()):
-                order_num = order.get('Order number', '-')
-                event_name = str(order.get('event name', '-'))[:50]
-                event_date = order.get('Date of the event', '-')
-                order_date = order.get('order date', '-')
-                qty = order.get('Qty', '-')
-                total = order.get('TOTAL', '-')
-                source = order.get('source', '-')
-                current_supp_order = str(order.get('SUPP order number', '')).strip()
-                current_status = str(order.get(tab4_status_col, '')).strip()
-                row_idx = order.get('row_index', None)
-                category = order.get('Category / Section', '-')
+            status_options = ['new', 'orderd', 'done!', 'old no data']
+            
+            if compact_view:
+                table_cols = ['row_index', 'Order number', 'event name', 'Date of the event', 'Qty', 'TOTAL', 'source', 'SUPP order number', tab4_status_col, 'SUPP PRICE']
+                table_df = page_orders.reindex(columns=table_cols).set_index('row_index').astype(object).fillna('')
+                table_df = table_df.astype(str).apply(lambda col: col.str.strip())
+                table_df[tab4_status_col] = table_df[tab4_status_col].str.lower().where(table_df[tab4_status_col].str.lower().isin(status_options), 'new')
                 
-                is_ordered = current_status.lower() == 'orderd'
+                edited_table = st.data_editor(
+                    table_df,
+                    column_config={
+                        'Order number': st.column_config.TextColumn("מס' הזמנה", disabled=True),
+                        'event name': st.column_config.TextColumn("אירוע", disabled=True),
+                        'Date of the event': st.column_config.TextColumn("תאריך אירוע", disabled=True),
+                        'Qty': st.column_config.TextColumn("כמות", disabled=True),
+                        'TOTAL': st.column_config.TextColumn("סה\"כ", disabled=True),
+                        'source': st.column_config.TextColumn("מקור", disabled=True),
+                        'SUPP order number': st.column_config.TextColumn("מס' הזמנה ספק"),
+                        tab4_status_col: st.column_config.SelectboxColumn("סטטוס", options=status_options, required=True),
+                        'SUPP PRICE': st.column_config.TextColumn("מחיר ספק"),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                    key=f"tab4_table_{tab4_page}_{tab4_page_size}"
+                )
                 
-                with st.container(border=True):
-                    if is_ordered:
-                        st.markdown("""
-                        <style>
-                        div[data-testid="stVerticalBlockBorderWrapper"]:has(h3:contains("הזמנה")) {
-                            background-color: rgba(56, 189, 248, 0.15) !important;
-                        }
-                        </style>
-                        <div style="background-color: rgba(56, 189, 248, 0.15); margin: -1rem; padding: 1rem; border-radius: 8px; margin-bottom: 0.5rem;">
-                        <h4 style="margin:0; color: #0284c7;">🎫 הזמנה #""" + str(order_num) + """ ✓ הוזמן</h4>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.markdown(f"**{event_name}** | 📅 אירוע: {event_date} | 🛒 הזמנה: {order_date} | 🎫 {qty} כרטיסים | €{total} | 📍 {source} | 📁 {category}")
+                if st.button("💾 שמור שינויים", key="tab4_table_save", type="primary"):
+                    changes = {}
+                    edited_table = edited_table.fillna('')
+                    for column in ['SUPP order number', tab4_status_col, 'SUPP PRICE']:
+                        changed = edited_table[column] != table_df[column]
+                        if column == 'SUPP PRICE':
+                            changed &= edited_table[column].str.strip() != ''
+                        for row_index, value in edited_table.loc[changed, column].items():
+                            changes.setdefault(int(row_index), {})[column] = value
+                    if changes:
+                        with st.spinner("שומר..."):
+                            success, written = update_new_order_fields(changes)
+                        if success:
+                            st.session_state.tab4_save_success = f"✅ {len(changes)} הזמנות עודכנו ({written} תאים)"
+                            st.rerun()
                     else:
-                        st.markdown(f"### 🎫 הזמנה #{order_num}")
-                        st.markdown(f"**{event_name}** | 📅 אירוע: {event_date} | 🛒 הזמנה: {order_date} | 🎫 {qty} כרטיסים | €{total} | 📍 {source} | 📁 {category}")
+                        st.info("אין שינויים לשמור")
+            
+            else:
+                for idx, (_, order) in enumerate(page_orders.iterrows(), start=page_start):
+                    order_num = order.get('Order number', '-')
+                    event_name = str(order.get('event name', '-'))[:50]
+                    event_date = order.get('Date of the event', '-')
+                    order_date = order.get('order date', '-')
+                    qty = order.get('Qty', '-')
+                    total = order.get('TOTAL', '-')
+                    source = order.get('source', '-')
+                    current_supp_order = str(order.get('SUPP order number', '')).strip()
+                    current_status = str(order.get(tab4_status_col, '')).strip()
+                    row_idx = order.get('row_index', None)
+                    category = order.get('Category / Section', '-')
                     
-                    col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
-                    with col1:
-                        new_supp_order = st.text_input(
-                            "מס' הזמנה ספק",
-                            value=current_supp_order,
-                            key=f"tab4_supp_{idx}_{order_num}",
-                            placeholder="הכנס מספר הזמנה ספק"
-                        )
-                    with col2:
-                        status_options = ['new', 'orderd', 'done!', 'old no data']
-                        current_idx = status_options.index(current_status.lower()) if current_status.lower() in status_options else 0
-                        new_status = st.selectbox(
-                            "סטטוס",
-                            options=status_options,
-                            index=current_idx,
-                            key=f"tab4_status_{idx}_{order_num}"
-                        )
-                    with col3:
-                        supp_price_val = order.get('SUPP PRICE', '')
-                        new_supp_price = st.text_input(
-                            "מחיר ספק",
-                            value=str(supp_price_val) if supp_price_val else "",
-                            key=f"tab4_price_{idx}_{order_num}",
-                            placeholder="מחיר"
-                        )
-                    with col4:
-                        st.write("")
-                        st.write("")
-                        if st.button("💾 שמור", key=f"tab4_save_{idx}_{order_num}", type="primary"):
-                            if row_idx:
-                                try:
-                                    client = get_gspread_client()
-                                    sheet = client.open(SHEET_NAME)
-                                    worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
-                                    headers = worksheet.row_values(1)
-                                    
-                                    supp_order_col_idx = None
-                                    status_col_idx = None
-                                    supp_price_col_idx = None
-                                    for i, h in enumerate(headers):
-                                        h_lower = h.strip().lower()
-                                        if h_lower in ['supp order number', 'supp order']:
-                                            supp_order_col_idx = i + 1
-                                        if h_lower == 'orderd':
-                                            status_col_idx = i + 1
-                                        if h_lower == 'supp price':
-                                            supp_price_col_idx = i + 1
-                                    
-                                    updates = []
-                                    if supp_order_col_idx and new_supp_order != current_supp_order:
-                                        col_letter = col_number_to_letter(supp_order_col_idx)
-                                        updates.append({'range': f'{col_letter}{row_idx}', 'values': [[new_supp_order]]})
-                                    
-                                    if status_col_idx and new_status != current_status:
-                                        col_letter = col_number_to_letter(status_col_idx)
-                                        updates.append({'range': f'{col_letter}{row_idx}', 'values': [[new_status]]})
-                                    
-                                    if supp_price_col_idx and new_supp_price and new_supp_price != str(supp_price_val):
-                                        col_letter = col_number_to_letter(supp_price_col_idx)
-                                        updates.append({'range': f'{col_letter}{row_idx}', 'values': [[new_supp_price]]})
+                    is_ordered = current_status.lower() == 'orderd'
+                    
+                    with st.container(border=True):
+                        if is_ordered:
+                            st.markdown("""
+                            <style>
+                            div[data-testid="stVerticalBlockBorderWrapper"]:has(h3:contains("הזמנה")) {
+                                background-color: rgba(56, 189, 248, 0.15) !important;
+                            }
+                            </style>
+                            <div style="background-color: rgba(56, 189, 248, 0.15); margin: -1rem; padding: 1rem; border-radius: 8px; margin-bottom: 0.5rem;">
+                            <h4 style="margin:0; color: #0284c7;">🎫 הזמנה #""" + str(order_num) + """ ✓ הוזמן</h4>
+                            </div>
+                            """, unsafe_allow_html=True)
+                            st.markdown(f"**{event_name}** | 📅 אירוע: {event_date} | 🛒 הזמנה: {order_date} | 🎫 {qty} כרטיסים | €{total} | 📍 {source} | 📁 {category}")
+                        else:
+                            st.markdown(f"### 🎫 הזמנה #{order_num}")
+                            st.markdown(f"**{event_name}** | 📅 אירוע: {event_date} | 🛒 הזמנה: {order_date} | 🎫 {qty} כרטיסים | €{total} | 📍 {source} | 📁 {category}")
+                        
+                        col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
+                        with col1:
+                            new_supp_order = st.text_input(
+                                "מס' הזמנה ספק",
+                                value=current_supp_order,
+                                key=f"tab4_supp_{idx}_{order_num}",
+                                placeholder="הכנס מספר הזמנה ספק"
+                            )
+                        with col2:
+                            current_idx = status_options.index(current_status.lower()) if current_status.lower() in status_options else 0
+                            new_status = st.selectbox(
+                                "סטטוס",
+                                options=status_options,
+                                index=current_idx,
+                                key=f"tab4_status_{idx}_{order_num}"
+                            )
+                        with col3:
+                            supp_price_val = order.get('SUPP PRICE', '')
+                            new_supp_price = st.text_input(
+                                "מחיר ספק",
+                                value=str(supp_price_val) if supp_price_val else "",
+                                key=f"tab4_price_{idx}_{order_num}",
+                                placeholder="מחיר"
+                            )
+                        with col4:
+                            st.write("")
+                            st.write("")
+                            if st.button("💾 שמור", key=f"tab4_save_{idx}_{order_num}", type="primary"):
+                                if row_idx:
+                                    values = {}
+                                    if new_supp_order != current_supp_order:
+                                        values['SUPP order number'] = new_supp_order
+                                    if new_status != current_status:
+                                        values[tab4_status_col] = new_status
+                                    if new_supp_price and new_supp_price != str(supp_price_val):
+                                        values['SUPP PRICE'] = new_supp_price
                                     
-                                    if updates:
-                                        worksheet.batch_update(updates)
-                                        st.success(f"✅ הזמנה #{order_num} עודכנה בהצלחה!")
-                                        st.cache_data.clear()
-                                        time.sleep(0.5)
-                                        st.rerun()
+                                    if values:
+                                        success, _ = update_new_order_fields({int(row_idx): values})
+                                        if success:
+                                            st.session_state.tab4_save_success = f"✅ הזמנה #{order_num} עודכנה בהצלחה!"
+                                            st.rerun()
                                     else:
                                         st.info("אין שינויים לשמור")
-                                except Exception as e:
-                                    st.error(f"שגיאה: {str(e)}")
-                            else:
-                                st.warning("לא נמצא מספר שורה - לא ניתן לעדכן")
-                    with col5:
-                        st.write("")
-                        st.write("")
-                        if st.button("🗑️ מחק", key=f"tab4_delete_{idx}_{order_num}", type="secondary"):
-                            if row_idx:
-                                with st.spinner("מוחק הזמנה..."):
-                                    success = delete_order_row(row_idx)
-                                if success:
-                                    st.success(f"✅ הזמנה #{order_num} נמחקה!")
-                                    st.cache_data.clear()
-                                    time.sleep(0.5)
-                                    st.rerun()
-                            else:
-                                st.warning("לא נמצא מספר שורה")
+                                else:
+                                    st.warning("לא נמצא מספר שורה - לא ניתן לעדכן")
+                        with col5:
+                            st.write("")
+                            st.write("")
+                            if st.button("🗑️ מחק", key=f"tab4_delete_{idx}_{order_num}", type="secondary"):
+                                if row_idx:
+                                    with st.spinner("מוחק הזמנה..."):
+                                        success = delete_order_row(row_idx)
+                                    if success:
+                                        st.success(f"✅ הזמנה #{order_num} נמחקה!")
+                                        invalidate(REGION_SNAPSHOT)
+                                        time.sleep(0.5)
+                                        st.rerun()
+                                else:
+                                    st.warning("לא נמצא מספר שורה")
         else:
             st.success("🎉 אין הזמנות חדשות לטיפול! כל ההזמנות טופלו.")
     else:
         st.warning("לא נמצאה עמודת סטטוס")
 
+lap('render:tab5')
 with tab5:
     st.header("📈 מכירות")
     st.markdown("מעקב אחר מכירות - יומי, שבועי וחודשי")
@@ -6379,7 +5574,7 @@ with tab5:
     
     st.markdown("---")
     
-    sales_base_df = df.copy()
+    sales_base_df = df.copy(deep=False)
     
     if 'parsed_date' not in sales_base_df.columns and 'Date of the event' in sales_base_df.columns:
         sales_base_df['parsed_date'] = sales_base_df['Date of the event'].apply(lambda x: smart_date_parser(x, ''))
@@ -6577,7 +5772,7 @@ with tab5:
             summary_data['TOTAL_num'] = summary_data.apply(lambda r: clean_numeric(r.get('TOTAL', 0)), axis=1)
             
             if 'event name' in summary_data.columns:
-                event_summary = summary_data.groupby('event name').agg({
+                event_summary = summary_data.groupby('event name', observed=True).agg({
                     'Qty_num': 'sum',
                     'TOTAL_num': 'sum'
                 }).reset_index()
@@ -6605,7 +5800,7 @@ with tab5:
                     """, unsafe_allow_html=True)
             
             if 'source' in summary_data.columns:
-                source_summary = summary_data.groupby('source').agg({
+                source_summary = summary_data.groupby('source', observed=True).agg({
                     'Qty_num': 'sum',
                     'TOTAL_num': 'sum'
                 }).reset_index()
@@ -6679,6 +5874,7 @@ with tab5:
     else:
         st.warning("לא נמצאה עמודת תאריך הזמנה בנתונים")
 
+lap('render:tab6')
 with tab6:
     st.header("📊 השוואת מקורות")
     st.markdown("ניתוח רווחיות לפי מקור מכירה")
@@ -6738,7 +5934,7 @@ with tab6:
             custom_range_src = None
     
     # Filter data for source comparison
-    source_df = df.copy()
+    source_df = df.copy(deep=False)
     
     # Apply event filter first
     if st.session_state.tab6_selected_event and 'event name' in source_df.columns:
@@ -6793,7 +5989,7 @@ with tab6:
                 'revenue_net': 'sum',
                 'commission_amount': 'sum'
             }
-            source_stats = source_with_supp.groupby('source_display').agg(agg_dict).reset_index()
+            source_stats = source_with_supp.groupby('source_display', observed=True).agg(agg_dict).reset_index()
             
             source_stats.columns = ['מקור', 'הזמנות', 'כמות כרטיסים', 'הכנסות', 'עלויות', 'רווח', 'הכנסות_נטו', 'עמלות']
             source_stats['רווח/כרטיס'] = source_stats.apply(
@@ -6944,6 +6140,7 @@ with tab6:
     else:
         st.warning("לא נמצאה עמודת מקור בנתונים")
 
+lap('render:tab7')
 with tab7:
     st.header("📧 מיילים אוטומטיים")
     st.markdown("ניהול ושליחה ידנית של דוחות אוטומטיים")
@@ -6955,7 +6152,7 @@ with tab7:
     | דוח | שעה | תיאור |
     |-----|-----|-------|
     | 🔴 תזכורת הזמנות לא שולמו | 10:00 | מייל לאופרציה עם הזמנות בסטטוס "נשלח ולא שולם" |
-    | 💰 דוח מכירות יומי | 10:05 | סיכום מכירות יומי |
+    | 💰 דוח מכירות יומי | 10:00 | סיכום מכירות יומי |
     | 📦 דוח הזמנות חדשות | 20:00 | הזמנות חדשות שטרם טופלו |
     | 📊 דוח מכירות שבועי | יום א' 09:00 | סיכום שבועי של מכירות |
     """
@@ -6971,26 +6168,16 @@ with tab7:
         if st.button("📤 שלח עכשיו", key="send_unpaid_now"):
             with st.spinner("בודק הזמנות ושולח מייל..."):
                 try:
-                    from daily_reminder import get_unpaid_orders, send_daily_reminder_email
-                    orders = get_unpaid_orders()
+                    orders = unpaid_orders_snapshot
                     if orders:
-                        success = send_daily_reminder_email(orders)
-                        if success:
-                            st.success(f"✅ נשלח בהצלחה! נמצאו {len(orders)} הזמנות לא שולמו")
-                        else:
-                            st.error("❌ שגיאה בשליחה")
+                        status, message = send_unpaid_reminder_email(orders)
+                        show_email_status(status, message, f" - {len(orders)} הזמנות לא שולמו")
                     else:
                         st.info("✅ אין הזמנות לא שולמו")
                 except Exception as e:
                     st.error(f"שגיאה: {e}")
         
-        unpaid_count = 0
-        try:
-            from daily_reminder import get_unpaid_orders
-            unpaid_orders = get_unpaid_orders()
-            unpaid_count = len(unpaid_orders)
-        except:
-            pass
+        unpaid_count = len(unpaid_orders_snapshot)
         if unpaid_count > 0:
             st.warning(f"📋 {unpaid_count} הזמנות ממתינות לתשלום")
         else:
@@ -7001,14 +6188,11 @@ with tab7:
         if st.button("📤 שלח עכשיו", key="send_new_orders_now"):
             with st.spinner("בודק הזמנות ושולח מייל..."):
                 try:
-                    from daily_new_orders_report import get_new_orders, send_daily_report_email, DEFAULT_EMAIL
-                    orders_df = get_new_orders()
+                    from daily_new_orders_report import get_new_orders, DEFAULT_EMAIL
+                    orders_df = get_new_orders(orders_snapshot)
                     if not orders_df.empty:
-                        success = send_daily_report_email(orders_df, DEFAULT_EMAIL)
-                        if success:
-                            st.success(f"✅ נשלח בהצלחה! {len(orders_df)} הזמנות חדשות")
-                        else:
-                            st.error("❌ שגיאה בשליחה")
+                        status, message = send_new_orders_report_email(orders_df, DEFAULT_EMAIL)
+                        show_email_status(status, message, f" - {len(orders_df)} הזמנות חדשות")
                     else:
                         st.info("✅ אין הזמנות חדשות")
                 except Exception as e:
@@ -7023,14 +6207,11 @@ with tab7:
         if st.button("📤 שלח עכשיו", key="send_daily_sales_now"):
             with st.spinner("מכין ושולח דוח..."):
                 try:
-                    from daily_sales_report import get_todays_orders, send_daily_sales_email, DEFAULT_EMAIL
-                    orders_df = get_todays_orders()
+                    from daily_sales_report import get_todays_orders, DEFAULT_EMAIL
+                    orders_df = get_todays_orders(orders_snapshot)
                     if not orders_df.empty:
-                        success = send_daily_sales_email(orders_df, DEFAULT_EMAIL)
-                        if success:
-                            st.success(f"✅ נשלח בהצלחה! {len(orders_df)} הזמנות היום")
-                        else:
-                            st.error("❌ שגיאה בשליחה")
+                        status, message = send_daily_sales_report_email(orders_df, DEFAULT_EMAIL)
+                        show_email_status(status, message, f" - {len(orders_df)} הזמנות היום")
                     else:
                         st.info("אין הזמנות להיום")
                 except Exception as e:
@@ -7041,14 +6222,11 @@ with tab7:
         if st.button("📤 שלח עכשיו", key="send_weekly_sales_now"):
             with st.spinner("מכין ושולח דוח..."):
                 try:
-                    from weekly_sales_report import get_weekly_orders, send_weekly_sales_email, DEFAULT_EMAIL
-                    orders_df, start_of_week, end_of_week = get_weekly_orders()
+                    from weekly_sales_report import get_weekly_orders, DEFAULT_EMAIL
+                    orders_df, start_of_week, end_of_week = get_weekly_orders(orders_snapshot)
                     if not orders_df.empty:
-                        success = send_weekly_sales_email(orders_df, start_of_week, end_of_week, DEFAULT_EMAIL)
-                        if success:
-                            st.success(f"✅ נשלח בהצלחה! {len(orders_df)} הזמנות השבוע")
-                        else:
-                            st.error("❌ שגיאה בשליחה")
+                        status, message = send_weekly_sales_report_email(orders_df, DEFAULT_EMAIL, start_of_week, end_of_week)
+                        show_email_status(status, message, f" - {len(orders_df)} הזמנות השבוע")
                     else:
                         st.info("אין הזמנות השבוע")
                 except Exception as e:
@@ -7096,7 +6274,7 @@ with tab7:
     | דוח | זמן | יום |
     |-----|-----|-----|
     | 🔴 הזמנות לא שולמו | 10:00 | כל יום |
-    | 💰 דוח מכירות יומי | 10:05 | כל יום |
+    | 💰 דוח מכירות יומי | 10:00 | כל יום |
     | 📦 הזמנות חדשות | 20:00 | כל יום |
     | 📊 דוח שבועי | 09:00 | יום ראשון |
     """
@@ -7104,12 +6282,12 @@ with tab7:
     
     st.info("💡 **לאחר הגדרת GitHub Actions, המיילים יישלחו אוטומטית לפי הלוח זמנים!**")
 
+lap('render:tab8')
 with tab8:
     st.header("🔴 תזכורת - הזמנות לא שולמו")
     st.markdown("דף זה מציג את כל ההזמנות שלא שולמו עם אפשרות לסמן אותן כשולמו")
     
     try:
-        from daily_reminder import get_unpaid_orders
         import hashlib
         
         def generate_mark_paid_token(order_num, row_index):
@@ -7120,7 +6298,7 @@ with tab8:
             data = f"{order_num}:{row_index}:{secret}"
             return hashlib.sha256(data.encode()).hexdigest()[:16]
         
-        unpaid_orders = get_unpaid_orders()
+        unpaid_orders = unpaid_orders_snapshot
         
         if not unpaid_orders:
             st.success("✅ אין הזמנות שלא שולמו - הכל מעודכן!")
@@ -7244,7 +6422,7 @@ with tab8:
                                         
                                         st.success(f"✅ הזמנה {order_num} עודכנה בהצלחה!")
                                         st.balloons()
-                                        st.cache_data.clear()
+                                        invalidate(REGION_SNAPSHOT)
                                         st.rerun()
                                     else:
                                         st.error("לא נמצאה עמודת סטטוס בגיליון")
@@ -7267,16 +6445,11 @@ with tab8:
             # Send email button
             st.markdown("---")
             if st.button("📧 שלח מייל תזכורת", key="send_reminder_email", type="primary"):
-                with st.spinner("שולח מייל..."):
-                    try:
-                        from daily_reminder import send_daily_reminder_email
-                        success = send_daily_reminder_email(unpaid_orders)
-                        if success:
-                            st.success(f"✅ מייל נשלח בהצלחה ל-{len(unpaid_orders)} הזמנות!")
-                        else:
-                            st.error("❌ שגיאה בשליחת המייל")
-                    except Exception as e:
-                        st.error(f"שגיאה: {e}")
+                try:
+                    status, message = send_unpaid_reminder_email(unpaid_orders)
+                    show_email_status(status, message, f" ({len(unpaid_orders)} הזמנות)")
+                except Exception as e:
+                    st.error(f"שגיאה: {e}")
     
     except Exception as e:
         st.error(f"שגיאה בטעינת ההזמנות: {e}")
@@ -7289,3 +6462,8 @@ st.markdown(
     f"</div>",
     unsafe_allow_html=True
 )
+
+perf_run = finish_rerun()
+if perf_panel_enabled():
+    with st.sidebar:
+        render_perf_panel(perf_run, recent_runs('app'), get_sheets_gateway().usage())
@@ -0,0 +1,8 @@
+"""
+Offline benchmarks for the load / analytics / email pipeline.
+synthetic_sheet builds a realistic orders sheet at any size, app_functions
+pulls the pure helpers out of app.py without running the Streamlit page, and
+run_benchmarks times each stage and records the results as JSON.
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000
+"""
@@ -0,0 +1,65 @@
+"""
+app.py helpers without the Streamlit page.
+Importing app.py runs the whole dashboard, so this compiles only the requested
+top-level functions (plus the helpers, imports and simple constants they
+reference) out of its source into a private namespace.
+
+No Streamlit import.
+"""
+
+import ast
+import os
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+def _referenced_names(node):
+    """Global names a node reads (a function's own arguments and local assignments excluded)"""
+    loads = {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+    if not isinstance(node, ast.FunctionDef):
+        return loads
+    local = {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+    local |= {arg.arg for arg in ast.walk(node.args) if isinstance(arg, ast.arg)}
+    local |= {alias.asname or alias.name for n in ast.walk(node) if isinstance(n, (ast.Import, ast.ImportFrom)) for alias in n.names}
+    local |= {n.name for n in ast.walk(node) if isinstance(n, ast.FunctionDef) and n is not node}
+    return loads - local
+
+def _bound_names(node):
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return {(alias.asname or alias.name).split('.')[0] for alias in node.names}
+    if isinstance(node, ast.Assign):
+        return {target.id for target in node.targets if isinstance(target, ast.Name)}
+    return {node.name}
+
+def _is_plain_value(node):
+    """Constants / aliases only - never a call that would touch Streamlit or the sheet"""
+    return not any(isinstance(n, (ast.Call, ast.Lambda)) for n in ast.walk(node))
+
+def load_app_functions(*names, overrides=None, path=APP_PATH):
+    """{name: function} for top-level app.py functions.
+    overrides pre-seeds globals the functions read (e.g. the sidebar filter values, or t)."""
+    with open(path, encoding='utf-8') as source_file:
+        tree = ast.parse(source_file.read(), filename=path)
+
+    overrides = dict(overrides or {})
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            node.decorator_list = []
+            definitions[node.name] = node
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) or (isinstance(node, ast.Assign) and _is_plain_value(node.value)):
+            for name in _bound_names(node):
+                definitions.setdefault(name, node)
+
+    wanted, pending = [], list(names)
+    while pending:
+        name = pending.pop()
+        node = definitions.get(name)
+        if node is None or name in overrides or node in wanted:
+            continue
+        wanted.append(node)
+        pending.extend(_referenced_names(node))
+
+    module = ast.Module(body=[node for node in tree.body if node in wanted], type_ignores=[])
+    namespace = {'__name__': 'app_functions', **overrides}
+    exec(compile(module, path, 'exec'), namespace)
+    return {name: namespace[name] for name in names}
@@ -0,0 +1,194 @@
+"""
+Offline pipeline benchmark.
+Times every stage of load -> enrich -> select / filter / group -> report and
+email building on synthetic sheets of several sizes, appends the run to a JSON
+results file and flags stages that got slower than the previous run.
+
+    python -m benchmarks.run_benchmarks                      # 1k / 10k / 100k
+    python -m benchmarks.run_benchmarks --sizes 1000 --repeat 5 --fail-on-regression
+
+No Streamlit import, no network (fixed exchange rates).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import report_engine
+from email_templates import render_payment_collection_email
+from fake_sheets import FakeBackend, FakeClient
+from frame_schema import compact_order_frame
+from benchmarks.app_functions import load_app_functions
+from benchmarks.synthetic_sheet import generate_sheet_values
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Local run history (gitignored) - each machine compares against its own previous runs
+DEFAULT_RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.json')
+REGRESSION_THRESHOLD = 1.25
+SLOW_STAGE_SECONDS = 2.0
+FIXED_RATES = {'GBP': 1.18, 'USD': 0.93}
+
+# app.py's sidebar filters, as apply_filters reads them from module globals
+FILTER_GLOBALS = {
+    't': lambda key: key,
+    'selected_events': [],
+    'date_range': None,
+    'selected_sources': ['tixstock', 'viagogo', 'stubhub'],
+    'selected_teams': ['Arsenal', 'Real Madrid', 'Liverpool'],
+    'selected_status': None,
+}
+
+def _enrich(values):
+    report_engine._date_parse_cache.clear()
+    return report_engine.enrich_orders(report_engine.values_to_dataframe(values), rates=FIXED_RATES)
+
+def build_context(n_rows, seed=0):
+    """Synthetic sheet plus the intermediate frames later stages start from"""
+    values = generate_sheet_values(n_rows, seed=seed)
+    enriched = _enrich(values)
+    last_order_day = enriched['order_date_parsed'].max().date()
+    week_start, week_end = report_engine.current_week_bounds(last_order_day)
+    backend = FakeBackend()
+    backend.add_spreadsheet(report_engine.SHEET_NAME, values)
+    return {
+        'values': values,
+        'client': FakeClient(backend),
+        'raw': report_engine.values_to_dataframe(values),
+        'enriched': enriched,
+        'unpaid': report_engine.select_unpaid_orders(enriched),
+        'new_orders': report_engine.select_new_orders(enriched),
+        'report_day': last_order_day,
+        'week': (week_start, week_end),
+    }
+
+def build_stages():
+    """[(name, fn(ctx), max_rows)] - max_rows caps the input of stages that do not scale (None = full size)"""
+    app = load_app_functions(
+        'group_orders_by_event', 'apply_filters', 'get_rows_for_orderd', 'get_rows_for_done',
+        'get_rows_for_old_no_data', overrides=FILTER_GLOBALS
+    )
+    now = datetime.now(report_engine.ISRAEL_TZ)
+    return [
+        ('fetch_sheet (in-memory)', lambda ctx: report_engine.load_orders(ctx['client']), None),
+        ('values_to_dataframe', lambda ctx: report_engine.values_to_dataframe(ctx['values']), None),
+        ('enrich_orders', lambda ctx: (report_engine._date_parse_cache.clear(), report_engine.enrich_orders(ctx['raw'].copy(), rates=FIXED_RATES)), None),
+        ('values_to_dataframe+enrich_orders', lambda ctx: _enrich(ctx['values']), None),
+        ('compact_order_frame', lambda ctx: compact_order_frame(ctx['enriched'].copy()), None),
+        ('status_slice', lambda ctx: report_engine.status_slice(ctx['enriched'], 'new', ''), None),
+        ('select_unpaid_orders', lambda ctx: report_engine.select_unpaid_orders(ctx['enriched']), None),
+        ('apply_filters', lambda ctx: app['apply_filters'](ctx['enriched']), None),
+        ('get_rows_for_orderd', lambda ctx: app['get_rows_for_orderd'](ctx['enriched']), None),
+        ('get_rows_for_done', lambda ctx: app['get_rows_for_done'](ctx['enriched']), None),
+        ('get_rows_for_old_no_data', lambda ctx: app['get_rows_for_old_no_data'](ctx['enriched']), None),
+        ('group_orders_by_event', lambda ctx: app['group_orders_by_event'](ctx['enriched']), 500),
+        ('build_new_orders_report', lambda ctx: report_engine.build_new_orders_report(ctx['new_orders'], now=now), None),
+        ('build_daily_sales_report', lambda ctx: report_engine.build_daily_sales_report(
+            report_engine.select_orders_between(ctx['enriched'], ctx['report_day'], ctx['report_day']), now=now), None),
+        ('build_weekly_sales_report', lambda ctx: report_engine.build_weekly_sales_report(
+            report_engine.select_orders_between(ctx['enriched'], *ctx['week']), *ctx['week'], now=now), None),
+        ('build_daily_reminder', lambda ctx: report_engine.build_daily_reminder(ctx['unpaid'], now=now), None),
+        ('render_payment_collection_email', lambda ctx: render_payment_collection_email(ctx['unpaid'], now), None),
+    ]
+
+def _capped(ctx, max_rows):
+    """Context restricted to the first max_rows sheet rows"""
+    enriched = ctx['enriched'].head(max_rows).copy()
+    report_engine.build_status_index(enriched)
+    return {**ctx, 'values': ctx['values'][:max_rows + 1], 'raw': ctx['raw'].head(max_rows).copy(), 'enriched': enriched}
+
+def time_stage(fn, ctx, repeat):
+    """Seconds per call: repeat timed runs after one warm-up (a slow first call is the only sample)"""
+    started = time.perf_counter()
+    fn(ctx)
+    first = time.perf_counter() - started
+    if first >= SLOW_STAGE_SECONDS:
+        return {'median_s': first, 'min_s': first, 'runs': 1}
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(ctx)
+        timings.append(time.perf_counter() - started)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'runs': repeat}
+
+def run(sizes, repeat=3, stages=None, log=print):
+    """{size: {stage: timing}} for each synthetic sheet size"""
+    stages = stages or build_stages()
+    results = {}
+    for size in sizes:
+        log(f"--- {size:,} rows ---")
+        ctx = build_context(size)
+        results[str(size)] = {}
+        for name, fn, max_rows in stages:
+            stage_ctx = ctx if not max_rows or size <= max_rows else _capped(ctx, max_rows)
+            timing = time_stage(fn, stage_ctx, repeat)
+            timing['rows'] = min(size, max_rows) if max_rows else size
+            results[str(size)][name] = timing
+            log(f"{name:<34} {timing['median_s'] * 1000:>10.1f} ms  ({timing['rows']:,} rows)")
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def load_results(path):
+    if not os.path.exists(path):
+        return {'runs': []}
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)
+
+def find_regressions(previous, current, threshold=REGRESSION_THRESHOLD):
+    """[(size, stage, previous_s, current_s)] for stages slower than threshold x the previous run (same row count)"""
+    regressions = []
+    for size, stages in current.items():
+        for stage, timing in stages.items():
+            before = previous.get(size, {}).get(stage)
+            if before and before.get('rows') == timing['rows'] and timing['median_s'] > before['median_s'] * threshold:
+                regressions.append((size, stage, before['median_s'], timing['median_s']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the orders pipeline on synthetic sheets")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH, help="JSON results file (runs are appended)")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, repeat=args.repeat)
+
+    history = load_results(args.output)
+    regressions = find_regressions(history['runs'][-1]['results'], results, args.threshold) if history['runs'] else []
+    history['runs'].append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'repeat': args.repeat,
+        'results': results,
+    })
+    with open(args.output, 'w', encoding='utf-8') as results_file:
+        json.dump(history, results_file, indent=2)
+    print(f"Results appended to {args.output}")
+
+    for size, stage, before, after in regressions:
+        print(f"REGRESSION {stage} @ {int(size):,} rows: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Synthetic orders sheet.
+Produces get_all_values()-shaped data (header row + string cells) with the
+live sheet's A..Q layout and its mess: "X vs Y" / "X v Y" event names with
+spelling variants, mixed €/£/$/bare TOTAL, several event-date formats,
+Hebrew and English statuses, and partly filled supplier columns.
+
+No Streamlit import.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Same A..Q layout as the orders sheet (A-M per order_import.ORDER_COLUMN_MAPPING, O-Q supplier)
+SHEET_HEADERS = [
+    'order date', 'orderd', 'source', 'Order number', 'docket number', 'event name',
+    'Date of the event', 'Seating Arrangements', 'Category / Section', 'Notes', 'Qty',
+    'Price sold', 'TOTAL', 'total sold', 'SUPP PRICE', 'Supplier NAME', 'SUPP order number',
+]
+
+TEAMS = [
+    'Arsenal', 'Chelsea', 'Liverpool', 'Manchester City', 'Manchester United', 'Tottenham',
+    'Real Madrid', 'Barcelona', 'Atletico Madrid', 'Bayern Munich', 'Borussia Dortmund',
+    'PSG', 'Juventus', 'AC Milan', 'Inter Milan', 'Napoli', 'Benfica', 'Porto', 'Ajax', 'Celtic',
+]
+EVENT_SEPARATORS = [' vs ', ' vs ', ' vs ', ' v ', ' VS ', ' - ']
+SOURCES = ['tixstock', 'Tixstock ', 'viagogo', 'stubhub', 'direct', 'gotickets', 'footballticketnet']
+STATUSES = [
+    'new', 'New', '', 'orderd', 'done!', 'done', 'old no data',
+    'sent - not paid', 'נשלח ולא שולם', '🟠 נשלח ולא שולם', 'sent - paid', 'נשלח ושולם', 'הוזמן',
+]
+STATUS_WEIGHTS = [14, 4, 6, 14, 18, 4, 6, 8, 3, 2, 12, 5, 4]
+CATEGORIES = ['CAT 1', 'CAT 2', 'CAT 3', 'CAT 4', 'Longside Lower', 'Shortside Upper', 'VIP', 'Premium']
+SUPPLIERS = ['TicketHub', 'Sport Events 365', 'LiveFootball', 'Tix4You', 'EuroSeats']
+CURRENCY_FORMATS = ['€{:.0f}', '€{:.2f}', '£{:.2f}', '${:.0f}', '{:.0f}', '€ {:,.2f}']
+EVENT_DATE_FORMATS = ['%d/%m/%Y', '%d/%m/%Y', '%Y-%m-%d', '%d/%m/%Y %H:%M', '%m/%d/%Y', '%d-%m-%Y']
+
+def _events(rng, n_events, today):
+    """n_events fixtures: (home, away, kickoff) spread from a year back to half a year ahead"""
+    events = []
+    for _ in range(n_events):
+        home, away = rng.choice(len(TEAMS), size=2, replace=False)
+        kickoff = today + timedelta(days=int(rng.integers(-365, 180)), hours=int(rng.choice([13, 15, 17, 20])))
+        events.append((TEAMS[home], TEAMS[away], kickoff))
+    return events
+
+def _event_label(rng, home, away):
+    """One spelling of the fixture - the variants the app's fuzzy event grouping has to merge"""
+    if rng.random() < 0.1:
+        home = f"{home} FC"
+    label = f"{home}{EVENT_SEPARATORS[rng.integers(len(EVENT_SEPARATORS))]}{away}"
+    return label.lower() if rng.random() < 0.05 else label
+
+def generate_sheet_values(n_rows, seed=0, today=None):
+    """[headers] + n_rows rows of strings, like worksheet.get_all_values()"""
+    rng = np.random.default_rng(seed)
+    today = today or datetime.now().replace(minute=0, second=0, microsecond=0)
+    events = _events(rng, max(10, n_rows // 40), today)
+
+    event_ids = rng.integers(len(events), size=n_rows)
+    statuses = rng.choice(STATUSES, size=n_rows, p=np.array(STATUS_WEIGHTS) / sum(STATUS_WEIGHTS))
+    sources = rng.choice(SOURCES, size=n_rows)
+    qtys = rng.choice([1, 2, 2, 2, 3, 4, 4, 6], size=n_rows)
+    prices = rng.integers(60, 900, size=n_rows)
+    price_formats = rng.integers(len(CURRENCY_FORMATS), size=n_rows)
+    date_formats = rng.integers(len(EVENT_DATE_FORMATS), size=n_rows)
+    order_ages = rng.integers(0, 400 * 24 * 60, size=n_rows)
+    supplier_draw = rng.random(n_rows)
+
+    values = [list(SHEET_HEADERS)]
+    for i in range(n_rows):
+        home, away, kickoff = events[event_ids[i]]
+        status = str(statuses[i])
+        qty = int(qtys[i])
+        price = int(prices[i])
+        total = qty * price
+
+        ordered_at = min(kickoff, today) - timedelta(minutes=int(order_ages[i]))
+        order_date = ordered_at.strftime('%m/%d/%Y %H:%M:%S') if supplier_draw[i] > 0.03 else ordered_at.strftime('%d/%m/%Y')
+        event_date = '' if supplier_draw[i] < 0.01 else kickoff.strftime(EVENT_DATE_FORMATS[date_formats[i]])
+
+        has_supplier = status.strip().lower() not in ('new', '') and supplier_draw[i] < 0.75
+        supp_price = CURRENCY_FORMATS[price_formats[i]].format(total * 0.7) if has_supplier and supplier_draw[i] < 0.6 else ''
+        supp_name = SUPPLIERS[i % len(SUPPLIERS)] if has_supplier and supplier_draw[i] < 0.65 else ''
+        supp_order = f"SP-{rng.integers(100000, 999999)}" if has_supplier else ''
+
+        values.append([
+            order_date,
+            status,
+            str(sources[i]),
+            str(500000 + i) if supplier_draw[i] > 0.02 else f"#{500000 + i}",
+            f"D{rng.integers(10000, 99999)}" if status not in ('new', 'New', '') else '',
+            _event_label(rng, home, away),
+            event_date,
+            f"Block {rng.integers(100, 140)} Row {rng.integers(1, 30)}",
+            CATEGORIES[(event_ids[i] + i) % len(CATEGORIES)],
+            '',
+            str(qty),
+            str(price),
+            CURRENCY_FORMATS[price_formats[i]].format(total),
+            str(total),
+            supp_price,
+            supp_name,
+            supp_order,
+        ])
+    return values
@@ -0,0 +1,60 @@
+"""
+Named cache regions with targeted invalidation.
+Each cached function registers under a region (sheet snapshot, FX rates,
+aggregates, search index). A write invalidates only the regions it touched -
+plus the regions derived from them - instead of st.cache_data.clear() wiping
+every cache (exchange rates included) for every user on the server.
+
+No Streamlit import - the app / pages / utils register their own cached functions.
+"""
+
+import threading
+
+REGION_SNAPSHOT = 'snapshot'
+REGION_FX = 'fx'
+REGION_AGGREGATES = 'aggregates'
+REGION_SEARCH = 'search'
+
+# region -> regions computed from it (invalidated along with it)
+REGION_DEPENDENTS = {
+    REGION_SNAPSHOT: [REGION_AGGREGATES, REGION_SEARCH],
+    REGION_FX: [REGION_SNAPSHOT],
+}
+
+_lock = threading.Lock()
+_clearers = {}
+_versions = {}
+
+def register_cache(region, name, clear_fn):
+    """Register (or replace, on rerun) a cache's clear function under a region"""
+    with _lock:
+        _clearers.setdefault(region, {})[name] = clear_fn
+
+def _with_dependents(regions):
+    ordered = []
+    pending = list(regions)
+    while pending:
+        region = pending.pop(0)
+        if region not in ordered:
+            ordered.append(region)
+            pending.extend(REGION_DEPENDENTS.get(region, []))
+    return ordered
+
+def invalidate(*regions):
+    """Clear the given regions and everything derived from them. Returns the regions cleared."""
+    cleared = _with_dependents(regions)
+    with _lock:
+        clear_fns = [fn for region in cleared for fn in _clearers.get(region, {}).values()]
+        for region in cleared:
+            _versions[region] = _versions.get(region, 0) + 1
+    for clear_fn in clear_fns:
+        try:
+            clear_fn()
+        except Exception as e:
+            print(f"Cache clear failed: {e}")
+    return cleared
+
+def region_version(region):
+    """Counter bumped on every invalidation of the region (usable as a cache key part)"""
+    with _lock:
+        return _versions.get(region, 0)
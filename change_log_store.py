@@ -0,0 +1,153 @@
+"""
+Durable change-log store.
+Append-only SQLite table (WAL mode, so readers never block the writer) with
+indexes on order_id, timestamp and action. Writes are buffered and flushed in
+one transaction per batch; every read flushes first so a user always sees
+their own changes. Shared by every session of the app process.
+
+No Streamlit import - used by utils.create_change_log and app.save_update_history.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CHANGE_LOG_DB = os.environ.get('CHANGE_LOG_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'change_log.db'))
+FLUSH_BATCH_SIZE = 25
+FLUSH_INTERVAL_SECONDS = 2.0
+
+_COLUMNS = ['timestamp', 'action', 'order_id', 'old_value', 'new_value', 'user', 'details']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS change_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    order_id TEXT,
+    old_value TEXT,
+    new_value TEXT,
+    user TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_change_log_order_id ON change_log(order_id);
+CREATE INDEX IF NOT EXISTS idx_change_log_timestamp ON change_log(timestamp);
+CREATE INDEX IF NOT EXISTS idx_change_log_action ON change_log(action, id);
+"""
+
+def _text(value):
+    return None if value is None else str(value)
+
+def _json_default(value):
+    """numpy scalars -> python, anything else -> str"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class ChangeLogStore:
+    """Buffered append-only change log on SQLite"""
+
+    def __init__(self, path=CHANGE_LOG_DB, batch_size=FLUSH_BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, entry):
+        """Queue one entry (dict with timestamp/action/order_id/old_value/new_value/user[/details])"""
+        details = entry.get('details')
+        row = (
+            _text(entry.get('timestamp')), _text(entry.get('action')), _text(entry.get('order_id')),
+            _text(entry.get('old_value')), _text(entry.get('new_value')), _text(entry.get('user')),
+            json.dumps(details, ensure_ascii=False, default=_json_default) if details is not None else None,
+        )
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    f"INSERT INTO change_log ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._buffer
+                )
+            self._buffer = []
+        self._last_flush = time.time()
+
+    def flush(self):
+        """Write every queued entry now"""
+        with self._lock:
+            self._flush_locked()
+
+    @staticmethod
+    def _where(action=None, order_id=None, since=None):
+        clauses, params = [], []
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if order_id:
+            clauses.append("order_id LIKE ?")
+            params.append(f"%{order_id}%")
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, action=None, order_id=None, since=None, limit=20, offset=0):
+        """Newest-first page of entries as dicts"""
+        where, params = self._where(action, order_id, since)
+        with self._lock:
+            self._flush_locked()
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM change_log{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)]
+            )
+            rows = cursor.fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(zip(_COLUMNS, row))
+            entry['details'] = json.loads(entry['details']) if entry['details'] else None
+            entries.append(entry)
+        return entries
+
+    def count(self, action=None, order_id=None, since=None):
+        """Number of entries matching the filters"""
+        where, params = self._where(action, order_id, since)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(f"SELECT COUNT(*) FROM change_log{where}", params).fetchone()[0]
+
+    def actions(self):
+        """Distinct action names (for filter dropdowns)"""
+        with self._lock:
+            self._flush_locked()
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT action FROM change_log ORDER BY action")]
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_change_log_store():
+    """Process-wide store, created on first use and flushed at exit"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChangeLogStore()
+            atexit.register(_store.flush)
+        return _store
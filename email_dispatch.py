@@ -0,0 +1,170 @@
+"""
+Email dispatch service.
+Sends through Resend on a small thread pool so the Streamlit script thread
+never blocks on the network. Credentials are resolved once and cached, each
+logical email carries one idempotency key across all of its retries, and
+429 / 5xx responses are retried with jittered exponential backoff.
+
+No Streamlit import - used by both the app and the scheduled scripts.
+"""
+
+import hashlib
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Resend sends through requests, whose network errors do not subclass the builtin ones
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+    NETWORK_ERRORS = (ConnectionError, TimeoutError, RequestsConnectionError, RequestsTimeout)
+except ImportError:
+    NETWORK_ERRORS = (ConnectionError, TimeoutError)
+
+
+def make_idempotency_key(*parts):
+    """Stable idempotency key from any identifying parts (report name, date, recipient, content...)"""
+    raw = "|".join(str(p) for p in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def _status_code(error):
+    """HTTP status carried by a Resend error (None when unknown)"""
+    code = getattr(error, 'code', None)
+    if code is None:
+        code = getattr(error, 'status_code', None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """Rate limits, server errors and network failures are worth retrying"""
+    code = _status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    return isinstance(error, NETWORK_ERRORS)
+
+
+class EmailJob:
+    """Non-blocking handle for one queued email - poll .done / .status, or call .result()"""
+
+    def __init__(self, future, to_email, subject, idempotency_key):
+        self._future = future
+        self.to_email = to_email
+        self.subject = subject
+        self.idempotency_key = idempotency_key
+        self.created_at = time.time()
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def status(self):
+        """'pending' / 'sent' / 'failed'"""
+        if not self._future.done():
+            return 'pending'
+        success, _ = self._future.result()
+        return 'sent' if success else 'failed'
+
+    def result(self, timeout=None):
+        """Wait for the send to finish. Returns (success, email id or error message)"""
+        return self._future.result(timeout=timeout)
+
+
+class EmailDispatcher:
+    """Thread-pool Resend sender with cached credentials, retries and idempotency keys"""
+
+    def __init__(self, credentials_fn, max_workers=4, max_retries=4, base_delay=1.0, max_delay=30.0):
+        self._credentials_fn = credentials_fn
+        self._credentials = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='email')
+        self._jobs = {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_credentials(self):
+        """(api_key, from_email) - resolved once, only cached when complete"""
+        with self._lock:
+            if self._credentials is None:
+                api_key, from_email = self._credentials_fn()
+                if not api_key or not from_email:
+                    return None, None
+                self._credentials = (api_key, from_email)
+                import resend
+                resend.api_key = api_key
+            return self._credentials
+
+    def invalidate_credentials(self):
+        """Force credentials to be resolved again on the next send"""
+        with self._lock:
+            self._credentials = None
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def send(self, to_email, subject, html, attachments=None, idempotency_key=None):
+        """Send one email now (blocking). Returns (success, email id or error message)"""
+        api_key, from_email = self.get_credentials()
+        if not api_key or not from_email:
+            return False, "No Resend credentials found"
+
+        import resend
+
+        params = {
+            "from": from_email,
+            "to": [to_email] if isinstance(to_email, str) else list(to_email),
+            "subject": subject,
+            "html": html
+        }
+        if attachments:
+            params["attachments"] = attachments
+        options = {"idempotency_key": idempotency_key or uuid.uuid4().hex}
+
+        attempt = 0
+        while True:
+            try:
+                result = resend.Emails.send(params, options)
+                return True, result.get('id', 'N/A')
+            except Exception as e:
+                code = _status_code(e)
+                if code in (401, 403):
+                    self.invalidate_credentials()
+                if attempt >= self.max_retries or not is_retryable(e):
+                    return False, str(e)
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def submit(self, to_email, subject, html, attachments=None, idempotency_key=None):
+        """Queue an email and return an EmailJob immediately.
+
+        Submitting the same idempotency key again while the first job is pending or
+        succeeded returns the existing job instead of sending twice.
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None and existing.status != 'failed':
+                return existing
+            future = self._executor.submit(self.send, to_email, subject, html, attachments, key)
+            job = EmailJob(future, to_email, subject, key)
+            self._jobs[key] = job
+            if len(self._jobs) > 500:
+                for old_key in [k for k, j in self._jobs.items() if j.done][:250]:
+                    del self._jobs[old_key]
+            return job
+
+    def send_many(self, messages):
+        """Send several emails in parallel and wait for all of them.
+
+        messages: iterable of dicts with to_email, subject, html and optional
+        attachments / idempotency_key. Returns a list of (success, info) in order.
+        """
+        jobs = [self.submit(**message) for message in messages]
+        return [job.result() for job in jobs]
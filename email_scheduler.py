@@ -5,14 +5,12 @@ Runs continuously and triggers email reports at specified times (Israel timezone
 
 Schedule:
 - 10:00 AM: Daily reminder for unpaid orders (sent - not paid)
-- 10:00 AM: Daily sales report
+- 10:00 AM: Daily sales report (same batch and sheet fetch as the reminder)
 - 20:00 PM: Daily new orders report (new status)
 - Sunday 09:00 AM: Weekly sales summary
 """
 
-import os
 import sys
-import time
 from datetime import datetime
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -28,53 +26,38 @@ logger = logging.getLogger(__name__)
 
 ISRAEL_TZ = pytz.timezone('Israel')
 
-def run_daily_reminder():
-    """Run daily reminder for unpaid orders at 10:00 AM"""
+def run_batch(report_names, label):
+    """Run several reports from one sheet fetch (see run_reports.py)"""
     logger.info("=" * 50)
-    logger.info("Running Daily Reminder for Unpaid Orders...")
+    logger.info(f"Running {label}...")
     try:
-        from daily_reminder import main
-        result = main()
-        logger.info(f"Daily reminder completed: {result}")
+        from run_reports import run_reports
+        results = run_reports(report_names)
+        for name, success in results.items():
+            logger.info(f"  {name}: {'ok' if success else 'FAILED'}")
     except Exception as e:
-        logger.error(f"Daily reminder failed: {e}")
+        logger.error(f"{label} failed: {e}")
     logger.info("=" * 50)
 
+def run_morning_reports():
+    """Run daily reminder for unpaid orders + daily sales report at 10:00 AM (one sheet fetch)"""
+    run_batch(['daily_reminder', 'daily_sales_report'], "Morning Reports (Unpaid Reminder + Daily Sales)")
+
+def run_daily_reminder():
+    """Run daily reminder for unpaid orders"""
+    run_batch(['daily_reminder'], "Daily Reminder for Unpaid Orders")
+
 def run_daily_sales_report():
-    """Run daily sales report at 10:00 AM"""
-    logger.info("=" * 50)
-    logger.info("Running Daily Sales Report...")
-    try:
-        from daily_sales_report import main
-        result = main()
-        logger.info(f"Daily sales report completed: {result}")
-    except Exception as e:
-        logger.error(f"Daily sales report failed: {e}")
-    logger.info("=" * 50)
+    """Run daily sales report"""
+    run_batch(['daily_sales_report'], "Daily Sales Report")
 
 def run_daily_new_orders_report():
     """Run daily new orders report at 20:00"""
-    logger.info("=" * 50)
-    logger.info("Running Daily New Orders Report...")
-    try:
-        from daily_new_orders_report import main
-        result = main()
-        logger.info(f"Daily new orders report completed: {result}")
-    except Exception as e:
-        logger.error(f"Daily new orders report failed: {e}")
-    logger.info("=" * 50)
+    run_batch(['daily_new_orders_report'], "Daily New Orders Report")
 
 def run_weekly_sales_report():
     """Run weekly sales report on Sunday at 09:00"""
-    logger.info("=" * 50)
-    logger.info("Running Weekly Sales Report...")
-    try:
-        from weekly_sales_report import main
-        result = main()
-        logger.info(f"Weekly sales report completed: {result}")
-    except Exception as e:
-        logger.error(f"Weekly sales report failed: {e}")
-    logger.info("=" * 50)
+    run_batch(['weekly_sales_report'], "Weekly Sales Report")
 
 def main():
     """Main scheduler function"""
@@ -86,18 +69,10 @@ def main():
     scheduler = BlockingScheduler(timezone=ISRAEL_TZ)
     
     scheduler.add_job(
-        run_daily_reminder,
+        run_morning_reports,
         CronTrigger(hour=10, minute=0, timezone=ISRAEL_TZ),
-        id='daily_reminder',
-        name='Daily Reminder for Unpaid Orders (10:00 AM)',
-        replace_existing=True
-    )
-    
-    scheduler.add_job(
-        run_daily_sales_report,
-        CronTrigger(hour=10, minute=5, timezone=ISRAEL_TZ),
-        id='daily_sales_report',
-        name='Daily Sales Report (10:05 AM)',
+        id='morning_reports',
+        name='Daily Reminder + Daily Sales Report (10:00 AM)',
         replace_existing=True
     )
     
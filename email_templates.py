@@ -0,0 +1,770 @@
+"""
+Shared HTML email templates.
+Used by the Streamlit app (app.py) and by the scheduled report scripts.
+
+Templates are compiled once at import time. Repeated sections (order rows,
+source/event breakdowns, order cards) are rendered from a list of plain
+record dicts (DataFrame.to_dict('records')) and joined in a single pass,
+so rendering time grows linearly with the number of orders.
+"""
+
+from html import escape
+from string import Template
+
+NO_DATA_HTML = "<p>אין נתונים</p>"
+NO_DATA_DIV_HTML = "<div style='color:#666;'>אין נתונים</div>"
+FOOTER_HTML = "<hr><p style='color: #666;'>הודעה זו נשלחה אוטומטית ממערכת ניהול הזמנות כרטיסים</p>"
+
+
+def _text(value, default='-', limit=None):
+    """Escape a cell value for HTML output, optionally truncating it"""
+    if value is None or (isinstance(value, float) and value != value):
+        value = default
+    value = str(value)
+    if limit:
+        value = value[:limit]
+    return escape(value, quote=False)
+
+
+def _number(value):
+    """Convert a cell value to float, treating blanks and NaN as 0"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if number == number else 0.0
+
+
+def parse_amount(value):
+    """Parse a money cell such as '€1,234.50' - returns None when it is not a number"""
+    if value is None or value == '' or value == '-':
+        return None
+    try:
+        return float(str(value).replace('€', '').replace('£', '').replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return None
+
+
+def _render_rows(template, items):
+    """Render a precompiled row template for each item and join once"""
+    return ''.join([template.format_map(item) for item in items])
+
+
+# ---------------------------------------------------------------------------
+# Order cards (payment collection / not paid / payment confirmation / reminder)
+# ---------------------------------------------------------------------------
+
+_ORDER_CARD_ROW = '<tr><td><strong>{label}</strong></td><td>{value}</td></tr>'
+
+_ORDER_CARD = """
+        <div style="background: {bg}; padding: 15px; margin: 10px 0; border-radius: 8px; border-right: 4px solid {border};">
+            <h3{title_style}>{title}</h3>
+            <table style="width: 100%;">
+                {rows}
+                <tr style="{amount_style}"><td><strong>{amount_label}</strong></td><td><strong>{total_display}</strong></td></tr>
+                {extra_rows}
+            </table>
+            {footer}
+        </div>
+        """
+
+ORDER_CARD_THEMES = {
+    'collection': {
+        'bg': '#fff3cd', 'border': '#ffc107', 'title_style': '',
+        'title': 'הזמנה #{n}',
+        'amount_style': 'background: #ffc107;', 'amount_label': 'סכום לגבייה:',
+        'amount_keys': ('total sold', 'TOTAL', 'TOTAL_clean'), 'show_supp_price': True,
+    },
+    'not_paid': {
+        'bg': '#fee2e2', 'border': '#dc2626', 'title_style': ' style="color: #dc2626;"',
+        'title': '🔴 הזמנה #{n} - לא שולם!',
+        'amount_style': 'background: #dc2626; color: white;', 'amount_label': 'סכום לגבייה:',
+        'amount_keys': ('total sold', 'TOTAL', 'TOTAL_clean'), 'show_supp_price': True,
+    },
+    'paid': {
+        'bg': '#d4edda', 'border': '#28a745', 'title_style': '',
+        'title': 'הזמנה #{n} - שולם ✅',
+        'amount_style': 'background: #28a745; color: white;', 'amount_label': 'סכום ששולם:',
+        'amount_keys': ('total sold', 'TOTAL', 'TOTAL_clean'), 'show_supp_price': True,
+    },
+    'reminder': {
+        'bg': '#fee2e2', 'border': '#dc2626', 'title_style': ' style="color: #dc2626;"',
+        'title': 'הזמנה #{n} - לא שולם',
+        'amount_style': 'background: #dc2626; color: white;', 'amount_label': 'סכום לגבייה:',
+        'amount_keys': ('TOTAL',), 'show_supp_price': False,
+    },
+}
+
+_MARK_PAID_BUTTON = """
+            <div style="margin-top: 15px; text-align: center;">
+                <a href="{url}" style="display: inline-block; background: #16a34a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; font-size: 14px;">
+                    סמן כשולם (Done!)
+                </a>
+            </div>
+            """
+
+
+def _first_value(order, keys, default='-'):
+    for key in keys:
+        if key in order:
+            return order[key]
+    return default
+
+
+def render_order_cards(orders, theme, extra_rows_html='', footer_fn=None):
+    """Render one card per order. Returns (html, total_amount)."""
+    style = ORDER_CARD_THEMES[theme]
+    parts = []
+    total_amount = 0.0
+    
+    for idx, order in enumerate(orders):
+        amount = parse_amount(_first_value(order, style['amount_keys']))
+        if amount is not None:
+            total_amount += amount
+            total_display = f"€{amount:,.2f}"
+        else:
+            total_display = _text(_first_value(order, style['amount_keys']))
+        
+        fields = [
+            ('מספר הזמנה:', order.get('Order number', '-')),
+            ('שם אירוע:', order.get('event name', '-')),
+            ('מספר דוקט:', order.get('docket number', order.get('docket', order.get('Docket', '-')))),
+            ('מקור:', order.get('source', '-')),
+            ('מספר הזמנה ספק:', order.get('SUPP order number', '-')),
+            ('תאריך אירוע:', order.get('Date of the event', '-')),
+            ('כמות:', order.get('Qty', order.get('QTY', '-'))),
+            ('מחיר מקורי לכרטיס:', order.get('Price sold', '-')),
+        ]
+        rows = ''.join([_ORDER_CARD_ROW.format(label=label, value=_text(value)) for label, value in fields])
+        
+        extra_rows = ''
+        if style['show_supp_price']:
+            extra_rows = _ORDER_CARD_ROW.format(label='מחיר ספק:', value=_text(order.get('SUPP PRICE', '-')))
+        
+        parts.append(_ORDER_CARD.format(
+            bg=style['bg'],
+            border=style['border'],
+            title_style=style['title_style'],
+            title=style['title'].format(n=idx + 1),
+            rows=rows,
+            amount_style=style['amount_style'],
+            amount_label=style['amount_label'],
+            total_display=total_display,
+            extra_rows=extra_rows + extra_rows_html,
+            footer=footer_fn(order) if footer_fn else '',
+        ))
+    
+    return ''.join(parts), total_amount
+
+
+def render_payment_collection_email(orders, now):
+    """Body of the accounting collection email (yellow theme)"""
+    cards, total_amount = render_order_cards(orders, 'collection')
+    parts = [
+        "<h2>הודעת גבייה - הזמנות נשלחו ולא שולמו</h2>",
+        f"<p>תאריך: {now.strftime('%Y-%m-%d %H:%M')}</p>",
+        "<hr>",
+        cards,
+        FOOTER_HTML,
+    ]
+    return ''.join(parts), total_amount
+
+
+def render_not_paid_email(orders, now):
+    """Body of the NOT PAID alert email (red theme)"""
+    cards, total_amount = render_order_cards(orders, 'not_paid')
+    parts = [
+        "<h2 style='color: #dc2626;'>🔴 התראת תשלום - הזמנות נשלחו ולא שולמו!</h2>",
+        f"<p>תאריך: {now.strftime('%Y-%m-%d %H:%M')}</p>",
+        "<p style='background: #dc2626; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>⚠️ נדרשת פעולה - גביית תשלום</strong></p>",
+        "<hr>",
+        cards,
+    ]
+    if total_amount > 0:
+        parts.append(f"<div style='background: #dc2626; color: white; padding: 15px; border-radius: 8px; text-align: center; margin-top: 20px;'><h2>סה\"כ לגבייה: €{total_amount:,.2f}</h2></div>")
+    parts.append(FOOTER_HTML)
+    return ''.join(parts), total_amount
+
+
+def render_payment_confirmation_email(orders, payment_method, now, attachment_name=None):
+    """Body of the payment confirmation email (green theme)"""
+    method = _text(payment_method)
+    method_row = f'<tr style="background: #17a2b8; color: white;"><td><strong>אמצעי תשלום:</strong></td><td><strong>{method}</strong></td></tr>'
+    cards, total_amount = render_order_cards(orders, 'paid', extra_rows_html=method_row)
+    parts = [
+        "<h2>✅ אישור תשלום - הזמנות נשלחו ושולמו</h2>",
+        f"<p>תאריך: {now.strftime('%Y-%m-%d %H:%M')}</p>",
+        f"<p style='background: #28a745; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>אמצעי תשלום: {method}</strong></p>",
+        "<hr>",
+        cards,
+    ]
+    if attachment_name:
+        parts.append(f"<p style='background: #17a2b8; color: white; padding: 8px; border-radius: 5px;'>📎 קובץ אישור תשלום מצורף: {_text(attachment_name)}</p>")
+    parts.append(FOOTER_HTML)
+    return ''.join(parts), total_amount
+
+
+def render_daily_reminder_email(orders, now, mark_paid_url_fn=None):
+    """Body of the daily unpaid-orders reminder, with optional 'mark as paid' buttons"""
+    def footer(order):
+        url = mark_paid_url_fn(order) if mark_paid_url_fn else None
+        return _MARK_PAID_BUTTON.format(url=escape(url)) if url else ''
+    
+    cards, total_amount = render_order_cards(orders, 'reminder', footer_fn=footer)
+    parts = [
+        "<h2 style='color: #dc2626;'>תזכורת יומית - הזמנות לא שולמו</h2>",
+        f"<p>תאריך: {now.strftime('%Y-%m-%d %H:%M')} (שעון ישראל)</p>",
+        f"<p style='background: #dc2626; color: white; padding: 10px; border-radius: 5px; font-size: 18px;'><strong>{len(orders)} הזמנות ממתינות לתשלום</strong></p>",
+        "<hr>",
+        cards,
+    ]
+    if total_amount > 0:
+        parts.append(f"<div style='background: #dc2626; color: white; padding: 15px; border-radius: 8px; text-align: center; margin-top: 20px;'><h2>סה\"כ לגבייה: €{total_amount:,.2f}</h2></div>")
+    parts.append("<hr><p style='color: #666;'>תזכורת יומית אוטומטית ממערכת ניהול הזמנות כרטיסים - נשלחת בשעה 10:00 בבוקר</p>")
+    return ''.join(parts), total_amount
+
+
+# ---------------------------------------------------------------------------
+# New orders report ("כרטיסים לרכישה")
+# ---------------------------------------------------------------------------
+
+_NEW_ORDER_ROW = """
+                <tr style="background: {row_bg};">
+                    <td style="padding: 8px; border: 1px solid #eee; text-align: center;">{n}</td>
+                    <td style="padding: 8px; border: 1px solid #eee;">{event_name}</td>
+                    <td style="padding: 8px; border: 1px solid #eee;">{event_date}</td>
+                    <td style="padding: 8px; border: 1px solid #eee;">{category}</td>
+                    <td style="padding: 8px; border: 1px solid #eee; text-align: center; font-weight: bold;">{qty}</td>
+                    <td style="padding: 8px; border: 1px solid #eee;">{order_num}</td>
+                    <td style="padding: 8px; border: 1px solid #eee;">{source}</td>
+                    <td style="padding: 8px; border: 1px solid #eee; text-align: left; font-weight: bold;">€{total:,.0f}</td>
+                </tr>
+        """
+
+_NEW_ORDERS_SOURCE_ROW = "<tr><td style='padding: 5px;'>{source}</td><td style='padding: 5px; text-align: left;'>{orders} הזמנות | {tickets} כרטיסים</td></tr>"
+
+_NEW_ORDERS_TOP_EVENT = (
+    "<div style='background: #f8f9fa; padding: 10px; margin: 5px 0; border-radius: 5px; border-right: 3px solid #667eea;'>"
+    "<strong>{event}...</strong><br>"
+    "<span style='color: #666;'>{orders} הזמנות | {tickets} כרטיסים | €{value:,.0f}</span>"
+    "</div>"
+)
+
+_URGENT_ALERT = """
+        <div style="background: linear-gradient(90deg, #dc3545, #c82333); color: white; padding: 15px 20px;">
+            <strong>🚨 התראה דחופה:</strong> {count} הזמנות עם אירועים ב-7 ימים הקרובים!
+        </div>
+        """
+
+NEW_ORDERS_REPORT = Template("""    <!DOCTYPE html>
+    <html dir="rtl" lang="he">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            @media only screen and (max-width: 600px) {
+                .main-container { padding: 10px !important; }
+                .metric-box { width: 48% !important; margin-bottom: 10px !important; }
+                .metric-value { font-size: 28px !important; }
+                .insight-card { width: 100% !important; margin-bottom: 15px !important; }
+                .stats-row td { display: block !important; width: 100% !important; margin-bottom: 10px !important; }
+                .order-table { font-size: 11px !important; }
+                .order-table th, .order-table td { padding: 5px 3px !important; }
+            }
+        </style>
+    </head>
+    <body style="margin: 0; padding: 0; background: #f0f2f5;">
+    <div dir="rtl" class="main-container" style="font-family: 'Segoe UI', Arial, sans-serif; max-width: 800px; margin: 0 auto; background: white;">
+        
+        <!-- Header -->
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px 20px; text-align: center;">
+            <h1 style="margin: 0; font-size: 24px;">📊 דוח יומי - כרטיסים לרכישה</h1>
+            <p style="margin: 10px 0 0 0; opacity: 0.9; font-size: 14px;">קוד יהודה | ${generated_at}</p>
+        </div>
+        
+        <!-- Executive Summary - Mobile Friendly -->
+        <div style="background: #1a1a2e; color: white; padding: 20px;">
+            <h2 style="margin: 0 0 15px 0; color: #ffd700; font-size: 18px;">⚡ סיכום מנהלים</h2>
+            
+            <table style="width: 100%; border-spacing: 8px;">
+                <tr>
+                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
+                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #667eea;">${num_orders}</div>
+                        <div style="color: #aaa; font-size: 12px;">הזמנות פתוחות</div>
+                    </td>
+                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
+                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #28a745;">${total_tickets}</div>
+                        <div style="color: #aaa; font-size: 12px;">כרטיסים לרכישה</div>
+                    </td>
+                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
+                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #17a2b8;">€${total_amount}</div>
+                        <div style="color: #aaa; font-size: 12px;">שווי כולל</div>
+                    </td>
+                    <td class="metric-box" style="width: 25%; text-align: center; padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px;">
+                        <div class="metric-value" style="font-size: 36px; font-weight: bold; color: #ffc107;">${unique_events}</div>
+                        <div style="color: #aaa; font-size: 12px;">אירועים שונים</div>
+                    </td>
+                </tr>
+            </table>
+        </div>
+        
+        <!-- Alerts Section -->
+        $urgent_alert
+        
+        <!-- Insights Section -->
+        <div style="background: #f8f9fa; padding: 25px;">
+            <h2 style="margin: 0 0 20px 0; color: #333;">📈 תובנות מפתח</h2>
+            
+            <table style="width: 100%;">
+                <tr>
+                    <td style="width: 50%; vertical-align: top; padding: 10px;">
+                        <div style="background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+                            <h3 style="margin: 0 0 10px 0; color: #667eea;">🏆 אירועים מובילים (לפי שווי)</h3>
+                            ${top_events}
+                        </div>
+                    </td>
+                    <td style="width: 50%; vertical-align: top; padding: 10px;">
+                        <div style="background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+                            <h3 style="margin: 0 0 10px 0; color: #667eea;">📊 פילוח לפי מקור</h3>
+                            ${source_breakdown}
+                        </div>
+                    </td>
+                </tr>
+            </table>
+            
+            <div style="background: white; padding: 20px; border-radius: 10px; margin-top: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+                <h3 style="margin: 0 0 15px 0; color: #667eea;">📊 מדדים נוספים</h3>
+                <table style="width: 100%;">
+                    <tr>
+                        <td style="padding: 10px; background: #e8f5e9; border-radius: 5px; text-align: center;">
+                            <div style="font-size: 24px; font-weight: bold; color: #28a745;">€${avg_ticket_value}</div>
+                            <div style="color: #666; font-size: 12px;">ממוצע לכרטיס</div>
+                        </td>
+                        <td style="padding: 10px; background: #e3f2fd; border-radius: 5px; text-align: center;">
+                            <div style="font-size: 24px; font-weight: bold; color: #1976d2;">${unique_sources}</div>
+                            <div style="color: #666; font-size: 12px;">מקורות מכירה</div>
+                        </td>
+                        <td style="padding: 10px; background: #fff3e0; border-radius: 5px; text-align: center;">
+                            <div style="font-size: 24px; font-weight: bold; color: #f57c00;">${tickets_per_order}</div>
+                            <div style="color: #666; font-size: 12px;">כרטיסים/הזמנה</div>
+                        </td>
+                        <td style="padding: 10px; background: #fce4ec; border-radius: 5px; text-align: center;">
+                            <div style="font-size: 24px; font-weight: bold; color: #c2185b;">€${avg_order_value}</div>
+                            <div style="color: #666; font-size: 12px;">ממוצע להזמנה</div>
+                        </td>
+                    </tr>
+                </table>
+            </div>
+        </div>
+        
+        <!-- Order Details -->
+        <div style="padding: 25px;">
+            <h2 style="margin: 0 0 20px 0; color: #333;">📋 פירוט הזמנות (${num_orders})</h2>
+            
+            <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
+                <thead>
+                    <tr style="background: #667eea; color: white;">
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">#</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">אירוע</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">תאריך</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">קטגוריה</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">כמות</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">מס' הזמנה</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">מקור</th>
+                        <th style="padding: 12px 8px; border: 1px solid #ddd;">סכום</th>
+                    </tr>
+                </thead>
+                <tbody>
+$order_rows
+                </tbody>
+                <tfoot>
+                    <tr style="background: #333; color: white; font-weight: bold;">
+                        <td colspan="4" style="padding: 12px; border: 1px solid #333;">סה"כ</td>
+                        <td style="padding: 12px; border: 1px solid #333; text-align: center;">${total_tickets}</td>
+                        <td colspan="2" style="padding: 12px; border: 1px solid #333;"></td>
+                        <td style="padding: 12px; border: 1px solid #333; text-align: left;">€${total_amount}</td>
+                    </tr>
+                </tfoot>
+            </table>
+        </div>
+        
+        <!-- Footer -->
+        <div style="background: #1a1a2e; color: #aaa; padding: 20px; text-align: center;">
+            <p style="margin: 0; font-size: 14px;">מערכת ניהול הזמנות כרטיסים - קוד יהודה</p>
+            <p style="margin: 8px 0 0 0; font-size: 11px;">דוח זה נוצר אוטומטית ב-${generated_at}</p>
+            <p style="margin: 8px 0 0 0; font-size: 11px; color: #667eea;">📱 מותאם לצפייה במובייל</p>
+        </div>
+        
+    </div>
+    </body>
+    </html>""")
+
+
+def render_new_orders_report(summary, orders, sources, top_events, now):
+    """Render the new-orders report.
+    
+    summary: dict with num_orders, total_tickets, total_amount, unique_events,
+             unique_sources, urgent_orders
+    orders/sources/top_events: lists of record dicts
+    """
+    num_orders = summary['num_orders']
+    total_tickets = summary['total_tickets']
+    total_amount = summary['total_amount']
+    
+    order_rows = _render_rows(_NEW_ORDER_ROW, (
+        {
+            'row_bg': '#ffffff' if idx % 2 == 0 else '#f8f9fa',
+            'n': idx + 1,
+            'event_name': _text(order.get('event name', '-'), limit=40),
+            'event_date': _text(order.get('Date of the event', '-')),
+            'category': _text(order.get('Category / Section', '-')),
+            'qty': _text(order.get('Qty', '-')),
+            'order_num': _text(order.get('Order number', '-')),
+            'source': _text(order.get('source', '-')),
+            'total': _number(order.get('TOTAL_clean', 0)),
+        }
+        for idx, order in enumerate(orders)
+    ))
+    
+    source_breakdown = ''
+    if sources:
+        source_breakdown = "<table style='width: 100%; margin: 10px 0;'>" + _render_rows(_NEW_ORDERS_SOURCE_ROW, (
+            {'source': _text(row['source']), 'orders': int(row['orders']), 'tickets': int(row['tickets'])}
+            for row in sources
+        )) + "</table>"
+    
+    top_events_html = _render_rows(_NEW_ORDERS_TOP_EVENT, (
+        {'event': _text(row['event'], limit=50), 'orders': int(row['orders']), 'tickets': int(row['tickets']), 'value': row['value']}
+        for row in top_events
+    ))
+    
+    urgent_orders = summary.get('urgent_orders', 0)
+    
+    return NEW_ORDERS_REPORT.substitute(
+        generated_at=now.strftime('%d/%m/%Y %H:%M'),
+        num_orders=num_orders,
+        total_tickets=total_tickets,
+        total_amount=f"{total_amount:,.0f}",
+        unique_events=summary['unique_events'],
+        unique_sources=summary['unique_sources'],
+        urgent_alert=_URGENT_ALERT.format(count=urgent_orders) if urgent_orders else '',
+        top_events=top_events_html or NO_DATA_HTML,
+        source_breakdown=source_breakdown or NO_DATA_HTML,
+        avg_ticket_value=f"{(total_amount / total_tickets if total_tickets > 0 else 0):,.0f}",
+        tickets_per_order=f"{(total_tickets / num_orders if num_orders > 0 else 0):.1f}",
+        avg_order_value=f"{(total_amount / num_orders if num_orders > 0 else 0):,.0f}",
+        order_rows=order_rows,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Daily sales report (dark design)
+# ---------------------------------------------------------------------------
+
+_DAILY_SOURCE_ROW = """<tr>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#f1f5f9;font-size:14px;">{source}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{orders}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{tickets}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:center;font-family:Consolas,monospace;">{avg_tickets:.1f}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;text-align:left;">
+<span style="color:#38bdf8;font-family:Consolas,monospace;">EUR {revenue:,.0f}</span>
+<div style="background:#2d3b55;height:4px;width:60px;border-radius:2px;margin-top:4px;"><div style="background:#38bdf8;height:4px;width:{pct_width}%;border-radius:2px;"></div></div>
+</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#94a3b8;text-align:left;font-family:Consolas,monospace;">EUR {cost:,.0f}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#34d399;text-align:left;font-family:Consolas,monospace;">EUR {profit:,.0f}</td>
+<td style="padding:14px 20px;border-bottom:1px solid #253146;color:#a855f7;text-align:center;font-family:Consolas,monospace;">{margin_display}</td>
+</tr>"""
+
+_POTENTIAL_PROFIT_NOTE = '<div style="color:#64748b;font-size:11px;margin-top:15px;text-align:center;">* כולל רווח פוטנציאלי משוער (30%) עבור הזמנות ללא עלות ספק</div>'
+
+DAILY_SALES_REPORT = Template("""<!DOCTYPE html>
+<html lang="he" dir="rtl">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<style>
+body, table, td { -webkit-text-size-adjust: 100%; -ms-text-size-adjust: 100%; }
+table { border-collapse: collapse !important; }
+body { margin: 0 !important; padding: 0 !important; background-color: #162032; color: #e2e8f0; font-family: 'Segoe UI', Roboto, Arial, sans-serif; }
+@media only screen and (max-width: 600px) {
+.stats-cell { display: block !important; width: 100% !important; border-left: none !important; border-bottom: 1px solid #2d3b55 !important; }
+.stats-cell:last-child { border-bottom: none !important; }
+.inner-table { font-size: 12px !important; }
+.inner-table td, .inner-table th { padding: 10px 8px !important; }
+}
+</style>
+</head>
+<body dir="rtl" style="background-color:#162032;">
+<table role="presentation" width="100%" cellspacing="0" cellpadding="0" border="0" style="background-color:#162032;">
+<tr><td align="center">
+<div class="email-container" style="width:100%;max-width:100%;background-color:#162032;overflow:hidden;">
+
+<div style="background:linear-gradient(180deg, #1e293b 0%, #162032 100%);padding:30px;border-bottom:1px solid #2d3b55;">
+<div style="display:inline-block;background-color:rgba(56,189,248,0.1);color:#38bdf8;padding:4px 10px;border-radius:4px;font-size:11px;font-weight:700;letter-spacing:1px;border:1px solid rgba(56,189,248,0.2);margin-bottom:10px;">DAILY REPORT</div>
+<h1 style="color:#ffffff;font-size:22px;margin:0;font-weight:300;">סיכום יומי: <span style="font-weight:700;">${date_str}</span></h1>
+<div style="color:#94a3b8;font-size:13px;margin-top:8px;">
+<span style="display:inline-block;height:8px;width:8px;background-color:#10b981;border-radius:50%;margin-left:6px;box-shadow:0 0 8px rgba(16,185,129,0.6);"></span>
+קוד יהודה | נוצר ב-${generated_time}
+</div>
+</div>
+
+<table width="100%" cellspacing="0" cellpadding="0" border="0">
+<tr>
+<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
+<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">הזמנות</div>
+<div style="font-size:26px;font-weight:700;color:#f8fafc;font-family:Consolas,monospace;">${num_orders}</div>
+</td>
+<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
+<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">כרטיסים</div>
+<div style="font-size:26px;font-weight:700;color:#f8fafc;font-family:Consolas,monospace;">${total_tickets}</div>
+</td>
+<td class="stats-cell" style="padding:20px;text-align:center;border-left:1px solid #2d3b55;width:25%;background:#1e293b;">
+<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">הכנסה</div>
+<div style="font-size:26px;font-weight:700;color:#38bdf8;font-family:Consolas,monospace;">EUR ${total_revenue}</div>
+</td>
+<td class="stats-cell" style="padding:20px;text-align:center;width:25%;background:#1e293b;">
+<div style="font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:1px;margin-bottom:6px;">ממוצע/הזמנה</div>
+<div style="font-size:26px;font-weight:700;color:#a855f7;font-family:Consolas,monospace;">${avg_tickets}</div>
+</td>
+</tr>
+</table>
+
+<div style="margin:20px;background-color:#1e293b;border-radius:8px;border:1px solid #334155;overflow:hidden;">
+<div style="padding:16px 20px;border-bottom:1px solid #334155;background:linear-gradient(90deg, #1e293b 0%, #243045 100%);position:relative;">
+<div style="position:absolute;right:0;top:0;bottom:0;width:4px;background-color:#3b82f6;box-shadow:-4px 0 15px rgba(59,130,246,0.5);"></div>
+<span style="font-size:15px;font-weight:600;color:#f1f5f9;">פירוט לפי מקור</span>
+</div>
+<table class="inner-table" width="100%" cellspacing="0" cellpadding="0" style="background-color:#1a253a;">
+<tr style="background-color:#172133;">
+<th style="text-align:right;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">מקור</th>
+<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">הזמנות</th>
+<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">כרטיסים</th>
+<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">ממוצע</th>
+<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">הכנסה</th>
+<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">עלות</th>
+<th style="text-align:left;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">רווח</th>
+<th style="text-align:center;padding:12px 20px;color:#64748b;font-size:11px;text-transform:uppercase;border-bottom:1px solid #2d3b55;">מרווח</th>
+</tr>
+${source_rows}
+</table>
+</div>
+
+<div style="background:#111827;padding:25px;margin:20px;border-radius:8px;border:1px solid #374151;text-align:center;position:relative;overflow:hidden;">
+<div style="position:absolute;top:50%;left:50%;transform:translate(-50%,-50%);width:200px;height:200px;background:radial-gradient(circle, rgba(52,211,153,0.1) 0%, rgba(0,0,0,0) 70%);"></div>
+<div style="position:relative;z-index:1;">
+<div style="color:#9ca3af;font-size:12px;letter-spacing:2px;text-transform:uppercase;margin-bottom:5px;">רווח כולל${profit_note}</div>
+<div style="font-size:42px;font-weight:700;color:#34d399;letter-spacing:-1px;text-shadow:0 0 25px rgba(52,211,153,0.2);font-family:Consolas,monospace;">EUR ${total_profit}</div>
+<div style="color:#64748b;font-size:13px;margin-top:8px;">מרווח רווח: ${profit_margin}%</div>
+</div>
+${potential_note}
+</div>
+
+<div style="text-align:center;padding:25px;border-top:1px solid #1e293b;background-color:#0f172a;">
+<div style="color:#475569;font-size:12px;line-height:1.5;">מערכת ניהול הזמנות - קוד יהודה</div>
+<div style="color:#38bdf8;font-size:11px;margin-top:8px;">${generated_at}</div>
+</div>
+
+</div>
+</td></tr>
+</table>
+</body>
+</html>""")
+
+
+def render_daily_sales_report(summary, sources, date_str, now):
+    """Render the daily sales report.
+    
+    summary: dict with num_orders, total_tickets, total_revenue, total_profit,
+             potential_profit, profit_margin
+    sources: list of dicts with source, orders, tickets, revenue, cost, profit, margin
+    """
+    max_revenue = max([row['revenue'] for row in sources], default=0)
+    
+    source_rows = _render_rows(_DAILY_SOURCE_ROW, (
+        {
+            'source': _text(row['source']),
+            'orders': int(row['orders']),
+            'tickets': int(row['tickets']),
+            'avg_tickets': row['tickets'] / row['orders'] if row['orders'] else 0,
+            'revenue': row['revenue'],
+            'pct_width': int((row['revenue'] / max_revenue) * 100) if max_revenue > 0 else 0,
+            'cost': row['cost'],
+            'profit': row['profit'],
+            'margin_display': f"{row['margin']:.0f}%" if row['cost'] > 0 else "~30%",
+        }
+        for row in sources
+    ))
+    
+    num_orders = summary['num_orders']
+    potential_profit = summary.get('potential_profit', 0)
+    
+    return DAILY_SALES_REPORT.substitute(
+        date_str=date_str,
+        generated_time=now.strftime('%H:%M'),
+        generated_at=now.strftime('%d.%m.%Y %H:%M'),
+        num_orders=num_orders,
+        total_tickets=summary['total_tickets'],
+        total_revenue=f"{summary['total_revenue']:,.0f}",
+        avg_tickets=f"{(summary['total_tickets'] / num_orders if num_orders > 0 else 0):.1f}",
+        source_rows=source_rows,
+        profit_note="*" if potential_profit > 0 else "",
+        total_profit=f"{summary['total_profit']:,.0f}",
+        profit_margin=f"{summary['profit_margin']:.1f}",
+        potential_note=_POTENTIAL_PROFIT_NOTE if potential_profit > 0 else "",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Weekly sales report
+# ---------------------------------------------------------------------------
+
+_WEEKLY_SOURCE_ITEM = "<div style='padding:8px;margin:4px 0;background:#fff;border-radius:5px;'><b>{source}</b><br><span style='color:#666;font-size:12px;'>{orders} הזמנות | €{revenue:,.0f} ({pct:.0f}%)</span></div>"
+
+_WEEKLY_EVENT_ITEM = "<div style='padding:8px;margin:4px 0;background:#fff;border-radius:5px;border-right:3px solid #6f42c1;'><b>{event}...</b><br><span style='color:#666;font-size:12px;'>{orders} הזמנות | €{revenue:,.0f}</span></div>"
+
+WEEKLY_SALES_REPORT = Template("""<!DOCTYPE html>
+<html dir="rtl" lang="he">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin:0;padding:0;background:#f0f2f5;font-family:Arial,sans-serif;">
+<div dir="rtl" style="max-width:600px;margin:0 auto;background:#fff;">
+
+<div style="background:linear-gradient(135deg,#6f42c1,#9b59b6);color:#fff;padding:20px;text-align:center;">
+<div style="font-size:22px;font-weight:bold;">📊 דוח מכירות שבועי</div>
+<div style="font-size:13px;opacity:0.9;margin-top:5px;">קוד יהודה | ${week_start} - ${week_end}</div>
+</div>
+
+<div style="background:#1a1a2e;color:#fff;padding:15px;">
+<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
+<div style="flex:1;min-width:70px;padding:10px;">
+<div style="font-size:26px;font-weight:bold;color:#6f42c1;">${num_orders}</div>
+<div style="font-size:11px;color:#aaa;">הזמנות</div>
+</div>
+<div style="flex:1;min-width:70px;padding:10px;">
+<div style="font-size:26px;font-weight:bold;color:#17a2b8;">${total_tickets}</div>
+<div style="font-size:11px;color:#aaa;">כרטיסים</div>
+</div>
+<div style="flex:1;min-width:70px;padding:10px;">
+<div style="font-size:26px;font-weight:bold;color:#28a745;">€${total_revenue}</div>
+<div style="font-size:11px;color:#aaa;">הכנסות</div>
+</div>
+<div style="flex:1;min-width:70px;padding:10px;">
+<div style="font-size:26px;font-weight:bold;color:#ffc107;">€${total_profit}</div>
+<div style="font-size:11px;color:#aaa;">${profit_label}</div>
+</div>
+</div>
+</div>
+
+<div style="padding:15px;background:#f8f9fa;">
+<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">📈 ממוצעים יומיים</div>
+<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
+<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#f3e5f5;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#6f42c1;">${avg_daily_orders}</div>
+<div style="font-size:10px;color:#666;">הזמנות/יום</div>
+</div>
+<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#e8f5e9;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#28a745;">€${avg_daily_revenue}</div>
+<div style="font-size:10px;color:#666;">הכנסות/יום</div>
+</div>
+<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#fff3e0;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#f57c00;">€${avg_daily_profit}</div>
+<div style="font-size:10px;color:#666;">רווח/יום</div>
+</div>
+<div style="flex:1;min-width:70px;padding:8px;margin:4px;background:#e3f2fd;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#1976d2;">${profit_margin}%</div>
+<div style="font-size:10px;color:#666;">מרווח</div>
+</div>
+</div>
+</div>
+
+<div style="padding:15px;background:#fff;">
+<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">🏆 אירועים מובילים</div>
+${top_events}
+</div>
+
+<div style="padding:15px;background:#f8f9fa;">
+<div style="font-size:14px;font-weight:bold;color:#333;margin-bottom:10px;">📊 מקורות</div>
+${source_breakdown}
+</div>
+
+<div style="padding:15px;background:#fff;">
+<div style="display:flex;flex-wrap:wrap;justify-content:space-around;text-align:center;">
+<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#f3e5f5;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#6f42c1;">${unique_events}</div>
+<div style="font-size:10px;color:#666;">אירועים</div>
+</div>
+<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#e8f5e9;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#28a745;">${unique_sources}</div>
+<div style="font-size:10px;color:#666;">מקורות</div>
+</div>
+<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#e3f2fd;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#1976d2;">€${avg_ticket_price}</div>
+<div style="font-size:10px;color:#666;">ממוצע/כרטיס</div>
+</div>
+<div style="flex:1;min-width:80px;padding:8px;margin:4px;background:#fff3e0;border-radius:8px;">
+<div style="font-size:18px;font-weight:bold;color:#f57c00;">${tickets_per_order}</div>
+<div style="font-size:10px;color:#666;">כרטיסים/הזמנה</div>
+</div>
+</div>
+</div>
+
+<div style="background:#1a1a2e;color:#aaa;padding:15px;text-align:center;font-size:11px;">
+<div>מערכת ניהול הזמנות - קוד יהודה</div>
+<div style="margin-top:5px;">${generated_at}</div>
+</div>
+
+</div>
+</body>
+</html>""")
+
+
+def render_weekly_sales_report(summary, sources, top_events, week_start, week_end, now):
+    """Render the weekly sales report.
+    
+    summary: dict with num_orders, total_tickets, total_revenue, total_profit,
+             profit_label, profit_margin, unique_events, unique_sources, days_in_week
+    sources/top_events: lists of dicts with source|event, orders, tickets, revenue
+    """
+    num_orders = summary['num_orders']
+    total_tickets = summary['total_tickets']
+    total_revenue = summary['total_revenue']
+    total_profit = summary['total_profit']
+    days = summary.get('days_in_week', 7)
+    
+    source_breakdown = _render_rows(_WEEKLY_SOURCE_ITEM, (
+        {
+            'source': _text(row['source']),
+            'orders': int(row['orders']),
+            'revenue': row['revenue'],
+            'pct': (row['revenue'] / total_revenue * 100) if total_revenue > 0 else 0,
+        }
+        for row in sources
+    ))
+    
+    top_events_html = _render_rows(_WEEKLY_EVENT_ITEM, (
+        {'event': _text(row['event'], limit=28), 'orders': int(row['orders']), 'revenue': row['revenue']}
+        for row in top_events
+    ))
+    
+    return WEEKLY_SALES_REPORT.substitute(
+        week_start=week_start,
+        week_end=week_end,
+        generated_at=now.strftime('%d/%m/%Y %H:%M'),
+        num_orders=num_orders,
+        total_tickets=total_tickets,
+        total_revenue=f"{total_revenue:,.0f}",
+        total_profit=f"{total_profit:,.0f}",
+        profit_label=summary['profit_label'],
+        avg_daily_orders=f"{(num_orders / days if days > 0 else 0):.1f}",
+        avg_daily_revenue=f"{(total_revenue / days if days > 0 else 0):,.0f}",
+        avg_daily_profit=f"{(total_profit / days if days > 0 else 0):,.0f}",
+        profit_margin=f"{summary['profit_margin']:.0f}",
+        top_events=top_events_html or NO_DATA_DIV_HTML,
+        source_breakdown=source_breakdown or NO_DATA_DIV_HTML,
+        unique_events=summary['unique_events'],
+        unique_sources=summary['unique_sources'],
+        avg_ticket_price=f"{(total_revenue / total_tickets if total_tickets > 0 else 0):,.0f}",
+        tickets_per_order=f"{(total_tickets / num_orders if num_orders > 0 else 0):.1f}",
+    )
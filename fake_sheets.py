@@ -0,0 +1,399 @@
+"""
+In-memory Google Sheets stand-in.
+Set FAKE_GSPREAD and every get_gspread_client() (app, agents page, report
+scripts) returns a process-wide fake client instead of authorizing: same
+gspread calls, backed by Python lists, with optional per-call latency and
+quota / transient errors so write batching and retries can be exercised and
+benchmarked with no credentials or network.
+
+    FAKE_GSPREAD=1                 synthetic orders sheet (FAKE_GSPREAD_ROWS rows, default 1000)
+    FAKE_GSPREAD=/path/seed.json   {"spreadsheet name": [[header...], [row...], ...]}
+    FAKE_GSPREAD_LATENCY_MS=150    sleep per API call
+    FAKE_GSPREAD_QUOTA=60          API calls per rolling minute before 429 errors
+    FAKE_GSPREAD_ERROR_RATE=0.05   share of calls failing with a random 429 / 503
+
+No Streamlit import.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+FAKE_GSPREAD_ENV = 'FAKE_GSPREAD'
+DEFAULT_FAKE_ROWS = 1000
+
+try:
+    from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+except ImportError:
+    class APIError(Exception):
+        def __init__(self, response):
+            self.response = response
+            self.error = response.json()['error']
+            self.code = self.error['code']
+            super().__init__(self.error)
+
+    class SpreadsheetNotFound(Exception):
+        pass
+
+    class WorksheetNotFound(Exception):
+        pass
+
+class FakeResponse:
+    """The bits of requests.Response that gspread errors and callers read"""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+def _api_error(code, status, message):
+    return APIError(FakeResponse(code, {'error': {'code': code, 'status': status, 'message': message}}))
+
+_A1_CELL = re.compile(r'^([A-Za-z]*)(\d*)$')
+
+def _column_index(letters):
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - 64
+    return index
+
+def parse_a1_range(a1):
+    """'O12' / 'A1:C3' / 'Sheet1!B:B' -> (first_row, first_col, last_row, last_col), 1-based, None = open-ended"""
+    a1 = a1.split('!')[-1].replace('$', '')
+    start, _, end = a1.partition(':')
+    bounds = []
+    for part in (start, end or start):
+        match = _A1_CELL.match(part.strip())
+        if not match:
+            raise _api_error(400, 'INVALID_ARGUMENT', f"Unable to parse range: {a1}")
+        letters, digits = match.groups()
+        bounds.append((int(digits) if digits else None, _column_index(letters) if letters else None))
+    (first_row, first_col), (last_row, last_col) = bounds
+    return first_row or 1, first_col or 1, last_row, last_col
+
+class FakeBackend:
+    """Shared grid store + call accounting, latency and injected failures"""
+
+    def __init__(self, latency_ms=0, quota_per_minute=None, error_rate=0.0, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._recent_calls = deque()
+        self.calls = Counter()
+        self.errors = Counter()
+        self.spreadsheets = {}
+
+    def add_spreadsheet(self, name, values, spreadsheet_id=None):
+        """Register a spreadsheet whose first worksheet holds `values` (list of rows)"""
+        with self._lock:
+            spreadsheet = FakeSpreadsheet(self, name, spreadsheet_id or f"fake-{len(self.spreadsheets) + 1}")
+            spreadsheet.add_worksheet_values('Sheet1', values)
+            self.spreadsheets[spreadsheet.id] = spreadsheet
+            return spreadsheet
+
+    def api_call(self, method):
+        """Account for one API request - sleeps the configured latency, may raise quota / transient errors"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[method] += 1
+            now = time.time()
+            while self._recent_calls and now - self._recent_calls[0] > 60:
+                self._recent_calls.popleft()
+            if self.quota_per_minute and len(self._recent_calls) >= self.quota_per_minute:
+                self.errors[429] += 1
+                raise _api_error(429, 'RESOURCE_EXHAUSTED', "Quota exceeded for quota metric 'Read/Write requests' (fake)")
+            self._recent_calls.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                code, status = self._random.choice([(429, 'RESOURCE_EXHAUSTED'), (503, 'UNAVAILABLE')])
+                self.errors[code] += 1
+                raise _api_error(code, status, "Injected transient error (fake)")
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+            self._recent_calls.clear()
+
+class FakeHTTPClient:
+    """client.http_client - answers the Drive metadata request sheet_watch.py makes"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        self._backend.api_call('drive.files.get')
+        spreadsheet_id = endpoint.rstrip('/').rsplit('/', 1)[-1]
+        spreadsheet = self._backend.spreadsheets.get(spreadsheet_id)
+        if spreadsheet is None:
+            raise _api_error(404, 'NOT_FOUND', f"File not found: {spreadsheet_id}")
+        return FakeResponse(200, {'version': str(spreadsheet.version), 'modifiedTime': spreadsheet.modified_time})
+
+class FakeClient:
+    """gspread.Client subset: open, open_by_key, openall"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.http_client = FakeHTTPClient(backend)
+
+    def open(self, title, folder_id=None):
+        self.backend.api_call('drive.files.list')
+        for spreadsheet in self.backend.spreadsheets.values():
+            if spreadsheet.title == title:
+                return spreadsheet
+        raise SpreadsheetNotFound(title)
+
+    def open_by_key(self, key):
+        self.backend.api_call('spreadsheets.get')
+        if key not in self.backend.spreadsheets:
+            raise SpreadsheetNotFound(key)
+        return self.backend.spreadsheets[key]
+
+    def openall(self, title=None):
+        self.backend.api_call('drive.files.list')
+        return [s for s in self.backend.spreadsheets.values() if title is None or s.title == title]
+
+class FakeSpreadsheet:
+    """gspread.Spreadsheet subset"""
+
+    def __init__(self, backend, title, spreadsheet_id):
+        self.backend = backend
+        self.title = title
+        self.id = spreadsheet_id
+        self.version = 1
+        self.modified_time = datetime.now(timezone.utc).isoformat()
+        self._worksheets = []
+
+    def touch(self):
+        self.version += 1
+        self.modified_time = datetime.now(timezone.utc).isoformat()
+
+    def add_worksheet_values(self, title, values):
+        worksheet = FakeWorksheet(self, title, len(self._worksheets), values)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def get_worksheet(self, index):
+        self.backend.api_call('spreadsheets.get')
+        if index >= len(self._worksheets):
+            return None
+        return self._worksheets[index]
+
+    def worksheet(self, title):
+        self.backend.api_call('spreadsheets.get')
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def worksheets(self):
+        self.backend.api_call('spreadsheets.get')
+        return list(self._worksheets)
+
+    @property
+    def sheet1(self):
+        return self.get_worksheet(0)
+
+    def batch_update(self, body):
+        """Formatting / structural requests: accepted and counted, cell values untouched"""
+        self.backend.api_call('spreadsheets.batchUpdate')
+        with self.backend._lock:
+            self.touch()
+        return {'spreadsheetId': self.id, 'replies': [{} for _ in body.get('requests', [])]}
+
+class FakeWorksheet:
+    """gspread.Worksheet subset over a list of string rows"""
+
+    def __init__(self, spreadsheet, title, index, values):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.index = index
+        self.id = index
+        self._rows = [[str(cell) for cell in row] for row in values]
+
+    @property
+    def _backend(self):
+        return self.spreadsheet.backend
+
+    @property
+    def row_count(self):
+        return len(self._rows)
+
+    @property
+    def col_count(self):
+        return max((len(row) for row in self._rows), default=0)
+
+    def _set_cell(self, row, col, value):
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        if len(cells) < col:
+            cells.extend([''] * (col - len(cells)))
+        cells[col - 1] = '' if value is None else str(value)
+
+    def _write_range(self, a1, values):
+        first_row, first_col, _, _ = parse_a1_range(a1)
+        updated = 0
+        for r, row_values in enumerate(values):
+            for c, value in enumerate(row_values):
+                self._set_cell(first_row + r, first_col + c, value)
+                updated += 1
+        return {'updatedRange': f"{self.title}!{a1}", 'updatedRows': len(values), 'updatedCells': updated}
+
+    def get_all_values(self, *args, **kwargs):
+        self._backend.api_call('values.get')
+        with self._backend._lock:
+            width = self.col_count
+            return [row + [''] * (width - len(row)) for row in self._rows]
+
+    get_values = get_all_values
+
+    def get_all_records(self, head=1, default_blank='', **kwargs):
+        values = self.get_all_values()
+        if len(values) < head:
+            return []
+        headers = values[head - 1]
+        return [
+            {header: (cell if cell != '' else default_blank) for header, cell in zip(headers, row)}
+            for row in values[head:]
+        ]
+
+    def row_values(self, row, **kwargs):
+        self._backend.api_call('values.get')
+        with self._backend._lock:
+            if row > len(self._rows):
+                return []
+            values = list(self._rows[row - 1])
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def col_values(self, col, **kwargs):
+        self._backend.api_call('values.get')
+        with self._backend._lock:
+            values = [row[col - 1] if len(row) >= col else '' for row in self._rows]
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def acell(self, label, **kwargs):
+        self._backend.api_call('values.get')
+        row, col, _, _ = parse_a1_range(label)
+        with self._backend._lock:
+            value = self._rows[row - 1][col - 1] if row <= len(self._rows) and col <= len(self._rows[row - 1]) else ''
+        return type('Cell', (), {'row': row, 'col': col, 'value': value})()
+
+    def update(self, values=None, range_name=None, **kwargs):
+        """Both argument orders gspread accepts: update('B2', [[..]]) and update([[..]], 'B2')"""
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self._backend.api_call('values.update')
+        with self._backend._lock:
+            result = self._write_range(range_name or 'A1', values)
+            self.spreadsheet.touch()
+        return {'spreadsheetId': self.spreadsheet.id, **result}
+
+    def update_acell(self, label, value):
+        return self.update([[value]], label)
+
+    def update_cell(self, row, col, value):
+        self._backend.api_call('values.update')
+        with self._backend._lock:
+            self._set_cell(row, col, value)
+            self.spreadsheet.touch()
+        return {'spreadsheetId': self.spreadsheet.id, 'updatedCells': 1}
+
+    def batch_update(self, data, **kwargs):
+        self._backend.api_call('values.batchUpdate')
+        with self._backend._lock:
+            responses = [self._write_range(item['range'], item['values']) for item in data]
+            self.spreadsheet.touch()
+        return {
+            'spreadsheetId': self.spreadsheet.id,
+            'totalUpdatedCells': sum(response['updatedCells'] for response in responses),
+            'responses': responses,
+        }
+
+    def append_rows(self, values, **kwargs):
+        self._backend.api_call('values.append')
+        with self._backend._lock:
+            while self._rows and not any(cell != '' for cell in self._rows[-1]):
+                self._rows.pop()
+            first_row = len(self._rows) + 1
+            self._rows.extend([['' if cell is None else str(cell) for cell in row] for row in values])
+            self.spreadsheet.touch()
+        return {
+            'spreadsheetId': self.spreadsheet.id,
+            'updates': {'updatedRange': f"{self.title}!A{first_row}", 'updatedRows': len(values)},
+        }
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], **kwargs)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._backend.api_call('spreadsheets.batchUpdate')
+        with self._backend._lock:
+            del self._rows[start_index - 1:(end_index or start_index)]
+            self.spreadsheet.touch()
+        return {'spreadsheetId': self.spreadsheet.id}
+
+    def clear(self):
+        self._backend.api_call('values.clear')
+        with self._backend._lock:
+            self._rows = []
+            self.spreadsheet.touch()
+        return {'spreadsheetId': self.spreadsheet.id}
+
+    def format(self, ranges, format, **kwargs):
+        self._backend.api_call('spreadsheets.batchUpdate')
+        return {'spreadsheetId': self.spreadsheet.id}
+
+def fake_sheets_enabled():
+    return bool(os.environ.get(FAKE_GSPREAD_ENV, '').strip())
+
+def _env_number(name, cast, default=None):
+    value = os.environ.get(name, '').strip()
+    return cast(value) if value else default
+
+def _seed_backend(backend, setting):
+    if setting != '1' and os.path.exists(setting):
+        with open(setting, encoding='utf-8') as seed_file:
+            for name, values in json.load(seed_file).items():
+                backend.add_spreadsheet(name, values)
+        return
+
+    from report_engine import SHEET_NAME
+    from benchmarks.synthetic_sheet import generate_sheet_values
+
+    rows = _env_number('FAKE_GSPREAD_ROWS', int, DEFAULT_FAKE_ROWS)
+    backend.add_spreadsheet(SHEET_NAME, generate_sheet_values(rows, seed=0), spreadsheet_id='fake-orders')
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_fake_backend():
+    """Process-wide backend built from the FAKE_GSPREAD* environment on first use"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = FakeBackend(
+                latency_ms=_env_number('FAKE_GSPREAD_LATENCY_MS', float, 0),
+                quota_per_minute=_env_number('FAKE_GSPREAD_QUOTA', int),
+                error_rate=_env_number('FAKE_GSPREAD_ERROR_RATE', float, 0.0),
+            )
+            _seed_backend(_backend, os.environ.get(FAKE_GSPREAD_ENV, '').strip())
+        return _backend
+
+def get_fake_client():
+    return FakeClient(get_fake_backend())
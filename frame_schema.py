@@ -0,0 +1,101 @@
+"""
+Compact typed schema for the orders frame.
+get_all_values() gives every column as Python strings. Before the snapshot is
+cached, repetitive columns (status, source, event, category, supplier) become
+categoricals, ratio columns float32, row_index int32 and the remaining free
+text Arrow-backed strings (when pyarrow is installed - Streamlit ships it).
+Smaller frames make cache pickling and every per-session copy cheaper.
+
+Money columns (TOTAL_clean, profit, ...) stay float64: float32 keeps ~7
+significant digits, so sums over thousands of orders would drift by cents.
+
+The compacted snapshot is cached once per process (st.cache_resource) and
+shared read-only: callers get snapshot_view() shallow copies, and pandas
+Copy-on-Write makes any edit of a view copy just the columns it touches.
+
+No Streamlit import.
+"""
+
+import numpy as np
+import pandas as pd
+
+import report_engine
+from perf_metrics import count
+
+CATEGORY_COLUMNS = ['orderd', 'Status', 'source', 'event name', 'Category / Section', 'Supplier NAME']
+FLOAT32_COLUMNS = ['commission_rate', 'margin_pct']
+INT32_COLUMNS = ['row_index']
+# Above this distinct/rows share a categorical saves nothing over strings
+MAX_CATEGORY_RATIO = 0.5
+
+def arrow_string_dtype():
+    """NaN-missing Arrow string dtype (pandas' own "str" semantics), or None without pyarrow / pandas < 2.3"""
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except (ImportError, TypeError):
+        return None
+
+def frame_memory_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def _as_category(series):
+    """Categorical that always accepts '' (the app blanks missing cells with fillna(''))"""
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    if '' not in values.cat.categories:
+        values = values.cat.add_categories([''])
+    return values
+
+def _is_text(series):
+    return (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)) and \
+        pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+
+def _compact_column(col, series, string_dtype):
+    """The compact version of one column, or None to keep it as is"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return None if '' in dtype.categories else _as_category(series)
+    if col in CATEGORY_COLUMNS and _is_text(series) and series.nunique(dropna=False) <= MAX_CATEGORY_RATIO * len(series):
+        return _as_category(series)
+    if col in FLOAT32_COLUMNS and pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+        return series.astype(np.float32)
+    if col in INT32_COLUMNS and pd.api.types.is_integer_dtype(dtype) and dtype != np.int32:
+        if series.abs().max() < np.iinfo(np.int32).max:
+            return series.astype(np.int32)
+        return None
+    if string_dtype is not None and dtype != string_dtype and _is_text(series):
+        return series.astype(string_dtype)
+    return None
+
+def compact_order_frame(df, label='orders', log=None):
+    """Retype the columns of a loaded orders frame in place (same values, smaller dtypes).
+    The memory saved goes to the frame_kb_before / frame_kb_after perf counters; pass log=print to also print it."""
+    if df.empty:
+        return df
+    before = frame_memory_bytes(df)
+    string_dtype = arrow_string_dtype()
+    converted = {}
+    for col in df.columns:
+        compact = _compact_column(col, df[col], string_dtype)
+        if compact is not None:
+            converted[col] = compact
+    for col, values in converted.items():
+        df[col] = values
+    after = frame_memory_bytes(df)
+    count('frame_kb_before', before // 1024)
+    count('frame_kb_after', after // 1024)
+    saved = (1 - after / before) * 100 if before else 0.0
+    if log:
+        log(f"Compact {label} frame: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB (-{saved:.0f}%, {len(df):,} rows, {len(converted)} columns retyped)")
+    return df
+
+def enable_copy_on_write():
+    """pandas Copy-on-Write (always on from pandas 3): derived frames and shallow copies never write through to their parent"""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+def snapshot_view(df):
+    """A caller's own frame over the shared cached snapshot - no data copied, status index reused"""
+    view = df.copy(deep=False)
+    report_engine.share_status_index(df, view)
+    return view
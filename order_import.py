@@ -0,0 +1,228 @@
+"""
+Bulk order import engine for the agents page.
+Streams the uploaded CSV / xlsx in chunks (bounded memory), validates and
+normalizes each chunk with vectorized pandas ops, drops order numbers that
+already exist in the sheet (or repeat inside the file), and builds sheet
+rows ready for a handful of append_rows calls.
+
+No Streamlit import - the page only handles upload, preview and the write.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+REQUIRED_IMPORT_COLUMNS = ['Order number', 'event name', 'source', 'Qty', 'Price sold']
+OPTIONAL_IMPORT_COLUMNS = ['docket number', 'Date of the event', 'Category / Section']
+
+# Field -> sheet column index (A = 0), shared with the manual "add order" form
+ORDER_COLUMN_MAPPING = {
+    'order date': 0,        # A
+    'orderd': 1,            # B
+    'source': 2,            # C
+    'Order number': 3,      # D
+    'docket number': 4,     # E
+    'event name': 5,        # F
+    'Date of the event': 6, # G
+    'Category / Section': 8, # I
+    'Qty': 10,              # K
+    'Price sold': 11,       # L - numeric value
+    'TOTAL': 12,            # M - qty × price
+}
+
+APPEND_BATCH_SIZE = 500
+IMPORT_CHUNK_SIZE = 5000
+
+def _iter_csv_chunks(file, chunksize):
+    """Chunked CSV parse - everything read as text so order numbers keep their form"""
+    size = getattr(file, 'size', None) or 0
+    with pd.read_csv(file, chunksize=chunksize, dtype=str, keep_default_na=False, skipinitialspace=True) as reader:
+        for chunk in reader:
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            progress = min(file.tell() / size, 1.0) if size else 0.0
+            yield chunk, progress
+
+def _iter_xlsx_chunks(file, chunksize):
+    """openpyxl read-only streaming of the first sheet, chunksize rows at a time"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h).strip() if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        width = len(columns)
+        total = max((worksheet.max_row or 1) - 1, 1)
+
+        buffer = []
+        start = 0
+        for row in rows:
+            if not any(v is not None and str(v).strip() != '' for v in row):
+                continue
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer))), min((start + len(buffer)) / total, 1.0)
+                start += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer))), 1.0
+    finally:
+        workbook.close()
+
+def _iter_xls_chunks(file, chunksize):
+    """Legacy .xls has no streaming reader - load once, then hand out slices"""
+    df = pd.read_excel(file, dtype=str)
+    df.columns = [str(c).strip() for c in df.columns]
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize], min((start + chunksize) / max(len(df), 1), 1.0)
+
+def iter_upload_chunks(file, filename, chunksize=IMPORT_CHUNK_SIZE):
+    """Yield (chunk DataFrame, progress 0..1) for an uploaded CSV / xlsx / xls file"""
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    name = filename.lower()
+    if name.endswith('.csv'):
+        return _iter_csv_chunks(file, chunksize)
+    if name.endswith('.xls'):
+        return _iter_xls_chunks(file, chunksize)
+    return _iter_xlsx_chunks(file, chunksize)
+
+def read_upload_head(file, filename, nrows=10):
+    """First rows of an upload (columns + preview) without reading the whole file"""
+    chunks = iter_upload_chunks(file, filename, chunksize=nrows)
+    try:
+        head, _ = next(chunks, (pd.DataFrame(), 1.0))
+    finally:
+        chunks.close()
+        if hasattr(file, 'seek'):
+            file.seek(0)
+    return head
+
+def import_chunks(chunks, col_mapping, existing_order_numbers, now=None):
+    """Generator pipeline: map + validate + dedupe every chunk.
+    Yields (accepted, rejected, progress); the dedupe set is shared across chunks."""
+    seen = set(existing_order_numbers)
+    now = now or datetime.now()
+    for raw, progress in chunks:
+        accepted, rejected = prepare_import(map_import_columns(raw, col_mapping), seen, now)
+        yield accepted, rejected, progress
+
+def build_order_row(order_data, width):
+    """Place an order dict into a sheet row of the given width"""
+    row = [''] * width
+    for key, col_idx in ORDER_COLUMN_MAPPING.items():
+        if key in order_data and col_idx < width:
+            row[col_idx] = order_data[key]
+    return row
+
+def normalize_order_numbers(series):
+    """Comparable order numbers: trimmed, lower-case, no leading '#', no Excel '.0' suffix"""
+    return (
+        series.fillna('').astype(str)
+        .str.strip()
+        .str.lstrip('#')
+        .str.replace(r'\.0+$', '', regex=True)
+        .str.lower()
+    )
+
+def _clean_number(series):
+    """Vectorized '€1,234.50' -> 1234.5 (NaN when not a number)"""
+    cleaned = series.fillna('').astype(str).str.replace(r'[^\d.\-]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+def map_import_columns(raw_df, col_mapping):
+    """Project the uploaded frame onto system field names (no full copy of unused columns)"""
+    mapped = pd.DataFrame(index=raw_df.index)
+    for field in REQUIRED_IMPORT_COLUMNS + OPTIONAL_IMPORT_COLUMNS:
+        source_col = col_mapping.get(field)
+        if source_col is not None and source_col in raw_df.columns:
+            mapped[field] = raw_df[source_col]
+        else:
+            mapped[field] = ''
+    return mapped
+
+def prepare_import(mapped_df, existing_order_numbers=(), now=None, currency='€'):
+    """Validate, normalize and dedupe a mapped import frame.
+
+    existing_order_numbers: normalized order numbers already in the sheet. When a
+    set is passed it is extended with the accepted numbers, so calling this once
+    per chunk also dedupes across chunks.
+    Returns (accepted, rejected): accepted has the sheet fields ready for
+    build_order_row, rejected keeps the original values plus a 'סיבה' column.
+    """
+    now = now or datetime.now()
+    seen = existing_order_numbers if isinstance(existing_order_numbers, set) else set(existing_order_numbers)
+
+    text = {
+        col: mapped_df[col].fillna('').astype(str).str.strip()
+        for col in ['event name', 'source'] + OPTIONAL_IMPORT_COLUMNS
+    }
+    order_raw = mapped_df['Order number'].fillna('').astype(str).str.strip().str.replace(r'\.0+$', '', regex=True)
+    order_key = normalize_order_numbers(order_raw)
+    qty = _clean_number(mapped_df['Qty'])
+    price = _clean_number(mapped_df['Price sold'])
+
+    reason = pd.Series('', index=mapped_df.index, dtype=object)
+    checks = [
+        (order_key == '', 'חסר מספר הזמנה'),
+        (text['event name'] == '', 'חסר שם אירוע'),
+        (text['source'] == '', 'חסר מקור'),
+        (qty.isna() | (qty <= 0) | (qty != qty.round()), 'כמות לא תקינה'),
+        (price.isna() | (price < 0), 'מחיר לא תקין'),
+        (order_key.isin(seen) & (order_key != ''), 'הזמנה כבר קיימת'),
+    ]
+    for mask, message in checks:
+        reason = reason.mask(mask & (reason == ''), message)
+    # Only rows that passed every other check count as the first copy of an order
+    valid_key = order_key.where(reason == '')
+    reason = reason.mask(valid_key.duplicated() & valid_key.notna(), 'כפילות בקובץ')
+
+    ok = reason == ''
+    seen.update(order_key[ok])
+
+    qty_ok = qty[ok].astype(int)
+    price_ok = price[ok]
+    accepted = pd.DataFrame({
+        'order date': now.strftime("%Y-%m-%d %H:%M:%S"),
+        'orderd': 'new',
+        'source': text['source'][ok],
+        'Order number': order_raw[ok],
+        'docket number': text['docket number'][ok],
+        'event name': text['event name'][ok],
+        'Date of the event': text['Date of the event'][ok],
+        'Category / Section': text['Category / Section'][ok],
+        'Qty': qty_ok,
+        'Price sold': currency + price_ok.map('{:.2f}'.format),
+        'TOTAL': currency + (price_ok * qty_ok).map('{:.2f}'.format),
+    }, index=mapped_df.index[ok])
+
+    rejected = mapped_df[~ok].copy()
+    rejected['סיבה'] = reason[~ok]
+    return accepted, rejected
+
+def accepted_to_rows(accepted, width):
+    """Sheet rows (lists) for append_rows, in ORDER_COLUMN_MAPPING layout"""
+    rows = [[''] * width for _ in range(len(accepted))]
+    for field, col_idx in ORDER_COLUMN_MAPPING.items():
+        if field not in accepted.columns or col_idx >= width:
+            continue
+        values = accepted[field].tolist()
+        for row, value in zip(rows, values):
+            row[col_idx] = value.item() if hasattr(value, 'item') else value
+    return rows
+
+def append_order_rows(worksheet, rows, batch_size=APPEND_BATCH_SIZE):
+    """Append rows in batch_size chunks. Returns a list of (rows in chunk, success, message)"""
+    results = []
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        try:
+            worksheet.append_rows(chunk, value_input_option='USER_ENTERED')
+            results.append((len(chunk), True, f"נוספו {len(chunk)} שורות"))
+        except Exception as e:
+            results.append((len(chunk), False, f"שגיאה בהוספת שורות: {str(e)}"))
+    return results
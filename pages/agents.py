@@ -7,8 +7,20 @@ import json
 import re
 import os
 from utils import (
-    export_to_excel, export_to_csv, get_smart_alerts,
-    save_search_query, load_saved_searches, create_change_log, get_recent_changes
+    render_lazy_export, get_smart_alerts,
+    save_search_query, load_saved_searches, create_change_log, get_recent_changes,
+    count_changes, get_change_actions, render_perf_panel, perf_panel_enabled, current_user_label
+)
+from sheet_mirror import get_orders_mirror, sync_orders_mirror, invalidate_orders_mirror, raw_content_version
+from sheet_watch import get_sheet_watcher
+from fake_sheets import fake_sheets_enabled, get_fake_client
+from perf_metrics import start_rerun, finish_rerun, recent_runs, stage, lap, count, cache_lookup, cache_miss
+from sheets_gateway import govern_client, set_api_user, get_sheets_gateway
+from frame_schema import compact_order_frame, enable_copy_on_write, snapshot_view
+from cache_regions import REGION_SNAPSHOT, REGION_SEARCH, register_cache, invalidate
+from order_import import (
+    REQUIRED_IMPORT_COLUMNS, OPTIONAL_IMPORT_COLUMNS, build_order_row, normalize_order_numbers,
+    iter_upload_chunks, read_upload_head, import_chunks, accepted_to_rows, append_order_rows
 )
 
 st.set_page_config(
@@ -17,6 +29,10 @@ st.set_page_config(
     layout="wide"
 )
 
+enable_copy_on_write()
+start_rerun('agents')
+set_api_user(current_user_label())
+
 st.markdown("""
 <style>
     [data-testid="stAppViewContainer"] {
@@ -51,6 +67,9 @@ SHEET_NAME = "מערכת הזמנות - קוד יהודה  "
 WORKSHEET_INDEX = 0
 
 def get_gspread_client():
+    if fake_sheets_enabled():
+        return govern_client(get_fake_client())
+    
     scope = [
         "https://spreadsheets.google.com/feeds",
         "https://www.googleapis.com/auth/spreadsheets",
@@ -113,7 +132,7 @@ def get_gspread_client():
         raise ValueError(f"Error parsing GOOGLE_CREDENTIALS: {str(e)}")
     
     credentials = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    return gspread.authorize(credentials)
+    return govern_client(gspread.authorize(credentials))
 
 def find_column(df, *keywords):
     """Find column containing all keywords (case-insensitive)"""
@@ -123,18 +142,25 @@ def find_column(df, *keywords):
             return col
     return None
 
-@st.cache_data(ttl=300)
+@st.cache_resource(ttl=3600)  # refreshed on sheet change (see below); the TTL is only a safety net
 def load_data_from_sheet():
-    """Load data from Google Sheets with error handling"""
+    """Load data from Google Sheets with error handling - one shared, read-only frame (use through snapshot_view).
+    Returns (frame, version): the raw content hash, computed once per load and used as the cache key of alerts / exports."""
     try:
-        client = get_gspread_client()
-        sheet = client.open(SHEET_NAME)
-        worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
-        
-        data = worksheet.get_all_values()
+        cache_miss('snapshot')
+        watcher = get_sheet_watcher(get_gspread_client, SHEET_NAME)
+        token = watcher.load_token()
+        with stage('sheets_fetch'):
+            client = get_gspread_client()
+            sheet = client.open(SHEET_NAME)
+            worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
+            
+            data = worksheet.get_all_values()
+        watcher.mark_loaded('agents', token)
+        count('rows_fetched', max(len(data) - 1, 0))
         
         if len(data) < 2:
-            return pd.DataFrame()
+            return pd.DataFrame(), 'empty'
         
         headers = [str(h).strip() for h in data[0]]
         rows = data[1:]
@@ -143,7 +169,12 @@ def load_data_from_sheet():
         df['row_index'] = range(2, len(df) + 2)
         df.columns = [col.strip() for col in df.columns]
         
-        return df
+        version = raw_content_version(df)
+        # Optional local SQLite read-replica (ORDERS_MIRROR_DB) - rebuilt only when the sheet content changed
+        sync_orders_mirror(df, version)
+        
+        with stage('compact_schema', rows=len(df)):
+            return compact_order_frame(df), version
         
     except ValueError as e:
         # Clear cache on error to avoid caching the error
@@ -165,18 +196,67 @@ def load_data_from_sheet():
         else:
             raise Exception(f"❌ **שגיאה בטעינת נתונים:** {error_msg}")
 
-def update_docket_number(row_index, new_docket):
+register_cache(REGION_SNAPSHOT, 'agents.load_data_from_sheet', load_data_from_sheet.clear)
+register_cache(REGION_SEARCH, 'orders_mirror', invalidate_orders_mirror)
+
+DOCKET_SHEET_COLUMN = "E"
+DOCKET_BATCH_SIZE = 500
+
+def update_docket_numbers(changes):
+    """Update many docket numbers with one batch_update per DOCKET_BATCH_SIZE rows.
+    changes: list of (row_index, new_docket). Returns {row_index: (success, message)}."""
+    results = {}
+    if not changes:
+        return results
+    
     try:
         client = get_gspread_client()
         sheet = client.open(SHEET_NAME)
         worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
-        
-        cell_address = f"E{row_index}"
-        worksheet.update_acell(cell_address, str(new_docket))
-        
-        return True, f"מספר דוקט עודכן בהצלחה בשורה {row_index}"
     except Exception as e:
-        return False, f"שגיאה בעדכון: {str(e)}"
+        return {int(row_index): (False, f"שגיאה בעדכון: {str(e)}") for row_index, _ in changes}
+    
+    for start in range(0, len(changes), DOCKET_BATCH_SIZE):
+        batch = changes[start:start + DOCKET_BATCH_SIZE]
+        data = [
+            {'range': f"{DOCKET_SHEET_COLUMN}{int(row_index)}", 'values': [[str(new_docket)]]}
+            for row_index, new_docket in batch
+        ]
+        try:
+            worksheet.batch_update(data, value_input_option='USER_ENTERED')
+            for row_index, _ in batch:
+                results[int(row_index)] = (True, f"מספר דוקט עודכן בהצלחה בשורה {int(row_index)}")
+        except Exception as e:
+            for row_index, _ in batch:
+                results[int(row_index)] = (False, f"שגיאה בעדכון: {str(e)}")
+    
+    return results
+
+def update_docket_number(row_index, new_docket):
+    return update_docket_numbers([(row_index, new_docket)])[int(row_index)]
+
+def diff_docket_changes(original_dockets, original_rows, edited_df, docket_col, order_col=None):
+    """Vectorized diff of the edited docket column against the original.
+    Returns a DataFrame with row_index, order, old and new for changed rows only."""
+    n = min(len(edited_df), len(original_dockets), len(original_rows))
+    new_vals = edited_df[docket_col].fillna('').astype(str).to_numpy(dtype=object)[:n]
+    old_vals = original_dockets.fillna('').astype(str).to_numpy(dtype=object)[:n]
+    rows = pd.to_numeric(original_rows, errors='coerce').to_numpy()[:n]
+    
+    changed = (new_vals != old_vals) & pd.notna(rows) & (rows > 0)
+    orders = (
+        edited_df[order_col].astype(str).to_numpy()[:n]
+        if order_col and order_col in edited_df.columns
+        else ['Unknown'] * n
+    )
+    
+    diff = pd.DataFrame({
+        'row_index': rows,
+        'order': orders,
+        'old': old_vals,
+        'new': new_vals,
+    })[changed]
+    return diff.astype({'row_index': int})
 
 def generate_order_number(df):
     """Generate new order number based on existing max"""
@@ -198,26 +278,7 @@ def add_new_order_to_sheet(order_data):
         worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
         
         headers = worksheet.row_values(1)
-        
-        new_row = [''] * len(headers)
-        
-        column_mapping = {
-            'order date': 0,        # A (index 0)
-            'orderd': 1,            # B (index 1)
-            'source': 2,            # C (index 2)
-            'Order number': 3,      # D (index 3)
-            'docket number': 4,     # E (index 4)
-            'event name': 5,        # F (index 5)
-            'Date of the event': 6, # G (index 6)
-            'Category / Section': 8, # I (index 8)
-            'Qty': 10,              # K (index 10)
-            'Price sold': 11,       # L (index 11) - numeric value
-            'TOTAL': 12,            # M (index 12) - qty × price
-        }
-        
-        for key, col_idx in column_mapping.items():
-            if key in order_data and col_idx < len(new_row):
-                new_row[col_idx] = order_data[key]
+        new_row = build_order_row(order_data, len(headers))
         
         worksheet.append_row(new_row, value_input_option='USER_ENTERED')
         
@@ -225,6 +286,46 @@ def add_new_order_to_sheet(order_data):
     except Exception as e:
         return False, f"שגיאה בהוספת הזמנה: {str(e)}"
 
+def open_import_worksheet():
+    """Open the orders worksheet once for a whole import. Returns (worksheet, row width)"""
+    client = get_gspread_client()
+    sheet = client.open(SHEET_NAME)
+    worksheet = sheet.get_worksheet(WORKSHEET_INDEX)
+    return worksheet, len(worksheet.row_values(1))
+
+IMPORT_SAMPLE_ROWS = 200
+
+def summarize_import(results, on_progress=None, on_accepted=None):
+    """Drain an import_chunks pipeline keeping only counters and small samples (bounded memory).
+    on_accepted(accepted) is called per chunk - used to append to the sheet as we go."""
+    summary = {
+        'total': 0, 'accepted': 0, 'rejected': 0, 'reasons': {},
+        'accepted_sample': [], 'rejected_sample': [], 'order_ids': [], 'errors': [], 'added': 0,
+    }
+    for accepted, rejected, progress in results:
+        summary['total'] += len(accepted) + len(rejected)
+        summary['accepted'] += len(accepted)
+        summary['rejected'] += len(rejected)
+        for reason, count in rejected['סיבה'].value_counts().items():
+            summary['reasons'][reason] = summary['reasons'].get(reason, 0) + int(count)
+        for key, frame in (('accepted_sample', accepted), ('rejected_sample', rejected)):
+            kept = sum(len(f) for f in summary[key])
+            if kept < IMPORT_SAMPLE_ROWS and not frame.empty:
+                summary[key].append(frame.head(IMPORT_SAMPLE_ROWS - kept))
+        if len(summary['order_ids']) < 20:
+            summary['order_ids'].extend(accepted['Order number'].head(20 - len(summary['order_ids'])))
+        if on_accepted is not None and not accepted.empty:
+            added, errors = on_accepted(accepted)
+            summary['added'] += added
+            summary['errors'].extend(errors)
+        if on_progress is not None:
+            on_progress(progress, summary)
+    
+    for key in ('accepted_sample', 'rejected_sample'):
+        frames = summary[key]
+        summary[key] = pd.concat(frames).head(IMPORT_SAMPLE_ROWS) if frames else pd.DataFrame()
+    return summary
+
 def get_unique_sources(df):
     """Get list of unique sources from dataframe"""
     if 'source' in df.columns:
@@ -359,7 +460,7 @@ def show_order_details(row, docket_col, unique_key=""):
                             new_value=new_docket.strip(),
                             user='user'
                         )
-                        load_data_from_sheet.clear()
+                        invalidate(REGION_SNAPSHOT)
                         st.success(f"✅ {message}")
                         st.balloons()
                         st.info(f"דוקט עודכן: `{docket}` ➜ `{new_docket}` להזמנה {order_num}")
@@ -412,7 +513,13 @@ connection_msg = "בודק..."
 df = pd.DataFrame()
 
 try:
-    df = load_data_from_sheet()
+    # Refetch only when the sheet's Drive modifiedTime/version changed since the cached load
+    if get_sheet_watcher(get_gspread_client, SHEET_NAME).needs_reload('agents'):
+        load_data_from_sheet.clear()
+    cache_lookup('snapshot')
+    with stage('load_data'):
+        snapshot, SNAPSHOT_VERSION = load_data_from_sheet()
+        df = snapshot_view(snapshot)
     data_loaded = True
     connection_ok, connection_msg = check_connection_status()
 except Exception as e:
@@ -457,7 +564,7 @@ st.markdown(f"""
 
 # Smart Alerts Section
 if data_loaded and len(df) > 0:
-    alerts = get_smart_alerts(df, DOCKET_COL, STATUS_COL, 'Date of the event')
+    alerts = get_smart_alerts(df, DOCKET_COL, STATUS_COL, 'Date of the event', snapshot_version=SNAPSHOT_VERSION)
     if alerts:
         st.markdown("### 🔔 התראות חכמות")
         alert_cols = st.columns(min(len(alerts), 4))
@@ -495,6 +602,7 @@ if selected_tab != st.session_state.agents_active_tab:
 
 st.markdown("---")
 
+lap(f"render:{selected_tab}")
 if selected_tab == "🔍 חיפוש הזמנות":
     st.subheader("🔍 חיפוש הזמנות")
     st.markdown("חיפוש מהיר של נתוני ספק לפי מספר הזמנה, דוקט או מספר הזמנה ספק + עדכון מספר דוקט")
@@ -509,7 +617,23 @@ if selected_tab == "🔍 חיפוש הזמנות":
     if search_query:
         search_query = search_query.strip()
         
-        if ORDER_COL or DOCKET_COL:
+        orders_mirror = get_orders_mirror()
+        if orders_mirror is not None and 'row_index' in df.columns:
+            # Indexed lookup in the local mirror, rows taken from the snapshot
+            found_in_labels = {
+                'order_number': '🔢 מספר הזמנה',
+                'docket_number': '📄 מספר דוקט',
+                'supp_order_number': '📦 מספר הזמנה ספק',
+            }
+            label_by_row = pd.Series(df.index, index=df['row_index'])
+            hits = [
+                (label_by_row[row], field)
+                for row, field in orders_mirror.search(search_query)
+                if row in label_by_row.index
+            ]
+            results = df.loc[[idx for idx, _ in hits]]
+            found_in_list = [found_in_labels[field] for _, field in hits]
+        elif ORDER_COL or DOCKET_COL:
             results_list = []
             seen_indices = set()
             
@@ -652,7 +776,7 @@ elif selected_tab == "📦 ניהול ספקים":
         )
     with col_top[1]:
         if st.button("🔄 רענן נתונים", key="refresh_supplier_data"):
-            load_data_from_sheet.clear()
+            invalidate(REGION_SNAPSHOT)
             st.session_state['data_refreshed'] = True
     
     if st.session_state.get('data_refreshed'):
@@ -1084,45 +1208,35 @@ elif selected_tab == "📦 ניהול ספקים":
             with col_save:
                 if st.button("💾 שמור שינויים", key="save_docket_changes", type="primary"):
                     if original_dockets is not None and original_rows is not None and DOCKET_COL:
-                        changes_made = 0
-                        errors = []
+                        diff = diff_docket_changes(original_dockets, original_rows, edited_df, DOCKET_COL, ORDER_COL)
+                        results = update_docket_numbers(list(zip(diff['row_index'], diff['new'])))
                         
-                        for i in range(len(edited_df)):
-                            new_val = str(edited_df.iloc[i].get(DOCKET_COL, ''))
-                            old_val = str(original_dockets.iloc[i]) if i < len(original_dockets) else ''
-                            row_idx = int(original_rows.iloc[i]) if i < len(original_rows) else None
-                            
-                            if new_val != old_val and row_idx:
-                                success, msg = update_docket_number(row_idx, new_val)
-                                if success:
-                                    changes_made += 1
-                                else:
-                                    errors.append(f"שורה {row_idx}: {msg}")
+                        diff['success'] = pd.Series([results[r][0] for r in diff['row_index']], index=diff.index, dtype=bool)
+                        saved = diff[diff['success']]
+                        changes_made = len(saved)
+                        errors = [
+                            f"שורה {r}: {results[r][1]}"
+                            for r in diff.loc[~diff['success'], 'row_index']
+                        ]
                         
                         if changes_made > 0:
-                            # Log changes
-                            for i in range(len(edited_df)):
-                                new_val = str(edited_df.iloc[i].get(DOCKET_COL, ''))
-                                old_val = str(original_dockets.iloc[i]) if i < len(original_dockets) else ''
-                                row_idx = int(original_rows.iloc[i]) if i < len(original_rows) else None
-                                if new_val != old_val and row_idx:
-                                    order_num = edited_df.iloc[i].get(ORDER_COL, 'Unknown') if ORDER_COL else 'Unknown'
-                                    create_change_log(
-                                        action='batch_update_docket',
-                                        order_id=str(order_num),
-                                        old_value=old_val,
-                                        new_value=new_val,
-                                        user='user'
-                                    )
+                            # One change-log entry for the whole batch
+                            create_change_log(
+                                action='batch_update_docket',
+                                order_id=", ".join(saved['order']),
+                                old_value=", ".join(saved['old']),
+                                new_value=", ".join(saved['new']),
+                                user='user'
+                            )
                             
-                            load_data_from_sheet.clear()
+                            invalidate(REGION_SNAPSHOT)
                             st.success(f"✅ עודכנו {changes_made} שורות!")
                             st.balloons()
                             st.info("💡 לחץ על 'רענן' לצפייה בנתונים המעודכנים")
-                        elif errors:
+                        if errors:
                             for err in errors:
                                 st.error(err)
-                        else:
+                        elif changes_made == 0:
                             st.info("לא זוהו שינויים")
             
             with col_info:
@@ -1142,29 +1256,11 @@ elif selected_tab == "📦 ניהול ספקים":
             export_cols = st.columns(3)
             
             with export_cols[0]:
-                csv_data = export_to_csv(filtered_df)
-                st.download_button(
-                    label="📄 הורד CSV",
-                    data=csv_data,
-                    file_name=f"orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    key="download_csv_enhanced",
-                    use_container_width=True
-                )
+                render_lazy_export(filtered_df, 'csv', "download_csv_enhanced", SNAPSHOT_VERSION)
             
             with export_cols[1]:
-                try:
-                    excel_data = export_to_excel(filtered_df)
-                    st.download_button(
-                        label="📊 הורד Excel",
-                        data=excel_data,
-                        file_name=f"orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        key="download_excel",
-                        use_container_width=True
-                    )
-                except Exception as e:
-                    st.info("💡 Excel דורש openpyxl - התקן: pip install openpyxl")
+                render_lazy_export(filtered_df, 'xlsx', "download_excel", SNAPSHOT_VERSION)
+                render_lazy_export(filtered_df, 'parquet', "download_parquet", SNAPSHOT_VERSION)
             
             with export_cols[2]:
                 if st.button("💾 שמור חיפוש", key="save_current_search", use_container_width=True):
@@ -1378,7 +1474,7 @@ elif selected_tab == "➕ הוספה ידנית":
                     success, message = add_new_order_to_sheet(order_data)
                     
                     if success:
-                        load_data_from_sheet.clear()
+                        invalidate(REGION_SNAPSHOT)
                         st.success(f"✅ {message}")
                         st.balloons()
                         st.markdown(f"""
@@ -1419,31 +1515,28 @@ elif selected_tab == "📥 ייבוא נתונים":
     
     if uploaded_file is not None:
         try:
-            # Read file based on type
-            if uploaded_file.name.endswith('.csv'):
-                import_df = pd.read_csv(uploaded_file)
-            else:
-                import_df = pd.read_excel(uploaded_file)
+            # Only the head is read here - the full file is streamed in chunks below
+            head_df = read_upload_head(uploaded_file, uploaded_file.name)
             
-            st.success(f"✅ הקובץ נטען בהצלחה! {len(import_df)} שורות")
+            st.success(f"✅ הקובץ נטען בהצלחה! ({uploaded_file.size / 1024 / 1024:.1f} MB)")
             
             # Show preview
             st.markdown("### 👀 תצוגה מקדימה")
-            st.dataframe(import_df.head(10), use_container_width=True)
+            st.dataframe(head_df, use_container_width=True)
             
             # Column mapping
             st.markdown("### 🔗 מיפוי עמודות")
             st.info("בחר איזה עמודה בקובץ מתאימה לכל שדה במערכת")
             
-            required_cols = ['Order number', 'event name', 'source', 'Qty', 'Price sold']
-            optional_cols = ['docket number', 'Date of the event', 'Category / Section', 'Supplier NAME', 'SUPP PRICE']
+            required_cols = REQUIRED_IMPORT_COLUMNS
+            optional_cols = OPTIONAL_IMPORT_COLUMNS
             
             col_mapping = {}
             
-            for col in required_cols:
-                available_cols = ['-- לא מיפוי --'] + list(import_df.columns)
+            for col in required_cols + optional_cols:
+                available_cols = ['-- לא מיפוי --'] + list(head_df.columns)
                 selected = st.selectbox(
-                    f"עמודה עבור '{col}':",
+                    f"עמודה עבור '{col}':" if col in required_cols else f"עמודה עבור '{col}' (אופציונלי):",
                     available_cols,
                     key=f"map_{col}",
                     index=0
@@ -1453,55 +1546,83 @@ elif selected_tab == "📥 ייבוא נתונים":
             
             st.markdown("---")
             
-            # Import button
-            if st.button("📥 ייבא הזמנות", type="primary", use_container_width=True):
-                # Validate mapping
-                missing = [col for col in required_cols if col not in col_mapping]
-                if missing:
-                    st.error(f"❌ חסרים מיפויים עבור: {', '.join(missing)}")
-                else:
-                    with st.spinner("מייבא הזמנות..."):
-                        try:
-                            # Map columns and prepare data
-                            mapped_df = import_df.copy()
-                            for sys_col, file_col in col_mapping.items():
-                                if file_col in mapped_df.columns:
-                                    mapped_df[sys_col] = mapped_df[file_col]
-                            
-                            # Add to sheet
-                            success_count = 0
-                            for idx, row in mapped_df.iterrows():
-                                order_data = {
-                                    'order date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                    'orderd': 'new',
-                                    'source': row.get('source', ''),
-                                    'Order number': str(row.get('Order number', '')),
-                                    'docket number': row.get('docket number', ''),
-                                    'event name': row.get('event name', ''),
-                                    'Date of the event': row.get('Date of the event', ''),
-                                    'Category / Section': row.get('Category / Section', ''),
-                                    'Qty': row.get('Qty', 1),
-                                    'Price sold': f"€{row.get('Price sold', 0)}",
-                                    'TOTAL': f"€{float(row.get('Price sold', 0)) * int(row.get('Qty', 1))}",
-                                }
-                                
-                                success, message = add_new_order_to_sheet(order_data)
-                                if success:
-                                    success_count += 1
-                                    create_change_log(
-                                        action='import_order',
-                                        order_id=str(order_data.get('Order number', '')),
-                                        old_value='',
-                                        new_value='imported',
-                                        user='user'
-                                    )
-                            
-                            load_data_from_sheet.clear()
-                            st.success(f"✅ יובאו בהצלחה {success_count} מתוך {len(mapped_df)} הזמנות!")
+            missing = [col for col in required_cols if col not in col_mapping]
+            if missing:
+                st.warning(f"⚠️ חסרים מיפויים עבור: {', '.join(missing)}")
+            else:
+                existing_orders = set()
+                if ORDER_COL and data_loaded:
+                    existing_orders = set(normalize_order_numbers(df[ORDER_COL]))
+                    existing_orders.discard('')
+                
+                def run_import_pipeline(label, on_accepted=None):
+                    """Stream the upload through map -> validate -> dedupe (-> append) with a progress bar"""
+                    progress_bar = st.progress(0.0, text=label)
+                    
+                    def on_progress(progress, summary):
+                        progress_bar.progress(
+                            progress,
+                            text=f"{label} {summary['total']:,} שורות ({summary['accepted']:,} תקינות)"
+                        )
+                    
+                    results = import_chunks(
+                        iter_upload_chunks(uploaded_file, uploaded_file.name),
+                        col_mapping, existing_orders
+                    )
+                    summary = summarize_import(results, on_progress=on_progress, on_accepted=on_accepted)
+                    progress_bar.progress(1.0, text=f"{label} הסתיים - {summary['total']:,} שורות")
+                    return summary
+                
+                # Dry run: validate + dedupe the whole file before touching the sheet
+                dry_run_key = (uploaded_file.name, uploaded_file.size, tuple(sorted(col_mapping.items())))
+                if st.session_state.get('import_dry_run_key') != dry_run_key:
+                    st.session_state.import_dry_run = run_import_pipeline("🧪 בודק...")
+                    st.session_state.import_dry_run_key = dry_run_key
+                dry_run = st.session_state.import_dry_run
+                
+                st.markdown("### 🧪 בדיקה מקדימה")
+                preview_cols = st.columns(3)
+                preview_cols[0].metric("שורות בקובץ", f"{dry_run['total']:,}")
+                preview_cols[1].metric("✅ יתקבלו", f"{dry_run['accepted']:,}")
+                preview_cols[2].metric("❌ יידחו", f"{dry_run['rejected']:,}")
+                
+                if dry_run['rejected']:
+                    with st.expander(f"❌ שורות שנדחו ({dry_run['rejected']:,})"):
+                        st.dataframe(pd.Series(dry_run['reasons'], name='שורות'), use_container_width=True)
+                        st.dataframe(dry_run['rejected_sample'], use_container_width=True)
+                if dry_run['accepted']:
+                    with st.expander(f"✅ שורות שיתווספו ({dry_run['accepted']:,})"):
+                        st.dataframe(dry_run['accepted_sample'], use_container_width=True)
+                
+                # Import button
+                if st.button("📥 ייבא הזמנות", type="primary", use_container_width=True, disabled=not dry_run['accepted']):
+                    try:
+                        worksheet, width = open_import_worksheet()
+                    except Exception as e:
+                        st.error(f"❌ שגיאה בייבוא: {str(e)}")
+                    else:
+                        def append_chunk(accepted):
+                            results = append_order_rows(worksheet, accepted_to_rows(accepted, width))
+                            added = sum(count for count, success, _ in results if success)
+                            return added, [message for _, success, message in results if not success]
+                        
+                        summary = run_import_pipeline("📥 מייבא...", on_accepted=append_chunk)
+                        
+                        if summary['added']:
+                            order_ids = ', '.join(summary['order_ids']) + (' ...' if summary['added'] > len(summary['order_ids']) else '')
+                            create_change_log(
+                                action='bulk_import',
+                                order_id=order_ids,
+                                old_value='',
+                                new_value=f"imported {summary['added']} orders from {uploaded_file.name}",
+                                user='user'
+                            )
+                            invalidate(REGION_SNAPSHOT)
+                            st.session_state.pop('import_dry_run_key', None)
+                            st.success(f"✅ יובאו בהצלחה {summary['added']:,} מתוך {summary['accepted']:,} הזמנות!")
                             st.balloons()
-                            
-                        except Exception as e:
-                            st.error(f"❌ שגיאה בייבוא: {str(e)}")
+                        for error in summary['errors']:
+                            st.error(f"❌ {error}")
         
         except Exception as e:
             st.error(f"❌ שגיאה בקריאת הקובץ: {str(e)}")
@@ -1513,42 +1634,50 @@ elif selected_tab == "📜 היסטוריית שינויים":
     
     st.markdown("---")
     
-    recent_changes = get_recent_changes(limit=50)
+    total_changes = count_changes()
     
-    if not recent_changes:
+    if not total_changes:
         st.info("📝 אין שינויים להצגה. השינויים יופיעו כאן לאחר עדכון נתונים.")
     else:
-        st.markdown(f"### 📋 {len(recent_changes)} שינויים אחרונים")
+        st.markdown(f"### 📋 {total_changes:,} שינויים")
         
         # Filter options
         filter_cols = st.columns(3)
         with filter_cols[0]:
             filter_action = st.selectbox(
                 "סוג פעולה:",
-                ["הכל"] + list(set([ch['action'] for ch in recent_changes])),
+                ["הכל"] + get_change_actions(),
                 key="change_filter_action"
             )
         with filter_cols[1]:
             filter_order = st.text_input("מספר הזמנה:", key="change_filter_order", placeholder="הזן מספר הזמנה")
         with filter_cols[2]:
-            limit_display = st.slider("מספר שורות:", 10, 50, 20, key="change_limit")
+            limit_display = st.selectbox("שורות בעמוד:", [10, 20, 50, 100], index=1, key="change_limit")
         
-        # Filter changes
-        filtered_changes = recent_changes[:limit_display]
-        if filter_action != "הכל":
-            filtered_changes = [ch for ch in filtered_changes if ch['action'] == filter_action]
-        if filter_order:
-            filtered_changes = [ch for ch in filtered_changes if filter_order.lower() in str(ch.get('order_id', '')).lower()]
+        query_filters = {
+            'action': None if filter_action == "הכל" else filter_action,
+            'order_id': filter_order.strip() or None,
+        }
+        matching = count_changes(**query_filters)
+        total_pages = max(1, -(-matching // limit_display))
+        page = st.number_input(
+            f"עמוד (מתוך {total_pages}):", min_value=1, max_value=total_pages, value=1, step=1, key="change_page"
+        ) if total_pages > 1 else 1
+        
+        filtered_changes = get_recent_changes(limit=limit_display, offset=(page - 1) * limit_display, **query_filters)
         
         # Display changes
         if filtered_changes:
+            st.caption(f"מציג {(page - 1) * limit_display + 1:,}-{(page - 1) * limit_display + len(filtered_changes):,} מתוך {matching:,}")
+            action_icons = {
+                'update_docket': '📄',
+                'batch_update_docket': '📦',
+                'add_order': '➕',
+                'bulk_import': '📥',
+                'delete_order': '🗑️',
+                'status_update': '🎯'
+            }
             for change in filtered_changes:
-                action_icons = {
-                    'update_docket': '📄',
-                    'batch_update_docket': '📦',
-                    'add_order': '➕',
-                    'delete_order': '🗑️'
-                }
                 icon = action_icons.get(change['action'], '📝')
                 
                 change_time = datetime.fromisoformat(change['timestamp']) if isinstance(change['timestamp'], str) else change['timestamp']
@@ -1568,18 +1697,19 @@ elif selected_tab == "📜 היסטוריית שינויים":
         else:
             st.info("לא נמצאו שינויים התואמים לסינון")
         
-        # Export changes
-        if recent_changes:
+        # Export changes (matching filter, built only on request)
+        if matching:
             st.markdown("---")
-            changes_df = pd.DataFrame(recent_changes)
-            changes_csv = changes_df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label="📥 הורד היסטוריית שינויים (CSV)",
-                data=changes_csv,
-                file_name=f"change_log_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                key="download_changes"
-            )
+            if st.button("📥 הכן קובץ היסטוריית שינויים (CSV)", key="prepare_changes_csv"):
+                changes_df = pd.DataFrame(get_recent_changes(limit=matching, **query_filters))
+                changes_csv = changes_df.to_csv(index=False).encode('utf-8-sig')
+                st.download_button(
+                    label="📥 הורד היסטוריית שינויים (CSV)",
+                    data=changes_csv,
+                    file_name=f"change_log_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                    key="download_changes"
+                )
 
 st.markdown("---")
 st.markdown(
@@ -1588,3 +1718,8 @@ st.markdown(
     "</div>",
     unsafe_allow_html=True
 )
+
+perf_run = finish_rerun()
+if perf_panel_enabled():
+    with st.sidebar:
+        render_perf_panel(perf_run, recent_runs('agents'), get_sheets_gateway().usage())
@@ -0,0 +1,179 @@
+"""
+Per-rerun performance instrumentation.
+A rerun (one execution of app.py or a page) opens a RerunMetrics on its
+script thread; stage() timers, lap() section marks and counters (API calls,
+rows, cache lookups / misses) accumulate into it, and finish_rerun() keeps it
+in a small in-process history and appends it as one JSON line to a rolling
+log file (PERF_LOG_PATH, default ./perf_log.jsonl).
+
+Outside a rerun (cron scripts, benchmarks) every call is a cheap no-op.
+No Streamlit import - the sidebar panel lives in utils.render_perf_panel.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+PERF_LOG_PATH = os.environ.get('PERF_LOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_log.jsonl'))
+PERF_LOG_MAX_BYTES = 1_000_000
+PERF_LOG_BACKUPS = 3
+RECENT_RUNS = 50
+
+class RerunMetrics:
+    """Timings and counters of one script rerun"""
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.perf_counter()
+        self.total_s = None
+        self.interrupted = False
+        self.stages = {}
+        self.laps = {}
+        self.counters = Counter()
+        self._lap = None
+
+    def add_stage(self, name, seconds, rows=None):
+        stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+        stage['seconds'] += seconds
+        stage['calls'] += 1
+        if rows:
+            stage['rows'] += int(rows)
+
+    def lap(self, name):
+        """Close the running section and start `name` (wall-clock sections of the page, e.g. one per tab)"""
+        now = time.perf_counter()
+        if self._lap is not None:
+            lap_name, lap_started = self._lap
+            self.laps[lap_name] = self.laps.get(lap_name, 0.0) + now - lap_started
+        self._lap = (name, now) if name else None
+
+    def finish(self, interrupted=False):
+        self.lap(None)
+        self.total_s = time.perf_counter() - self._started
+        self.interrupted = interrupted
+        return self
+
+    def as_dict(self):
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'total_s': self.total_s,
+            'interrupted': self.interrupted,
+            'stages': self.stages,
+            'laps': self.laps,
+            'counters': dict(self.counters),
+        }
+
+_local = threading.local()
+_recent = deque(maxlen=RECENT_RUNS)
+_recent_lock = threading.Lock()
+_logger = None
+
+def _perf_logger():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger('perf_metrics')
+        logger.propagate = False
+        if not logger.handlers:
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    PERF_LOG_PATH, maxBytes=PERF_LOG_MAX_BYTES, backupCount=PERF_LOG_BACKUPS, encoding='utf-8'
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger.addHandler(handler)
+            except OSError as e:
+                print(f"Perf log unavailable: {e}")
+                logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.INFO)
+        _logger = logger
+    return _logger
+
+def _record(run):
+    entry = run.as_dict()
+    with _recent_lock:
+        _recent.append(entry)
+    try:
+        _perf_logger().info(json.dumps(entry, ensure_ascii=False))
+    except Exception as e:
+        print(f"Perf log write failed: {e}")
+    return entry
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+def start_rerun(label):
+    """Begin measuring a rerun on this thread (an unfinished previous one - st.rerun / st.stop - is recorded as interrupted)"""
+    previous = current_run()
+    if previous is not None:
+        _record(previous.finish(interrupted=True))
+    _local.run = RerunMetrics(label)
+    return _local.run
+
+def finish_rerun():
+    """Close the current rerun, keep it in the history and the rolling log. Returns its dict (None if none open)."""
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    return _record(run.finish())
+
+@contextmanager
+def stage(name, rows=None):
+    """Time a block as stage `name` of the current rerun"""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_stage(name, time.perf_counter() - started, rows)
+
+def timed(name):
+    """Decorator: time every call as stage `name`; rows = len() of the first argument when it has one"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is None:
+                return fn(*args, **kwargs)
+            rows = len(args[0]) if args and hasattr(args[0], '__len__') and not isinstance(args[0], str) else None
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                run.add_stage(name, time.perf_counter() - started, rows)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """Bump a counter of the current rerun"""
+    run = current_run()
+    if run is not None:
+        run.counters[name] += n
+
+def lap(name):
+    run = current_run()
+    if run is not None:
+        run.lap(name)
+
+def cache_lookup(cache_name):
+    count(f"cache_lookups:{cache_name}")
+
+def cache_miss(cache_name):
+    """Call inside the cached function body - it only runs on a miss"""
+    count(f"cache_misses:{cache_name}")
+
+def recent_runs(label=None):
+    """Newest-last list of recorded reruns (optionally one page's)"""
+    with _recent_lock:
+        return [run for run in _recent if label is None or run['label'] == label]
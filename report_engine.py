@@ -0,0 +1,707 @@
+"""
+Shared report engine.
+One loader, one enrichment pipeline and the per-report builders used by both
+the Streamlit app and the scheduled scripts (daily_reminder.py,
+daily_sales_report.py, daily_new_orders_report.py, weekly_sales_report.py).
+
+This module does not import Streamlit, and gspread / resend are imported only
+when a sheet is actually fetched or an email is actually sent, so cron jobs
+start fast and get exactly the same numbers as the app.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import weakref
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from email_dispatch import EmailDispatcher, make_idempotency_key
+from fake_sheets import fake_sheets_enabled, get_fake_client
+from perf_metrics import stage
+from sheets_gateway import govern_client
+from email_templates import (
+    render_new_orders_report, render_daily_sales_report,
+    render_weekly_sales_report, render_daily_reminder_email
+)
+
+SHEET_NAME = "מערכת הזמנות - קוד יהודה  "
+WORKSHEET_INDEX = 0
+DEFAULT_EMAIL = "info@tiktik.co.il"
+OPERATIONS_EMAIL = "operations@tiktik.co.il"
+ISRAEL_TZ = pytz.timezone('Israel')
+
+POTENTIAL_PROFIT_RATE = 0.30
+
+COMMISSION_RATES = {
+    'tixstock': 0.03,
+}
+
+HEBREW_TO_ENGLISH_STATUS = {
+    '🔴 חדש': 'new',
+    'חדש': 'new',
+    '📦 הוזמן': 'orderd',
+    'הוזמן': 'orderd',
+    '✅ הושלם': 'done',
+    'הושלם': 'done',
+    '🟠 נשלח ולא שולם': 'sent - not paid',
+    'נשלח ולא שולם': 'sent - not paid',
+    '💚 נשלח ושולם': 'sent - paid',
+    'נשלח ושולם': 'sent - paid',
+}
+
+# Canonical order statuses (derived STATUS_KEY_COL - the sheet's 'orderd' column keeps its own text).
+# 'done!' is what the app writes to the sheet.
+STATUS_KEY_COL = 'status_key'
+STATUS_NEW = 'new'
+STATUS_ORDERED = 'orderd'
+STATUS_DONE = 'done'
+STATUS_DONE_MARKED = 'done!'
+STATUS_SENT_NOT_PAID = 'sent - not paid'
+STATUS_SENT_PAID = 'sent - paid'
+STATUS_EMPTY = ''
+
+STATUS_CATEGORIES = [
+    STATUS_NEW, STATUS_ORDERED, STATUS_DONE, STATUS_DONE_MARKED,
+    STATUS_SENT_NOT_PAID, STATUS_SENT_PAID, STATUS_EMPTY,
+]
+
+STATUS_ALIASES = {
+    **HEBREW_TO_ENGLISH_STATUS,
+    'ordered': STATUS_ORDERED,
+    'sent_not_paid': STATUS_SENT_NOT_PAID,
+    'sent-not-paid': STATUS_SENT_NOT_PAID,
+    'sent not paid': STATUS_SENT_NOT_PAID,
+    'sent unpaid': STATUS_SENT_NOT_PAID,
+    'sent_paid': STATUS_SENT_PAID,
+    'sent-paid': STATUS_SENT_PAID,
+    'sent paid': STATUS_SENT_PAID,
+}
+
+# Unpaid = status text containing any of these (lowercased) - also matches e.g. "sent - not paid (partial)"
+UNPAID_STATUS_MARKERS = ('sent_not_paid', 'sent - not paid', 'נשלח ולא שולם')
+
+# ---------------------------------------------------------------------------
+# Credentials / clients
+# ---------------------------------------------------------------------------
+
+def get_resend_credentials():
+    """Get Resend API credentials from environment variables or the Replit connector"""
+    api_key = os.environ.get('RESEND_API_KEY')
+    from_email = os.environ.get('RESEND_FROM_EMAIL')
+    if api_key and from_email:
+        return api_key, from_email
+
+    try:
+        import requests
+
+        hostname = os.environ.get('REPLIT_CONNECTORS_HOSTNAME')
+        x_replit_token = None
+
+        if os.environ.get('REPL_IDENTITY'):
+            x_replit_token = 'repl ' + os.environ.get('REPL_IDENTITY')
+        elif os.environ.get('WEB_REPL_RENEWAL'):
+            x_replit_token = 'depl ' + os.environ.get('WEB_REPL_RENEWAL')
+
+        if not x_replit_token or not hostname:
+            return None, None
+
+        response = requests.get(
+            f'https://{hostname}/api/v2/connection?include_secrets=true&connector_names=resend',
+            headers={
+                'Accept': 'application/json',
+                'X_REPLIT_TOKEN': x_replit_token
+            }
+        )
+        data = response.json()
+        connection = data.get('items', [{}])[0] if data.get('items') else {}
+        settings = connection.get('settings', {})
+
+        return settings.get('api_key'), settings.get('from_email')
+    except Exception as e:
+        print(f"Error getting Resend credentials: {e}")
+        return None, None
+
+def get_gspread_client(creds_json=None):
+    """Create and return an authenticated gspread client (GOOGLE_CREDENTIALS env by default)"""
+    if fake_sheets_enabled():
+        return govern_client(get_fake_client())
+
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = [
+        'https://spreadsheets.google.com/feeds',
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ]
+
+    if creds_json is None:
+        creds_json = os.environ.get("GOOGLE_CREDENTIALS")
+    if not creds_json:
+        raise ValueError("GOOGLE_CREDENTIALS not found in environment")
+
+    if isinstance(creds_json, str):
+        creds_dict = json.loads(creds_json)
+    else:
+        creds_dict = dict(creds_json)
+
+    if isinstance(creds_dict.get('private_key'), str) and '\\n' in creds_dict['private_key']:
+        creds_dict['private_key'] = creds_dict['private_key'].replace('\\n', '\n')
+
+    credentials = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    return govern_client(gspread.authorize(credentials))
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def values_to_dataframe(data):
+    """Convert get_all_values() output to a DataFrame with a 1-based sheet row_index"""
+    if len(data) < 2:
+        return pd.DataFrame()
+
+    headers = [str(h).strip() for h in data[0]]
+    df = pd.DataFrame(data[1:], columns=headers)
+    df['row_index'] = range(2, len(df) + 2)
+    return df
+
+def load_orders(client=None):
+    """Fetch the orders worksheet once and return it as a raw DataFrame"""
+    if client is None:
+        client = get_gspread_client()
+    worksheet = client.open(SHEET_NAME).get_worksheet(WORKSHEET_INDEX)
+    return values_to_dataframe(worksheet.get_all_values())
+
+def load_enriched_orders(client=None, rates=None):
+    """Fetch + enrich - the snapshot every report is built from"""
+    return enrich_orders(load_orders(client), rates=rates)
+
+# ---------------------------------------------------------------------------
+# Enrichment
+# ---------------------------------------------------------------------------
+
+_date_parse_cache = {}
+
+def parse_date_smart(date_str, event_name=None, date_hints=None):
+    """Smart date parser that handles multiple formats - OPTIMIZED with caching."""
+    if pd.isna(date_str) or date_str == '' or date_str is None:
+        return None
+
+    date_str = str(date_str).strip()
+
+    if date_str in _date_parse_cache:
+        return _date_parse_cache[date_str]
+
+    if date_hints and event_name and event_name in date_hints:
+        result = date_hints[event_name]
+        _date_parse_cache[date_str] = result
+        return result
+
+    formats = [
+        "%d/%m/%Y",
+        "%Y-%m-%d",
+        "%d/%m/%Y %H:%M",
+        "%m/%d/%Y",
+        "%d-%m-%Y",
+        "%Y-%m-%d %H:%M:%S",
+        "%m/%d/%Y %H:%M",
+        "%m/%d/%Y %H:%M:%S",
+        "%Y-%m-%d %H:%M",
+        "%d/%m/%Y %H:%M:%S",
+        "%d.%m.%Y",
+        "%d/%m/%y",
+        "%d-%m-%y",
+        "%Y/%m/%d",
+    ]
+
+    for fmt in formats:
+        try:
+            result = datetime.strptime(date_str, fmt)
+            _date_parse_cache[date_str] = result
+            return result
+        except ValueError:
+            continue
+
+    _date_parse_cache[date_str] = None
+    return None
+
+_exchange_rates_cache = None
+_exchange_rates_cache_time = None
+
+def fetch_exchange_rates():
+    """Fetch real-time exchange rates to EUR from free API"""
+    import urllib.request
+
+    try:
+        url = "https://api.exchangerate-api.com/v4/latest/EUR"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            data = json.loads(response.read().decode())
+            rates = data.get('rates', {})
+            gbp_to_eur = 1 / rates.get('GBP', 0.87) if rates.get('GBP') else 1.15
+            usd_to_eur = 1 / rates.get('USD', 1.08) if rates.get('USD') else 0.93
+            return {'GBP': gbp_to_eur, 'USD': usd_to_eur}
+    except Exception:
+        return {'GBP': 1.18, 'USD': 0.93}
+
+def get_cached_exchange_rates():
+    """Exchange rates cached in-process for one hour"""
+    global _exchange_rates_cache, _exchange_rates_cache_time
+    now = time.time()
+    if _exchange_rates_cache is None or _exchange_rates_cache_time is None or (now - _exchange_rates_cache_time) > 3600:
+        _exchange_rates_cache = fetch_exchange_rates()
+        _exchange_rates_cache_time = now
+    return _exchange_rates_cache
+
+def convert_to_euro(value, rates=None):
+    """המר כל מטבע לאירו עם שערים אמיתיים"""
+    if pd.isna(value) or value == '' or value is None:
+        return 0.0
+
+    if rates is None:
+        rates = get_cached_exchange_rates()
+
+    value_str = str(value).strip()
+    cleaned = re.sub(r'[^\d.\-]', '', value_str)
+    try:
+        amount = float(cleaned) if cleaned else 0.0
+    except ValueError:
+        return 0.0
+
+    if '€' in value_str:
+        return amount
+    elif '£' in value_str:
+        return amount * rates.get('GBP', 1.18)
+    elif '$' in value_str:
+        return amount * rates.get('USD', 0.93)
+    return amount
+
+def normalize_source(source_val):
+    """Normalize source name to lowercase for consistent grouping"""
+    if pd.isna(source_val) or source_val is None:
+        return ''
+    return str(source_val).strip().lower()
+
+def get_commission_rate(source_val):
+    """Get commission rate for a source (0 if no commission)"""
+    return COMMISSION_RATES.get(normalize_source(source_val), 0.0)
+
+def _parse_event_dates(df):
+    """parsed_date: pd.to_datetime first, event-name date hints for the rest"""
+    date_hints = {}
+    if 'event name' in df.columns:
+        event_date_df = df[['event name', 'Date of the event']].drop_duplicates(subset=['event name'])
+        event_date_dict = dict(zip(
+            event_date_df['event name'].astype(str).str.strip(),
+            event_date_df['Date of the event'].astype(str).str.strip()
+        ))
+        for event, date_val in event_date_dict.items():
+            if event and date_val:
+                parsed = parse_date_smart(date_val)
+                if parsed:
+                    date_hints[event] = parsed
+
+    dates_series = df['Date of the event'].astype(str).str.strip()
+    events_series = df.get('event name', pd.Series([''] * len(df), index=df.index)).astype(str).str.strip()
+
+    try:
+        parsed_dates = pd.to_datetime(dates_series, errors='coerce', infer_datetime_format=True)
+        missing_mask = parsed_dates.isna()
+        if missing_mask.any() and date_hints:
+            fill = events_series[missing_mask].map(date_hints)
+            fill = fill[fill.notna()]
+            if len(fill):
+                parsed_dates.loc[fill.index] = pd.to_datetime(fill)
+        return parsed_dates
+    except Exception:
+        return pd.Series([
+            parse_date_smart(dates_series.iloc[i], events_series.iloc[i], date_hints)
+            for i in range(len(df))
+        ], index=df.index)
+
+def parse_order_dates(series):
+    """Parse column A (order date): sheet format first, day-first fallback"""
+    parsed = pd.to_datetime(series, format='%m/%d/%Y %H:%M:%S', errors='coerce')
+    missing = parsed.isna()
+    if missing.any():
+        parsed.loc[missing] = pd.to_datetime(series[missing], dayfirst=True, errors='coerce')
+    return parsed
+
+def enrich_orders(df, rates=None):
+    """Add the derived columns every view and report relies on.
+
+    parsed_date, order_date_parsed, TOTAL_clean, SUPP_PRICE_clean, commission_rate,
+    commission_amount, revenue_net, profit, profit_before_commission, margin_pct,
+    the status column with Hebrew labels mapped to their English text, and its
+    canonical categorical key in STATUS_KEY_COL (with the status index).
+    """
+    if df.empty:
+        return df
+
+    df.columns = [str(col).strip() for col in df.columns]
+
+    if rates is None:
+        rates = get_cached_exchange_rates()
+
+    with stage('date_parsing', rows=len(df)):
+        if 'Date of the event' in df.columns:
+            df['parsed_date'] = _parse_event_dates(df)
+
+        if 'order date' in df.columns:
+            df['order_date_parsed'] = parse_order_dates(df['order date'])
+
+    with stage('currency_conversion', rows=len(df)):
+        to_euro = lambda value: convert_to_euro(value, rates)
+        df['TOTAL_clean'] = df['TOTAL'].map(to_euro) if 'TOTAL' in df.columns else 0.0
+        df['SUPP_PRICE_clean'] = df['SUPP PRICE'].map(to_euro) if 'SUPP PRICE' in df.columns else 0.0
+
+    if 'source' in df.columns:
+        df['commission_rate'] = df['source'].map(get_commission_rate)
+        df['commission_amount'] = df['TOTAL_clean'] * df['commission_rate']
+        df['revenue_net'] = df['TOTAL_clean'] - df['commission_amount']
+    else:
+        df['commission_rate'] = 0.0
+        df['commission_amount'] = 0.0
+        df['revenue_net'] = df['TOTAL_clean']
+
+    df['profit'] = df['revenue_net'] - df['SUPP_PRICE_clean']
+    df['profit_before_commission'] = df['TOTAL_clean'] - df['SUPP_PRICE_clean']
+    df['margin_pct'] = (df['profit'] / df['revenue_net'] * 100).fillna(0)
+    df.loc[df['revenue_net'] <= 0, 'margin_pct'] = 0
+
+    status_col = 'orderd' if 'orderd' in df.columns else ('Status' if 'Status' in df.columns else None)
+    if status_col:
+        with stage('status_normalize', rows=len(df)):
+            df[status_col] = display_statuses(df[status_col])
+            df[STATUS_KEY_COL] = canonicalize_statuses(df[status_col])
+            build_status_index(df)
+
+    return df
+
+# ---------------------------------------------------------------------------
+# Status enum + index
+# ---------------------------------------------------------------------------
+
+def canonical_status(value):
+    """Map any sheet spelling of a status (Hebrew labels, sent_not_paid, case/spaces) to its canonical value"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return STATUS_EMPTY
+    text = str(value).strip()
+    if text in STATUS_ALIASES:
+        return STATUS_ALIASES[text]
+    lowered = text.lower()
+    if lowered == 'nan':
+        return STATUS_EMPTY
+    return STATUS_ALIASES.get(lowered, lowered)
+
+def display_statuses(series):
+    """Status text as the pages show it: stripped, Hebrew labels replaced by their English text (case kept)"""
+    codes, uniques = pd.factorize(series.astype(str).str.strip(), use_na_sentinel=False)
+    mapped = np.array([HEBREW_TO_ENGLISH_STATUS.get(value, value) for value in uniques], dtype=object)
+    return pd.Series(mapped[codes], index=series.index, name=series.name)
+
+def canonicalize_statuses(series):
+    """Categorical status column - each distinct raw value is normalized once"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    canonical = [canonical_status(value) for value in uniques]
+    categories = STATUS_CATEGORIES + sorted(set(canonical) - set(STATUS_CATEGORIES))
+    unique_codes = pd.Index(categories).get_indexer(canonical)
+    values = pd.Categorical.from_codes(unique_codes[codes], categories=categories)
+    return pd.Series(values, index=series.index, name=series.name)
+
+# id(frame) -> (frame index, key column, {status: positions}); entries drop when the frame is collected.
+# Kept outside df.attrs because pandas deep-copies attrs into every derived frame.
+_status_indexes = {}
+
+def build_status_index(df, status_col=STATUS_KEY_COL):
+    """Prebuild {status: row positions} for this snapshot frame"""
+    if status_col not in df.columns:
+        return {}
+    positions = df.groupby(status_col, observed=True, sort=False).indices
+    key = id(df)
+    if key not in _status_indexes:
+        weakref.finalize(df, _status_indexes.pop, key, None)
+    _status_indexes[key] = (df.index, status_col, positions)
+    return positions
+
+def share_status_index(source, target):
+    """Register source's prebuilt index for `target`, a same-rows view of it (shallow copy) - no regroup"""
+    cached = _status_indexes.get(id(source))
+    if cached is None or not (target.index is cached[0] or target.index.equals(cached[0])):
+        return
+    key = id(target)
+    if key not in _status_indexes:
+        weakref.finalize(target, _status_indexes.pop, key, None)
+    _status_indexes[key] = (target.index, cached[1], cached[2])
+
+def status_positions(df, status_col=STATUS_KEY_COL):
+    """{status: positions} for this exact frame - rebuilt if it was filtered/reordered since indexing"""
+    cached = _status_indexes.get(id(df))
+    if cached and cached[1] == status_col and (cached[0] is df.index or cached[0].equals(df.index)):
+        return cached[2]
+    return build_status_index(df, status_col)
+
+def status_slice(df, *statuses, status_col='orderd'):
+    """Rows whose canonical status is one of `statuses` - via the prebuilt index of STATUS_KEY_COL,
+    or by canonicalizing status_col for frames that were not enriched"""
+    if df.empty:
+        return df.iloc[0:0]
+    wanted = list(dict.fromkeys(canonical_status(s) for s in statuses))
+    if STATUS_KEY_COL not in df.columns:
+        if status_col not in df.columns:
+            return df.iloc[0:0]
+        return df[canonicalize_statuses(df[status_col]).isin(wanted).to_numpy()]
+    positions = status_positions(df)
+    parts = [positions[s] for s in wanted if s in positions]
+    if not parts:
+        return df.iloc[0:0]
+    rows = parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+    return df.iloc[rows]
+
+# ---------------------------------------------------------------------------
+# Selections
+# ---------------------------------------------------------------------------
+
+def status_contains(series, markers):
+    """Boolean mask: lowercased status text contains any marker (each distinct value checked once)"""
+    codes, uniques = pd.factorize(series.fillna('').astype(str), use_na_sentinel=False)
+    hits = np.array([any(marker in value.strip().lower() for marker in markers) for value in uniques], dtype=bool)
+    return hits[codes]
+
+def select_new_orders(df):
+    """Orders in 'new' status (not yet purchased)"""
+    if df.empty or 'orderd' not in df.columns:
+        return pd.DataFrame()
+    return status_slice(df, STATUS_NEW).copy()
+
+def select_unpaid_orders(df):
+    """Orders sent but not paid, as record dicts with '_row_index'"""
+    if df.empty or 'orderd' not in df.columns:
+        return []
+    unpaid = df[status_contains(df['orderd'], UNPAID_STATUS_MARKERS)]
+    records = unpaid.to_dict('records')
+    for record, row_index in zip(records, unpaid['row_index'].tolist()):
+        record['_row_index'] = row_index
+    return records
+
+def select_orders_between(df, start_date, end_date):
+    """Orders whose order date (column A) falls within [start_date, end_date]"""
+    if df.empty or 'order_date_parsed' not in df.columns:
+        return pd.DataFrame()
+    order_dates = df['order_date_parsed'].dt.date
+    return df[(order_dates >= start_date) & (order_dates <= end_date)].copy()
+
+def current_week_bounds(today):
+    """Sunday..Saturday week containing `today`"""
+    start_of_week = today if today.weekday() == 6 else today - timedelta(days=today.weekday() + 1)
+    return start_of_week, start_of_week + timedelta(days=6)
+
+# ---------------------------------------------------------------------------
+# Report builders - each returns (subject, html)
+# ---------------------------------------------------------------------------
+
+def _qty_sum(series):
+    return pd.to_numeric(series, errors='coerce').sum()
+
+def _group_stats(orders_df, key, label, value_col=None):
+    """Per-key order count, ticket count and (optionally) TOTAL/SUPP sums"""
+    agg = {'Order number': 'count', 'Qty': _qty_sum}
+    columns = [label, 'orders', 'tickets']
+    if value_col:
+        agg['TOTAL_clean'] = 'sum'
+        columns.append(value_col)
+    stats = orders_df.groupby(key, observed=True).agg(agg).reset_index()
+    stats.columns = columns
+    return stats
+
+def _ensure_numeric_columns(orders_df):
+    for col in ('Order number', 'Qty'):
+        if col not in orders_df.columns:
+            orders_df = orders_df.assign(**{col: ''})
+    for col in ('TOTAL_clean', 'SUPP_PRICE_clean'):
+        if col not in orders_df.columns:
+            orders_df = orders_df.assign(**{col: 0.0})
+    return orders_df
+
+def summarize_profit(orders_df):
+    """Actual profit for orders with a supplier cost plus a 30% estimate for orders without one"""
+    has_cost = orders_df['SUPP_PRICE_clean'] > 0
+    with_cost = orders_df[has_cost]
+
+    if with_cost.empty:
+        actual_profit = 0
+    elif 'profit' in with_cost.columns:
+        actual_profit = with_cost['profit'].sum()
+    else:
+        actual_profit = with_cost['TOTAL_clean'].sum() - with_cost['SUPP_PRICE_clean'].sum()
+
+    potential_profit = orders_df.loc[~has_cost, 'TOTAL_clean'].sum() * POTENTIAL_PROFIT_RATE
+
+    return {
+        'actual_profit': actual_profit,
+        'potential_profit': potential_profit,
+        'total_profit': actual_profit + potential_profit,
+        'with_cost_revenue': with_cost['TOTAL_clean'].sum(),
+    }
+
+def build_new_orders_report(orders_df, now=None):
+    """Report of all orders in 'new' status (tickets still to purchase)"""
+    now = now or datetime.now(ISRAEL_TZ)
+    orders_df = _ensure_numeric_columns(orders_df)
+
+    total_tickets = int(_qty_sum(orders_df['Qty']))
+    total_amount = orders_df['TOTAL_clean'].sum()
+    num_orders = len(orders_df)
+
+    urgent_orders = 0
+    if 'parsed_date' in orders_df.columns:
+        today = datetime.now()
+        week_ahead = today + timedelta(days=7)
+        parsed = orders_df['parsed_date']
+        urgent_orders = int((parsed.notna() & (parsed <= week_ahead) & (parsed >= today)).sum())
+
+    source_records = []
+    if 'source' in orders_df.columns:
+        stats = _group_stats(orders_df, 'source', 'source')
+        source_records = stats.sort_values('tickets', ascending=False).head(5).to_dict('records')
+
+    top_event_records = []
+    if 'event name' in orders_df.columns:
+        stats = _group_stats(orders_df, 'event name', 'event', value_col='value')
+        top_event_records = stats.sort_values('value', ascending=False).head(3).to_dict('records')
+
+    summary = {
+        'num_orders': num_orders,
+        'total_tickets': total_tickets,
+        'total_amount': total_amount,
+        'unique_events': orders_df['event name'].nunique() if 'event name' in orders_df.columns else 0,
+        'unique_sources': orders_df['source'].nunique() if 'source' in orders_df.columns else 0,
+        'urgent_orders': urgent_orders,
+    }
+    html = render_new_orders_report(summary, orders_df.to_dict('records'), source_records, top_event_records, now)
+    subject = f"📊 דוח מנהלים | {num_orders} הזמנות | {total_tickets} כרטיסים | €{total_amount:,.0f}"
+    return subject, html
+
+def build_daily_sales_report(orders_df, report_date=None, now=None):
+    """Sales report for the orders placed on one day"""
+    now = now or datetime.now(ISRAEL_TZ)
+    orders_df = _ensure_numeric_columns(orders_df)
+    date_str = (report_date or now).strftime('%d.%m.%Y')
+
+    num_orders = len(orders_df)
+    total_tickets = int(_qty_sum(orders_df['Qty']))
+    total_revenue = orders_df['TOTAL_clean'].sum()
+    profit = summarize_profit(orders_df)
+
+    source_records = []
+    if 'source' in orders_df.columns:
+        stats = orders_df.groupby('source', observed=True).agg({
+            'Order number': 'count',
+            'Qty': _qty_sum,
+            'TOTAL_clean': 'sum',
+            'SUPP_PRICE_clean': 'sum'
+        }).reset_index()
+        stats.columns = ['source', 'orders', 'tickets', 'revenue', 'cost']
+        stats['profit'] = stats['revenue'] - stats['cost']
+        stats['margin'] = (stats['profit'] / stats['revenue'] * 100).fillna(0)
+        source_records = stats.sort_values('revenue', ascending=False).to_dict('records')
+
+    summary = {
+        'num_orders': num_orders,
+        'total_tickets': total_tickets,
+        'total_revenue': total_revenue,
+        'total_profit': profit['total_profit'],
+        'potential_profit': profit['potential_profit'],
+        'profit_margin': (profit['total_profit'] / total_revenue * 100) if total_revenue > 0 else 0,
+    }
+    html = render_daily_sales_report(summary, source_records, date_str, now)
+    subject = f"Daily Report {date_str} | {num_orders} Orders | EUR {total_revenue:,.0f} | Profit EUR {profit['total_profit']:,.0f}"
+    return subject, html
+
+def build_weekly_sales_report(orders_df, week_start_date=None, week_end_date=None, now=None):
+    """Sales summary for one week of orders"""
+    now = now or datetime.now(ISRAEL_TZ)
+    orders_df = _ensure_numeric_columns(orders_df)
+
+    if week_start_date and week_end_date:
+        week_start = week_start_date.strftime('%d/%m/%Y')
+        week_end = week_end_date.strftime('%d/%m/%Y')
+        days_in_week = (week_end_date - week_start_date).days + 1
+    else:
+        week_start = (now - timedelta(days=7)).strftime('%d/%m/%Y')
+        week_end = now.strftime('%d/%m/%Y')
+        days_in_week = 7
+
+    num_orders = len(orders_df)
+    total_tickets = int(_qty_sum(orders_df['Qty']))
+    total_revenue = orders_df['TOTAL_clean'].sum()
+    profit = summarize_profit(orders_df)
+
+    estimated = profit['potential_profit'] > profit['actual_profit']
+    if estimated:
+        profit_margin = POTENTIAL_PROFIT_RATE * 100
+    elif profit['with_cost_revenue'] > 0:
+        profit_margin = profit['actual_profit'] / profit['with_cost_revenue'] * 100
+    else:
+        profit_margin = 0
+
+    source_records = []
+    if 'source' in orders_df.columns:
+        stats = _group_stats(orders_df, 'source', 'source', value_col='revenue')
+        source_records = stats.sort_values('revenue', ascending=False).head(4).to_dict('records')
+
+    top_event_records = []
+    if 'event name' in orders_df.columns:
+        stats = _group_stats(orders_df, 'event name', 'event', value_col='revenue')
+        top_event_records = stats.sort_values('revenue', ascending=False).head(4).to_dict('records')
+
+    summary = {
+        'num_orders': num_orders,
+        'total_tickets': total_tickets,
+        'total_revenue': total_revenue,
+        'total_profit': profit['total_profit'],
+        'profit_label': "רווח פוטנציאלי (30%)" if estimated else "רווח",
+        'profit_margin': profit_margin,
+        'unique_events': orders_df['event name'].nunique() if 'event name' in orders_df.columns else 0,
+        'unique_sources': orders_df['source'].nunique() if 'source' in orders_df.columns else 0,
+        'days_in_week': days_in_week,
+    }
+    html = render_weekly_sales_report(summary, source_records, top_event_records, week_start, week_end, now)
+    subject = f"📊 שבועי {week_start}-{week_end} | {num_orders} הזמנות | €{total_revenue:,.0f} | רווח €{profit['total_profit']:,.0f}"
+    return subject, html
+
+def build_daily_reminder(orders, mark_paid_url_fn=None, now=None):
+    """Unpaid-orders reminder with optional 'mark as paid' links"""
+    now = now or datetime.now(ISRAEL_TZ)
+    html, total_amount = render_daily_reminder_email(orders, now, mark_paid_url_fn)
+    subject = f"🔴 תזכורת יומית - {len(orders)} הזמנות לא שולמו! (€{total_amount:,.2f})"
+    return subject, html
+
+# ---------------------------------------------------------------------------
+# Sending
+# ---------------------------------------------------------------------------
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher():
+    """Process-wide email dispatcher (credentials resolved once, thread-pool sends)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = EmailDispatcher(get_resend_credentials)
+    return _dispatcher
+
+def report_idempotency_key(report_name, to_email, subject):
+    """Same report, same day, same recipient and same numbers (subject) -> sent once"""
+    today = datetime.now(ISRAEL_TZ).strftime('%Y-%m-%d')
+    return make_idempotency_key(report_name, today, to_email, subject)
+
+def send_email(to_email, subject, html, attachments=None, idempotency_key=None):
+    """Send one email through Resend with retries. Returns (success, email id or error message)."""
+    return get_dispatcher().send(to_email, subject, html, attachments, idempotency_key)
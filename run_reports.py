@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Batch report runner.
+Fetches and enriches the orders sheet ONCE, then runs every requested report
+against that snapshot in parallel threads (rendering + sending).
+
+Usage:
+    python run_reports.py daily_reminder daily_sales_report
+    python run_reports.py all
+"""
+
+import sys
+import time
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from report_engine import ISRAEL_TZ, load_enriched_orders
+
+REPORTS = {
+    'daily_reminder': 'daily_reminder',
+    'daily_sales_report': 'daily_sales_report',
+    'daily_new_orders_report': 'daily_new_orders_report',
+    'weekly_sales_report': 'weekly_sales_report',
+}
+
+def _run_one(name, module, snapshot):
+    """Run a single report's main() against the shared snapshot"""
+    try:
+        return bool(module.main(snapshot))
+    except Exception as e:
+        print(f"Report {name} failed: {e}")
+        return False
+
+def run_reports(report_names, snapshot=None):
+    """Run the given reports from one sheet fetch. Returns {report name: success}"""
+    unknown = [name for name in report_names if name not in REPORTS]
+    if unknown:
+        raise ValueError(f"Unknown reports: {', '.join(unknown)}")
+    if not report_names:
+        return {}
+
+    # Import up front so the worker threads don't race on module imports
+    modules = {name: importlib.import_module(REPORTS[name]) for name in report_names}
+
+    if snapshot is None:
+        start = time.time()
+        try:
+            snapshot = load_enriched_orders()
+        except Exception as e:
+            print(f"Error loading orders: {e}")
+            return {name: False for name in report_names}
+        print(f"Loaded {len(snapshot)} rows in {time.time() - start:.1f}s")
+
+    with ThreadPoolExecutor(max_workers=len(report_names)) as executor:
+        futures = {name: executor.submit(_run_one, name, modules[name], snapshot) for name in report_names}
+        return {name: future.result() for name, future in futures.items()}
+
+def main(argv=None):
+    """Entry point for cron / GitHub Actions"""
+    names = list(sys.argv[1:] if argv is None else argv)
+    if not names or names == ['all']:
+        names = list(REPORTS)
+
+    print(f"Report batch {', '.join(names)} - {datetime.now(ISRAEL_TZ).strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+    results = run_reports(names)
+    for name, success in results.items():
+        print(f"  {'✅' if success else '❌'} {name}")
+
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
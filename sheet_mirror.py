@@ -0,0 +1,284 @@
+"""
+Optional local SQLite mirror of the orders sheet.
+The snapshot loaders (app.py / pages/agents.py) push every fresh sheet load
+here; the mirror is rebuilt only when the raw sheet content changed. Typed
+columns and indexes on the lookup fields let filter / aggregate paths run
+indexed SQL, a trigram full-text index (SQLite FTS5, when available) serves
+substring search, and the file survives restarts.
+
+Enabled by setting ORDERS_MIRROR_DB (a file path, or "1" for ./orders_mirror.db).
+No Streamlit import.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import report_engine
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'orders_mirror.db')
+
+# Columns the app derives on load - not part of the raw sheet content
+DERIVED_COLUMNS = {
+    'parsed_date', 'order_date_parsed', 'TOTAL_clean', 'SUPP_PRICE_clean', 'commission_rate',
+    'commission_amount', 'revenue_net', 'profit', 'profit_before_commission', 'margin_pct',
+    'has_supplier_data', 'has_supplier', 'status_key',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS orders (
+    row_index INTEGER PRIMARY KEY,
+    order_number TEXT COLLATE NOCASE,
+    docket_number TEXT COLLATE NOCASE,
+    supp_order_number TEXT COLLATE NOCASE,
+    event_name TEXT COLLATE NOCASE,
+    source TEXT,
+    status TEXT,
+    supplier_name TEXT,
+    parsed_date TEXT,
+    order_date TEXT,
+    qty INTEGER,
+    total_eur REAL,
+    supp_price_eur REAL,
+    profit REAL,
+    has_supplier_data INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_orders_order_number ON orders(order_number);
+CREATE INDEX IF NOT EXISTS idx_orders_docket_number ON orders(docket_number);
+CREATE INDEX IF NOT EXISTS idx_orders_supp_order_number ON orders(supp_order_number);
+CREATE INDEX IF NOT EXISTS idx_orders_event_name ON orders(event_name);
+CREATE INDEX IF NOT EXISTS idx_orders_parsed_date ON orders(parsed_date);
+CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+"""
+
+_ORDER_FIELDS = [
+    'row_index', 'order_number', 'docket_number', 'supp_order_number', 'event_name', 'source', 'status',
+    'supplier_name', 'parsed_date', 'order_date', 'qty', 'total_eur', 'supp_price_eur', 'profit',
+    'has_supplier_data',
+]
+
+SEARCH_FIELDS = ('order_number', 'docket_number', 'supp_order_number')
+# Fields in the trigram search index - every field the pages search
+INDEXED_SEARCH_FIELDS = ('order_number', 'docket_number', 'supp_order_number', 'event_name')
+# Shortest term the trigram index can serve
+MIN_TRIGRAM_TERM = 3
+
+_SEARCH_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS orders_search USING fts5({', '.join(INDEXED_SEARCH_FIELDS)}, tokenize='trigram')"
+)
+
+def raw_content_version(df):
+    """Hash of the raw sheet columns of a frame as values_to_dataframe() builds it.
+    Enriched frames rewrite the status column - hash the raw frame before enrich_orders() and pass the version to sync()."""
+    raw_cols = [col for col in df.columns if col not in DERIVED_COLUMNS]
+    hashed = pd.util.hash_pandas_object(df[raw_cols].astype(str), index=False)
+    return f"{len(df)}:{int(hashed.sum()) & 0xFFFFFFFFFFFFFFF:x}"
+
+def _text_column(df, *names):
+    for name in names:
+        if name in df.columns:
+            return df[name].astype(object).where(df[name].notna(), '').astype(str).str.strip()
+    return pd.Series('', index=df.index)
+
+def _iso(series):
+    return series.dt.strftime('%Y-%m-%d %H:%M:%S').where(series.notna(), None)
+
+def mirror_rows(df):
+    """Typed mirror rows from a raw or enriched snapshot (derived fields computed when missing)"""
+    supp_order_col = next((c for c in df.columns if 'supp' in c.lower() and 'order' in c.lower()), None)
+
+    parsed_date = df['parsed_date'] if 'parsed_date' in df.columns else (
+        report_engine._parse_event_dates(df) if 'Date of the event' in df.columns else pd.Series(pd.NaT, index=df.index)
+    )
+    order_date = df['order_date_parsed'] if 'order_date_parsed' in df.columns else (
+        report_engine.parse_order_dates(df['order date']) if 'order date' in df.columns else pd.Series(pd.NaT, index=df.index)
+    )
+
+    rates = None
+    def money(clean_col, raw_col):
+        nonlocal rates
+        if clean_col in df.columns:
+            return pd.to_numeric(df[clean_col], errors='coerce').fillna(0.0)
+        if raw_col not in df.columns:
+            return pd.Series(0.0, index=df.index)
+        if rates is None:
+            rates = report_engine.get_cached_exchange_rates()
+        return df[raw_col].map(lambda value: report_engine.convert_to_euro(value, rates)).astype(float)
+
+    total_eur = money('TOTAL_clean', 'TOTAL')
+    supp_price_eur = money('SUPP_PRICE_clean', 'SUPP PRICE')
+    supplier_name = _text_column(df, 'Supplier NAME')
+    supp_order = _text_column(df, supp_order_col) if supp_order_col else pd.Series('', index=df.index)
+    if 'has_supplier_data' in df.columns:
+        has_supplier = df['has_supplier_data'].fillna(False).astype(bool)
+    else:
+        has_supplier = (supp_price_eur > 0) | (supplier_name != '') | (supp_order != '')
+    status = report_engine.canonicalize_statuses(df['orderd']).astype(str) if 'orderd' in df.columns else pd.Series('', index=df.index)
+
+    frame = pd.DataFrame({
+        'row_index': pd.to_numeric(df['row_index'], errors='coerce'),
+        'order_number': _text_column(df, 'Order number'),
+        'docket_number': _text_column(df, 'docket number'),
+        'supp_order_number': supp_order,
+        'event_name': _text_column(df, 'event name'),
+        'source': _text_column(df, 'source'),
+        'status': status,
+        'supplier_name': supplier_name,
+        'parsed_date': _iso(pd.to_datetime(parsed_date, errors='coerce')),
+        'order_date': _iso(pd.to_datetime(order_date, errors='coerce')),
+        'qty': pd.to_numeric(_text_column(df, 'Qty'), errors='coerce').round().astype('Int64'),
+        'total_eur': total_eur,
+        'supp_price_eur': supp_price_eur,
+        'profit': pd.to_numeric(df['profit'], errors='coerce') if 'profit' in df.columns else total_eur - supp_price_eur,
+        'has_supplier_data': has_supplier.astype(int),
+    })
+    frame = frame[frame['row_index'].notna()].astype({'row_index': int})
+    return frame.astype(object).where(frame.notna(), None)[_ORDER_FIELDS].itertuples(index=False, name=None)
+
+class OrdersMirror:
+    """SQLite read-replica of the orders sheet"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            created = not self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'orders_search'").fetchone()
+            self._conn.execute(_SEARCH_SCHEMA)
+            self._trigram = True
+            if created:
+                # Mirror file from before the search index - fill it on the next sync
+                self._conn.execute("DELETE FROM mirror_meta WHERE key = 'version'")
+        except sqlite3.OperationalError:
+            # SQLite without FTS5 / the trigram tokenizer (< 3.34) - search scans the orders table
+            self._trigram = False
+
+    def _meta(self, key):
+        row = self._conn.execute("SELECT value FROM mirror_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._meta('version')
+
+    @property
+    def synced_at(self):
+        with self._lock:
+            return self._meta('synced_at')
+
+    def sync(self, df, version=None):
+        """Replace the mirror with this snapshot unless the raw content is unchanged. Returns True if rebuilt.
+        `version` is raw_content_version() of the raw frame - computed here when not given (raw frames only)."""
+        if df is None or df.empty or 'row_index' not in df.columns:
+            return False
+        version = version or raw_content_version(df)
+        with self._lock:
+            if self._meta('version') == version:
+                return False
+            rows = mirror_rows(df)
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute("DELETE FROM orders")
+                self._conn.executemany(
+                    f"INSERT INTO orders ({', '.join(_ORDER_FIELDS)}) VALUES ({', '.join('?' * len(_ORDER_FIELDS))})",
+                    rows
+                )
+                if self._trigram:
+                    fields = ', '.join(INDEXED_SEARCH_FIELDS)
+                    self._conn.execute("DELETE FROM orders_search")
+                    self._conn.execute(f"INSERT INTO orders_search (rowid, {fields}) SELECT row_index, {fields} FROM orders")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO mirror_meta (key, value) VALUES (?, ?)",
+                    [('version', version), ('synced_at', datetime.now().isoformat(timespec='seconds'))]
+                )
+        return True
+
+    def invalidate(self):
+        """Forget the synced version so the next snapshot load rebuilds the mirror"""
+        with self._lock:
+            self._conn.execute("DELETE FROM mirror_meta WHERE key = 'version'")
+
+    def search(self, term, fields=SEARCH_FIELDS, limit=500):
+        """[(row_index, field)] for orders whose fields contain term (case-insensitive), each row once with
+        the first field that matched. Served by the trigram index when possible, else a scan of the orders table."""
+        term = str(term).strip()
+        if not term:
+            return []
+        indexed = (
+            self._trigram and len(term) >= MIN_TRIGRAM_TERM and not any(c in term for c in '%_\\')
+            and all(field in INDEXED_SEARCH_FIELDS for field in fields)
+        )
+        if indexed:
+            # The trigram index only serves LIKE without an ESCAPE clause
+            table, rowid, match, pattern = 'orders_search', 'rowid', 'LIKE ?', f"%{term}%"
+        else:
+            escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            table, rowid, match, pattern = 'orders', 'row_index', "LIKE ? ESCAPE '\\'", f"%{escaped}%"
+        union = " UNION ALL ".join(
+            f"SELECT {rowid} AS row_index, '{field}' AS field, {rank} AS rank FROM {table} WHERE {field} {match}"
+            for rank, field in enumerate(fields)
+        )
+        sql = f"SELECT row_index, field FROM ({union}) GROUP BY row_index ORDER BY MIN(rank), row_index LIMIT ?"
+        with self._lock:
+            return self._conn.execute(sql, [pattern] * len(fields) + [limit]).fetchall()
+
+    def query(self, sql, params=()):
+        """Run a read-only SQL query against the mirror, as a DataFrame"""
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def event_summary(self, start=None, end=None):
+        """Per-event order count, tickets, revenue and profit (EUR), optionally for an event-date range"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("parsed_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            clauses.append("parsed_date < ?")
+            params.append(str(end))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return self.query(
+            "SELECT event_name, MIN(parsed_date) AS event_date, COUNT(*) AS orders, SUM(qty) AS tickets, "
+            f"SUM(total_eur) AS revenue_eur, SUM(profit) AS profit_eur FROM orders{where} "
+            "GROUP BY event_name ORDER BY event_date",
+            params
+        )
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+def get_orders_mirror():
+    """The process-wide mirror, or None when ORDERS_MIRROR_DB is not set"""
+    global _mirror
+    setting = os.environ.get('ORDERS_MIRROR_DB', '').strip()
+    if not setting:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = OrdersMirror(DEFAULT_MIRROR_PATH if setting == '1' else setting)
+        return _mirror
+
+def sync_orders_mirror(df, version=None):
+    """Push a fresh snapshot to the mirror (no-op when disabled; never breaks the load)"""
+    mirror = get_orders_mirror()
+    if mirror is None:
+        return False
+    try:
+        return mirror.sync(df, version)
+    except Exception as e:
+        print(f"Orders mirror sync failed: {e}")
+        return False
+
+def invalidate_orders_mirror():
+    """Cache-region hook: force a rebuild on the next sync (no-op when disabled)"""
+    mirror = get_orders_mirror()
+    if mirror is not None:
+        mirror.invalidate()
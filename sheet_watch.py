@@ -0,0 +1,89 @@
+"""
+Sheet change detection.
+Polls the spreadsheet's Drive metadata (modifiedTime + version - one tiny
+request, throttled and shared by every session of the process) and tells the
+cached snapshot loaders when the sheet really changed, so quiet periods cost
+no full refetch and real edits show up on the next rerun.
+
+No Streamlit import.
+"""
+
+import threading
+import time
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{}"
+POLL_INTERVAL_SECONDS = 15
+# Without a usable change token (metadata call failing) fall back to the old TTL behaviour
+FALLBACK_MAX_AGE_SECONDS = 600
+
+class SheetChangeWatcher:
+    """Throttled Drive modifiedTime/version poller with per-cache 'loaded at token' bookkeeping"""
+
+    def __init__(self, client_fn, sheet_name, poll_interval=POLL_INTERVAL_SECONDS):
+        self._client_fn = client_fn
+        self.sheet_name = sheet_name
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._client = None
+        self._spreadsheet_id = None
+        self._token = None
+        self._polled_at = 0.0
+        self._loaded = {}
+
+    def _fetch_token(self):
+        if self._client is None:
+            self._client = self._client_fn()
+        if self._spreadsheet_id is None:
+            self._spreadsheet_id = self._client.open(self.sheet_name).id
+        response = self._client.http_client.request(
+            'get',
+            DRIVE_FILES_URL.format(self._spreadsheet_id),
+            params={'fields': 'modifiedTime,version', 'supportsAllDrives': True}
+        )
+        metadata = response.json()
+        return f"{metadata.get('version', '')}:{metadata.get('modifiedTime', '')}"
+
+    def current_token(self, force=False):
+        """Latest change token, polled at most once per poll_interval (None when unavailable)"""
+        with self._lock:
+            if not force and time.time() - self._polled_at < self.poll_interval:
+                return self._token
+            try:
+                self._token = self._fetch_token()
+            except Exception as e:
+                print(f"Sheet change check failed: {e}")
+                self._client = None
+                self._token = None
+            self._polled_at = time.time()
+            return self._token
+
+    def load_token(self):
+        """Fresh change token for a loader to take before it fetches (edits made during the fetch then still count)"""
+        return self.current_token(force=True)
+
+    def mark_loaded(self, consumer, token):
+        """Record that `consumer` loaded the sheet at `token` (from load_token()) - call once the fetch succeeded"""
+        with self._lock:
+            self._loaded[consumer] = (token, time.time())
+
+    def needs_reload(self, consumer, max_age=FALLBACK_MAX_AGE_SECONDS):
+        """True when the sheet changed since `consumer` last loaded it"""
+        with self._lock:
+            loaded = self._loaded.get(consumer)
+        if loaded is None:
+            return False
+        loaded_token, loaded_at = loaded
+        token = self.current_token()
+        if token is None or loaded_token is None:
+            return time.time() - loaded_at > max_age
+        return token != loaded_token
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+def get_sheet_watcher(client_fn, sheet_name):
+    """Process-wide watcher per spreadsheet name"""
+    with _watchers_lock:
+        if sheet_name not in _watchers:
+            _watchers[sheet_name] = SheetChangeWatcher(client_fn, sheet_name)
+        return _watchers[sheet_name]
@@ -0,0 +1,240 @@
+"""
+Google Sheets API gateway.
+Every request a gspread client makes (app, agents page, report scripts,
+sheet_watch) goes through one process-wide gateway installed by
+govern_client(): token buckets keep reads and writes under the Sheets
+per-minute quotas, 429 / 503 answers are retried with exponential backoff and
+jitter, and every call is counted per user and per feature (the app function
+that issued it, or an explicit api_feature() block).
+
+    SHEETS_READ_QUOTA=60     read requests per minute (Sheets per-user quota)
+    SHEETS_WRITE_QUOTA=60    write requests per minute
+    SHEETS_MAX_RETRIES=5     retries of a throttled / unavailable request
+
+No Streamlit import - pages set the user with set_api_user() each rerun.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from perf_metrics import count
+
+DEFAULT_QUOTA_PER_MINUTE = 60
+RETRY_STATUS_CODES = (429, 503)
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+# Longest a caller waits for a token before sending anyway (the retry loop handles the 429)
+MAX_THROTTLE_WAIT_SECONDS = 90.0
+DEFAULT_USER = 'system'
+# Frames of these modules are skipped when naming the feature behind a call
+_LIBRARY_MODULES = (
+    'gspread', 'requests', 'urllib3', 'google', 'oauth2client', 'httplib2',
+    'sheets_gateway', 'fake_sheets', 'perf_metrics', 'contextlib', 'functools', 'streamlit',
+)
+
+class TokenBucket:
+    """Per-minute quota as a token bucket: `burst` tokens up front, refilled so no 60s window exceeds the quota"""
+
+    def __init__(self, per_minute, burst=None):
+        self.per_minute = per_minute
+        self.capacity = burst or max(1, per_minute // 6)
+        self.rate = max(per_minute - self.capacity, 1) / 60.0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait=MAX_THROTTLE_WAIT_SECONDS):
+        """Take one token, sleeping until one is available. Returns the seconds waited."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1 or now - started >= max_wait:
+                    self._tokens -= 1
+                    return now - started
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(min(wait, max(max_wait - (now - started), 0.01)))
+
+    def drain(self):
+        """Empty the bucket - after a 429 the quota is spent, whoever spent it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+
+_context = threading.local()
+
+def set_api_user(user):
+    """Attribute this thread's following calls to `user` (each rerun sets its session's user)"""
+    _context.user = user or DEFAULT_USER
+
+@contextmanager
+def api_feature(name):
+    """Count the calls made inside the block as feature `name` instead of the calling function"""
+    previous = getattr(_context, 'feature', None)
+    _context.feature = name
+    try:
+        yield
+    finally:
+        _context.feature = previous
+
+def _calling_feature():
+    """Explicit api_feature(), else the innermost non-library function on the stack"""
+    feature = getattr(_context, 'feature', None)
+    if feature:
+        return feature
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(_LIBRARY_MODULES):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return 'unknown'
+
+def _error_code(error):
+    code = getattr(error, 'code', None)
+    if code is None:
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return code
+
+def _retry_after(error):
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def classify_request(method, endpoint=''):
+    """(kind, idempotent) of an HTTP request - kind is 'read', 'write' or 'drive' (own, much larger quota)"""
+    method = method.lower()
+    if 'googleapis.com/drive' in endpoint:
+        return 'drive', method == 'get'
+    if method == 'get':
+        return 'read', True
+    # values:append and spreadsheets:batchUpdate (row deletes) must not run twice
+    return 'write', method == 'put' or endpoint.endswith(('values:batchUpdate', ':clear', 'values:batchClear'))
+
+def classify_fake_call(name):
+    """(kind, idempotent) of a fake_sheets backend call name"""
+    if name.startswith('drive.'):
+        return 'drive', True
+    if name in ('values.get', 'spreadsheets.get'):
+        return 'read', True
+    return 'write', name in ('values.update', 'values.batchUpdate', 'values.clear')
+
+class SheetsGateway:
+    """Quota buckets, retry policy and call accounting shared by every client of the process"""
+
+    def __init__(self, read_quota=DEFAULT_QUOTA_PER_MINUTE, write_quota=DEFAULT_QUOTA_PER_MINUTE, max_retries=5):
+        self.buckets = {'read': TokenBucket(read_quota), 'write': TokenBucket(write_quota)}
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.retries = Counter()
+        self.failures = Counter()
+        self.wait_seconds = Counter()
+
+    def _backoff(self, attempt, error):
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) + random.uniform(0, 1)
+        return delay
+
+    def execute(self, kind, idempotent, fn, *args, **kwargs):
+        """Run one API request: wait for quota, retry 429 (and 503 when safe to repeat), count it"""
+        key = (getattr(_context, 'user', DEFAULT_USER), _calling_feature(), kind)
+        bucket = self.buckets.get(kind)
+        attempt = 0
+        while True:
+            waited = bucket.acquire() if bucket else 0.0
+            with self._lock:
+                self.calls[key] += 1
+                self.wait_seconds[key] += waited
+            count('api_calls')
+            if waited >= 0.001:
+                count('api_wait_ms', int(waited * 1000))
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                code = _error_code(e)
+                retryable = code == 429 or (code in RETRY_STATUS_CODES and idempotent)
+                if not retryable or attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures[key] += 1
+                    raise
+                if code == 429 and bucket:
+                    bucket.drain()
+                delay = self._backoff(attempt, e)
+                print(f"Sheets API {code} on {key[1]} ({kind}) - retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                with self._lock:
+                    self.retries[key] += 1
+                count('api_retries')
+                time.sleep(delay)
+                attempt += 1
+
+    def usage(self):
+        """[{user, feature, kind, calls, retries, failures, wait_s}] since the process started, busiest first"""
+        with self._lock:
+            rows = [
+                {
+                    'user': user, 'feature': feature, 'kind': kind, 'calls': calls,
+                    'retries': self.retries[(user, feature, kind)],
+                    'failures': self.failures[(user, feature, kind)],
+                    'wait_s': round(self.wait_seconds[(user, feature, kind)], 2),
+                }
+                for (user, feature, kind), calls in self.calls.items()
+            ]
+        return sorted(rows, key=lambda row: row['calls'], reverse=True)
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_sheets_gateway():
+    """Process-wide gateway (quotas are per service account, so every session shares the buckets)"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = SheetsGateway(
+                read_quota=_env_int('SHEETS_READ_QUOTA', DEFAULT_QUOTA_PER_MINUTE),
+                write_quota=_env_int('SHEETS_WRITE_QUOTA', DEFAULT_QUOTA_PER_MINUTE),
+                max_retries=_env_int('SHEETS_MAX_RETRIES', 5),
+            )
+        return _gateway
+
+def govern_client(client):
+    """Route every request of a gspread (or fake_sheets) client through the gateway. Returns the client."""
+    gateway = get_sheets_gateway()
+    backend = getattr(client, 'backend', None)
+    if backend is not None and hasattr(backend, 'api_call'):
+        # fake_sheets: one shared backend, every worksheet call starts with backend.api_call(name)
+        if not getattr(backend, '_governed', False):
+            api_call = backend.api_call
+            backend.api_call = lambda name: gateway.execute(*classify_fake_call(name), api_call, name)
+            backend._governed = True
+        return client
+    http_client = getattr(client, 'http_client', None)
+    if http_client is None or getattr(http_client, '_governed', False):
+        return client
+    request = http_client.request
+
+    def governed_request(method, endpoint, *args, **kwargs):
+        return gateway.execute(*classify_request(method, endpoint), request, method, endpoint, *args, **kwargs)
+
+    http_client.request = governed_request
+    http_client._governed = True
+    return client
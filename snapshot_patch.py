@@ -0,0 +1,128 @@
+"""
+Optimistic write-through patches for the cached sheet snapshot.
+After a confirmed Sheets write, the new cell values are recorded here and
+layered onto a view of the cached frame - derived columns (status key,
+has_supplier_data, EUR prices, profit...) recomputed for just those rows - so
+the UI shows the change instantly without a refetch. The patched frame is
+built once per patch version and shared like the snapshot itself. Patches are
+dropped whenever the snapshot itself is refetched (the sheet then has them).
+
+No Streamlit import.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+import report_engine
+from frame_schema import snapshot_view
+
+class SnapshotPatches:
+    """Row overrides {row_index: {column: value}} on top of one cached snapshot"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+        # (snapshot, version, patched frame) - the last built patched frame
+        self._view = None
+        self.version = 0
+
+    def patch(self, row_indices, values):
+        """Record confirmed cell values for these sheet rows and bump the version"""
+        values = {col: value for col, value in values.items() if value is not None}
+        if not values:
+            return self.version
+        with self._lock:
+            for row_index in row_indices:
+                self._rows.setdefault(int(row_index), {}).update(values)
+            self._view = None
+            self.version += 1
+            return self.version
+
+    def clear(self):
+        """Forget every patch (the snapshot was refetched)"""
+        with self._lock:
+            self._rows = {}
+            self._view = None
+            self.version += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def apply(self, snapshot, enrich_fn=None):
+        """A caller's snapshot_view() of the shared snapshot with the patches layered on (snapshot is not modified).
+        The patched frame - enrich_fn(rows_df) recomputing derived columns of the patched rows, the status
+        index - is built once per snapshot and patch version; later calls only take a new view of it."""
+        with self._lock:
+            rows = dict(self._rows)
+            version = self.version
+            cached = self._view
+        if not rows or snapshot.empty or 'row_index' not in snapshot.columns:
+            return snapshot_view(snapshot)
+        if cached is not None and cached[0] is snapshot and cached[1] == version:
+            return snapshot_view(cached[2])
+
+        df = snapshot_view(snapshot)
+        mask = df['row_index'].isin(list(rows)).to_numpy()
+        if mask.any():
+            self._layer(df, mask, rows, enrich_fn)
+        with self._lock:
+            if self.version == version:
+                self._view = (snapshot, version, df)
+        return snapshot_view(df)
+
+    def _layer(self, df, mask, rows, enrich_fn):
+        """Write the patched values (and their re-derived columns) into the rows of df selected by mask"""
+        patched = df.loc[mask].copy()
+        for row_index, values in rows.items():
+            hit = (patched['row_index'] == row_index).to_numpy()
+            for col, value in values.items():
+                if col in patched.columns:
+                    patched[col] = patched[col].astype(object)
+                    patched.loc[hit, col] = value
+        if enrich_fn is not None:
+            patched = enrich_fn(patched)
+
+        # Rows enrich_fn dropped or re-keyed cannot be matched - leave them as in the snapshot
+        patched = patched.drop_duplicates('row_index').set_index('row_index', drop=False)
+        positions = np.flatnonzero(mask)
+        targets = df['row_index'].to_numpy()[positions]
+        found = patched.index.get_indexer(targets)
+        mask = np.zeros(len(df), dtype=bool)
+        mask[positions[found >= 0]] = True
+        patched = patched.iloc[found[found >= 0]]
+
+        for col in patched.columns:
+            if col not in df.columns:
+                continue
+            values = pd.Series(patched[col].to_numpy(dtype=object))
+            dtype = df[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                missing = [v for v in values.dropna().unique() if v not in dtype.categories]
+                if missing:
+                    df[col] = df[col].cat.add_categories(missing)
+            elif pd.api.types.is_bool_dtype(dtype):
+                values = values.fillna(False).astype(bool)
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                values = pd.to_datetime(values, errors='coerce')
+            elif pd.api.types.is_numeric_dtype(dtype):
+                values = pd.to_numeric(values, errors='coerce')
+                if pd.api.types.is_float_dtype(dtype) or not values.isna().any():
+                    # Same width as the compact snapshot column (float32 ratios, int32 row_index)
+                    values = values.astype(dtype)
+            df.loc[mask, col] = values.to_numpy()
+
+        if report_engine.STATUS_KEY_COL in df.columns:
+            report_engine.build_status_index(df)
+
+_patches = {}
+_patches_lock = threading.Lock()
+
+def get_snapshot_patches(name):
+    """Process-wide patch set per cached snapshot (e.g. 'app')"""
+    with _patches_lock:
+        if name not in _patches:
+            _patches[name] = SnapshotPatches()
+        return _patches[name]
@@ -7,97 +7,191 @@ import streamlit as st
 from datetime import datetime, timedelta
 from io import BytesIO
 import json
+import os
+from report_engine import STATUS_NEW, STATUS_KEY_COL, canonicalize_statuses
+from change_log_store import get_change_log_store
+from cache_regions import REGION_AGGREGATES, register_cache
+from perf_metrics import PERF_LOG_PATH
+
+EXPORT_FORMATS = {
+    'csv': {'label': '📄 CSV', 'ext': 'csv', 'mime': 'text/csv'},
+    'xlsx': {'label': '📊 Excel', 'ext': 'xlsx', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'parquet': {'label': '🗄️ Parquet', 'ext': 'parquet', 'mime': 'application/octet-stream'},
+}
+
+def _cell_value(value):
+    """Excel-safe cell value (NaN/NaT -> empty, numpy scalars -> python)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
 
 def export_to_excel(df, filename_prefix="orders"):
-    """Export DataFrame to Excel format"""
+    """Export DataFrame to Excel format (openpyxl write-only mode, rows streamed)"""
     try:
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Orders')
-        output.seek(0)
-        return output.getvalue()
+        from openpyxl import Workbook
     except ImportError:
         # Fallback to CSV if openpyxl not available
-        return df.to_csv(index=False).encode('utf-8-sig')
+        return export_to_csv(df)
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Orders')
+    worksheet.append([str(col) for col in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        worksheet.append([_cell_value(value) for value in row])
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
 
 def export_to_csv(df, filename_prefix="orders"):
     """Export DataFrame to CSV format"""
     return df.to_csv(index=False).encode('utf-8-sig')
 
-def get_smart_alerts(df, docket_col=None, status_col=None, event_date_col=None):
-    """Generate smart alerts based on data"""
-    alerts = []
+def export_to_parquet(df, filename_prefix="orders"):
+    """Export DataFrame to Parquet (columnar, compressed - for large dumps). Needs pyarrow."""
+    output = BytesIO()
+    # Sheet columns mix str/float/None - store object columns as text so the schema is stable
+    object_cols = df.select_dtypes(include=['object']).columns
+    df.astype({col: 'string' for col in object_cols}).to_parquet(output, index=False, compression='zstd')
+    return output.getvalue()
+
+EXPORTERS = {'csv': export_to_csv, 'xlsx': export_to_excel, 'parquet': export_to_parquet}
+
+def selection_fingerprint(df):
+    """Hash of which rows/columns a filtered view holds (its values come from the snapshot)"""
+    index_hash = int(pd.util.hash_pandas_object(df.index).sum()) & 0xFFFFFFFFFFFF if len(df) else 0
+    return f"{len(df)}:{index_hash:x}:{hash(tuple(map(str, df.columns))) & 0xFFFF:x}"
+
+@st.cache_data(max_entries=12, show_spinner=False)
+def _cached_export(_df, fmt, snapshot_version, filter_hash):
+    """Export bytes cached per (format, snapshot version, filter hash) - _df is not hashed"""
+    return EXPORTERS[fmt](_df)
+
+register_cache(REGION_AGGREGATES, 'utils.exports', _cached_export.clear)
+
+def render_lazy_export(df, fmt, key, snapshot_version, filter_hash=None, filename_prefix="orders"):
+    """Download button that only builds the file when asked for.
+    First click prepares (and caches) the bytes; later reruns with the same data reuse them."""
+    spec = EXPORT_FORMATS[fmt]
+    filter_hash = filter_hash or selection_fingerprint(df)
+    ready_key = f"{key}_ready"
+    cache_key = (snapshot_version, filter_hash)
     
-    if df.empty:
-        return alerts
+    if st.session_state.get(ready_key) != cache_key:
+        if not st.button(f"{spec['label']} - הכן קובץ", key=f"{key}_prepare", use_container_width=True):
+            return
+        st.session_state[ready_key] = cache_key
     
-    # Alert 1: Orders without docket
-    if docket_col and docket_col in df.columns:
-        no_docket = df[
-            (df[docket_col].isna()) | 
-            (df[docket_col].astype(str).str.strip().isin(['', '-']))
-        ]
-        if len(no_docket) > 0:
-            alerts.append({
-                'type': 'warning',
-                'icon': '⚠️',
-                'title': 'הזמנות ללא דוקט',
-                'count': len(no_docket),
-                'message': f'{len(no_docket)} הזמנות ללא מספר דוקט - ייתכן שלא שולמו'
-            })
+    try:
+        with st.spinner("מכין קובץ..."):
+            data = _cached_export(df, fmt, snapshot_version, filter_hash)
+    except ImportError:
+        st.session_state.pop(ready_key, None)
+        st.info(f"💡 ייצוא {fmt} דורש חבילה נוספת (openpyxl / pyarrow)")
+        return
     
-    # Alert 2: Orders without supplier data
+    st.download_button(
+        label=f"⬇️ הורד {spec['label']}",
+        data=data,
+        file_name=f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{spec['ext']}",
+        mime=spec['mime'],
+        key=key,
+        use_container_width=True
+    )
+
+def _parse_dates_once(series):
+    """pd.to_datetime on each distinct value only (event dates repeat a lot)"""
+    codes, uniques = pd.factorize(series.astype(str).str.strip())
+    parsed = pd.to_datetime(pd.Series(uniques), errors='coerce')
+    return pd.Series(parsed.to_numpy()[codes], index=series.index)
+
+def build_alert_features(df, docket_col=None, status_col=None, event_date_col=None):
+    """Precompute the columns every alert rule reads - each one derived exactly once.
+    Features are only present when their source column exists."""
+    features = {}
+    if docket_col and docket_col in df.columns:
+        docket = df[docket_col].astype(object)
+        features['docket_present'] = docket.notna() & ~docket.astype(str).str.strip().isin(['', '-'])
     if 'has_supplier_data' in df.columns:
-        no_supplier = df[df['has_supplier_data'] == False]
-        if len(no_supplier) > 0:
-            alerts.append({
-                'type': 'info',
-                'icon': '📦',
-                'title': 'הזמנות ללא נתוני ספק',
-                'count': len(no_supplier),
-                'message': f'{len(no_supplier)} הזמנות ללא נתוני ספק - צריך לעדכן'
-            })
-    
-    # Alert 3: Upcoming events (next 7 days)
+        features['has_supplier_data'] = df['has_supplier_data'].fillna(False).astype(bool)
     if event_date_col and event_date_col in df.columns:
+        if event_date_col == 'Date of the event' and 'parsed_date' in df.columns:
+            features['event_date'] = pd.to_datetime(df['parsed_date'], errors='coerce')
+        else:
+            features['event_date'] = _parse_dates_once(df[event_date_col])
+    if STATUS_KEY_COL in df.columns:
+        features['status'] = df[STATUS_KEY_COL]
+    elif status_col and status_col in df.columns:
+        features['status'] = canonicalize_statuses(df[status_col])
+    return pd.DataFrame(features, index=df.index)
+
+# Declarative alert rules, evaluated in this order. Add an alert by adding an entry:
+# requires = feature columns it reads, mask(features, now) -> boolean Series of matching rows.
+ALERT_RULES = [
+    {
+        'id': 'no_docket', 'type': 'warning', 'icon': '⚠️', 'title': 'הזמנות ללא דוקט',
+        'requires': ['docket_present'],
+        'mask': lambda f, now: ~f['docket_present'],
+        'message': '{count} הזמנות ללא מספר דוקט - ייתכן שלא שולמו',
+    },
+    {
+        'id': 'no_supplier', 'type': 'info', 'icon': '📦', 'title': 'הזמנות ללא נתוני ספק',
+        'requires': ['has_supplier_data'],
+        'mask': lambda f, now: ~f['has_supplier_data'],
+        'message': '{count} הזמנות ללא נתוני ספק - צריך לעדכן',
+    },
+    {
+        'id': 'upcoming_events', 'type': 'success', 'icon': '📅', 'title': 'אירועים קרובים',
+        'requires': ['event_date'],
+        'mask': lambda f, now: f['event_date'].between(now, now + timedelta(days=7)),
+        'message': '{count} הזמנות לאירועים ב-7 הימים הקרובים',
+    },
+    {
+        'id': 'new_orders', 'type': 'error', 'icon': '🔴', 'title': 'הזמנות חדשות',
+        'requires': ['status'],
+        'mask': lambda f, now: f['status'] == STATUS_NEW,
+        'message': '{count} הזמנות חדשות ממתינות לטיפול',
+    },
+]
+
+def evaluate_alerts(features, now=None, rules=None):
+    """Run every applicable rule over the precomputed features; only non-empty alerts are returned"""
+    now = now or datetime.now()
+    alerts = []
+    for rule in rules or ALERT_RULES:
+        if any(col not in features.columns for col in rule['requires']):
+            continue
         try:
-            now = datetime.now()
-            next_week = now + timedelta(days=7)
-            
-            # Try to parse dates
-            df_copy = df.copy()
-            df_copy['_parsed_date'] = pd.to_datetime(df_copy[event_date_col], errors='coerce')
-            upcoming = df_copy[
-                (df_copy['_parsed_date'].notna()) &
-                (df_copy['_parsed_date'] >= now) &
-                (df_copy['_parsed_date'] <= next_week)
-            ]
-            
-            if len(upcoming) > 0:
-                alerts.append({
-                    'type': 'success',
-                    'icon': '📅',
-                    'title': 'אירועים קרובים',
-                    'count': len(upcoming),
-                    'message': f'{len(upcoming)} הזמנות לאירועים ב-7 הימים הקרובים'
-                })
-        except:
-            pass
-    
-    # Alert 4: New orders waiting
-    if status_col and status_col in df.columns:
-        new_orders = df[df[status_col].astype(str).str.lower().str.strip() == 'new']
-        if len(new_orders) > 0:
+            count = int(rule['mask'](features, now).sum())
+        except Exception:
+            continue
+        if count > 0:
             alerts.append({
-                'type': 'error',
-                'icon': '🔴',
-                'title': 'הזמנות חדשות',
-                'count': len(new_orders),
-                'message': f'{len(new_orders)} הזמנות חדשות ממתינות לטיפול'
+                'id': rule['id'],
+                'type': rule['type'],
+                'icon': rule['icon'],
+                'title': rule['title'],
+                'count': count,
+                'message': rule['message'].format(count=count)
             })
-    
     return alerts
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_alerts(_df, docket_col, status_col, event_date_col, snapshot_version, hour):
+    """Alerts per (snapshot version, columns, hour) - the hour keeps 'next 7 days' current"""
+    features = build_alert_features(_df, docket_col, status_col, event_date_col)
+    return evaluate_alerts(features, datetime.fromisoformat(hour))
+
+register_cache(REGION_AGGREGATES, 'utils.alerts', _cached_alerts.clear)
+
+def get_smart_alerts(df, docket_col=None, status_col=None, event_date_col=None, snapshot_version=None):
+    """Generate smart alerts based on data (cached per snapshot_version when one is given)"""
+    if df.empty:
+        return []
+    if snapshot_version is None:
+        return evaluate_alerts(build_alert_features(df, docket_col, status_col, event_date_col))
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0).isoformat()
+    return _cached_alerts(df, docket_col, status_col, event_date_col, snapshot_version, hour)
+
 def save_search_query(query_name, filters, session_key='saved_searches'):
     """Save a search query for later use"""
     if session_key not in st.session_state:
@@ -114,8 +208,8 @@ def load_saved_searches(session_key='saved_searches'):
         return {}
     return st.session_state[session_key]
 
-def create_change_log(action, order_id, old_value, new_value, user='system'):
-    """Create a change log entry"""
+def create_change_log(action, order_id, old_value, new_value, user='system', details=None):
+    """Create a change log entry (persisted to the shared change-log store)"""
     log_entry = {
         'timestamp': datetime.now().isoformat(),
         'action': action,
@@ -124,22 +218,92 @@ def create_change_log(action, order_id, old_value, new_value, user='system'):
         'new_value': new_value,
         'user': user
     }
+    if details is not None:
+        log_entry['details'] = details
     
-    # Store in session state (in production, use database)
-    if 'change_log' not in st.session_state:
-        st.session_state['change_log'] = []
-    
-    st.session_state['change_log'].append(log_entry)
-    
-    # Keep only last 100 entries
-    if len(st.session_state['change_log']) > 100:
-        st.session_state['change_log'] = st.session_state['change_log'][-100:]
+    get_change_log_store().append(log_entry)
     
     return log_entry
 
-def get_recent_changes(limit=10):
-    """Get recent changes from log"""
-    if 'change_log' not in st.session_state:
-        return []
-    
-    return st.session_state['change_log'][-limit:][::-1]  # Most recent first
+def get_recent_changes(limit=10, offset=0, action=None, order_id=None, since=None):
+    """Get recent changes from log - most recent first, one page at a time"""
+    return get_change_log_store().query(action=action, order_id=order_id, since=since, limit=limit, offset=offset)
+
+def count_changes(action=None, order_id=None, since=None):
+    """Number of logged changes matching the filters (for pagination)"""
+    return get_change_log_store().count(action=action, order_id=order_id, since=since)
+
+def get_change_actions():
+    """Distinct logged action names"""
+    return get_change_log_store().actions()
+
+def perf_panel_enabled():
+    """The '⏱ ביצועים' admin panel shows with PERF_PANEL=1 in the environment or ?perf=1 in the URL"""
+    return bool(os.environ.get('PERF_PANEL', '').strip()) or st.query_params.get('perf') == '1'
+
+def current_user_label():
+    """Who this session is, for Sheets API accounting: the signed-in email, else a short session id"""
+    try:
+        email = st.experimental_user.email
+        if email:
+            return email
+    except Exception:
+        pass
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return f"session-{ctx.session_id[:8]}"
+    except Exception:
+        pass
+    return 'anonymous'
+
+def render_perf_panel(run, history=None, api_usage=None):
+    """Sidebar panel: where this rerun's time went, medians over the recent reruns and Sheets API usage per user / feature"""
+    if not run:
+        return
+    with st.expander("⏱ ביצועים", expanded=False):
+        counters = run['counters']
+        cols = st.columns(3)
+        cols[0].metric("זמן ריצה", f"{run['total_s'] * 1000:,.0f} ms")
+        cols[1].metric("קריאות API", f"{counters.get('api_calls', 0):,}")
+        cols[2].metric("שורות נטענו", f"{counters.get('rows_fetched', 0):,}")
+        
+        lookups = sum(v for k, v in counters.items() if k.startswith('cache_lookups:'))
+        misses = sum(v for k, v in counters.items() if k.startswith('cache_misses:'))
+        if lookups:
+            st.caption(f"Cache: {lookups - misses} פגיעות / {misses} החטאות")
+        
+        rows = [
+            {'שלב': name, 'ms': round(stage['seconds'] * 1000, 1), 'קריאות': stage['calls'], 'שורות': stage['rows']}
+            for name, stage in run['stages'].items()
+        ] + [
+            {'שלב': name, 'ms': round(seconds * 1000, 1), 'קריאות': 1, 'שורות': 0}
+            for name, seconds in run['laps'].items()
+        ]
+        if rows:
+            st.dataframe(pd.DataFrame(rows).sort_values('ms', ascending=False), hide_index=True, use_container_width=True)
+        
+        if history and len(history) > 1:
+            medians = pd.DataFrame([
+                {'שלב': name, 'ms': stage['seconds'] * 1000}
+                for past in history for name, stage in past['stages'].items()
+            ] + [
+                {'שלב': 'סה"כ', 'ms': past['total_s'] * 1000} for past in history
+            ])
+            st.caption(f"חציון על פני {len(history)} ריצות אחרונות")
+            st.dataframe(
+                medians.groupby('שלב')['ms'].median().round(1).sort_values(ascending=False).reset_index(),
+                hide_index=True, use_container_width=True
+            )
+        
+        if api_usage:
+            st.caption("קריאות Sheets API מאז עליית השרת (משתמש / פיצ'ר)")
+            st.dataframe(
+                pd.DataFrame(api_usage).rename(columns={
+                    'user': 'משתמש', 'feature': "פיצ'ר", 'kind': 'סוג', 'calls': 'קריאות',
+                    'retries': 'ניסיונות חוזרים', 'failures': 'כשלים', 'wait_s': 'המתנה (s)'
+                }),
+                hide_index=True, use_container_width=True
+            )
+        st.caption(f"יומן: {PERF_LOG_PATH}")